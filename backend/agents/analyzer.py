@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-import asyncio
 from typing import Any
 
 from .base import BaseAgent, EmitFn
@@ -27,23 +26,18 @@ class AnalyzerAgent(BaseAgent):
             step=1,
         ))
 
-        # Extract facts from each source in parallel
-        async def extract_one(content: ExtractedContent) -> ExtractedContent:
+        for content in contents:
             await emit(AgentActionEvent.create(
                 agent_name=self.name,
                 action="extract_facts",
                 input_summary=f"Extracting from: {content.title[:60]}",
             ))
-            facts = await self.content_extractor.extract_facts(content, query)
-            content.facts = facts
-            return content
-
-        analyzed = await asyncio.gather(
-            *[extract_one(c) for c in contents],
-            return_exceptions=True,
-        )
 
-        valid_contents = [c for c in analyzed if isinstance(c, ExtractedContent)]
+        # Extract facts from all sources at once so heuristic work can be batched
+        facts_per_source = await self.content_extractor.extract_facts_many(contents, query)
+        for content, facts in zip(contents, facts_per_source):
+            content.facts = facts
+        valid_contents = list(contents)
 
         await emit(AgentThinkingEvent.create(
             agent_name=self.name,
@@ -7,6 +7,9 @@ from typing import Any, Callable, Awaitable, Optional
 from ..models.agents import AgentStep, AgentState
 from ..models.events import AgentThinkingEvent, AgentActionEvent, SSEEvent
 from ..providers.base import LLMProvider
+from ..providers.usage import check_run_budget
+from ..observability.metrics import current_agent
+from ..observability.tracing import span
 from ..logging_config import get_logger
 
 
@@ -27,20 +30,24 @@ class BaseAgent(ABC):
 
     async def run(self, input_data: Any, emit: EmitFn) -> Any:
         """Execute the agent. Subclasses implement _execute for their specific logic."""
-        self.logger.info(f"Agent '{self.name}' starting")
+        self.logger.info("Agent '%s' starting", self.name)
         await emit(AgentThinkingEvent.create(
             agent_name=self.name,
             thought=f"Starting {self.name} agent...",
             step=0,
         ))
 
+        token = current_agent.set(self.name)
         try:
-            result = await self._execute(input_data, emit)
-            self.logger.info(f"Agent '{self.name}' completed successfully")
+            with span(f"agent.{self.name}", agent=self.name, model=self.model):
+                result = await self._execute(input_data, emit)
+            self.logger.info("Agent '%s' completed successfully", self.name)
             return result
         except Exception as e:
-            self.logger.error(f"Agent '{self.name}' failed: {e}")
+            self.logger.error("Agent '%s' failed: %s", self.name, e)
             raise
+        finally:
+            current_agent.reset(token)
 
     @abstractmethod
     async def _execute(self, input_data: Any, emit: EmitFn) -> Any:
@@ -58,6 +65,7 @@ class BaseAgent(ABC):
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": user_prompt},
         ]
+        check_run_budget()
         return await self.provider.complete(
             messages=messages,
             model=self.model,
@@ -77,6 +85,7 @@ class BaseAgent(ABC):
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": user_prompt},
         ]
+        check_run_budget()
         return await self.provider.complete_structured(
             messages=messages,
             model=self.model,
@@ -8,22 +8,7 @@ from ..models.agents import ReflectionResult
 from ..models.events import AgentThinkingEvent, ReflectionEvent
 
 
-class CriticAgent(BaseAgent):
-    name = "critic"
-    description = "Evaluates research report quality and provides critique for improvement"
-
-    async def _execute(self, input_data: Any, emit: EmitFn) -> ReflectionResult:
-        report: ResearchReport = input_data["report"]
-        query: str = input_data["query"]
-        retry_number: int = input_data.get("retry_number", 0)
-
-        await emit(AgentThinkingEvent.create(
-            agent_name=self.name,
-            thought=f"Evaluating report quality (review #{retry_number + 1})",
-            step=1,
-        ))
-
-        system_prompt = """You are a research quality reviewer. Evaluate the provided research report for:
+SYSTEM_PROMPT = """You are a research quality reviewer. Evaluate the provided research report for:
 
 1. COMPLETENESS: Does it answer the original research query?
 2. ACCURACY: Are claims supported by cited sources?
@@ -39,6 +24,22 @@ Return valid JSON with exactly these fields:
 
 Be constructive but honest. Only reject if there are genuine quality issues."""
 
+
+class CriticAgent(BaseAgent):
+    name = "critic"
+    description = "Evaluates research report quality and provides critique for improvement"
+
+    async def _execute(self, input_data: Any, emit: EmitFn) -> ReflectionResult:
+        report: ResearchReport = input_data["report"]
+        query: str = input_data["query"]
+        retry_number: int = input_data.get("retry_number", 0)
+
+        await emit(AgentThinkingEvent.create(
+            agent_name=self.name,
+            thought=f"Evaluating report quality (review #{retry_number + 1})",
+            step=1,
+        ))
+
         user_prompt = f"""Original query: {query}
 
 Report summary ({len(report.summary)} chars):
@@ -53,7 +54,7 @@ Confidence score: {report.confidence_score}
 Evaluate this report."""
 
         result = await self._llm_structured(
-            system_prompt=system_prompt,
+            system_prompt=SYSTEM_PROMPT,
             user_prompt=user_prompt,
             response_model=ReflectionResult,
             temperature=0.3,
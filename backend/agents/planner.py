@@ -7,6 +7,17 @@ from ..models.research import ResearchPlan
 from ..models.events import AgentThinkingEvent, PlanEvent
 
 
+SYSTEM_PROMPT = """You are a research planning expert. Given a research query, create a detailed research plan.
+
+Return valid JSON with exactly these fields:
+- original_query: the original query string
+- decomposed_questions: array of 2-4 specific sub-questions that together answer the main query
+- search_strategies: array of 2-3 search strategy descriptions (e.g., "search academic sources", "find recent news")
+- expected_source_types: array of expected source types (e.g., "academic papers", "news articles", "official documentation")
+
+Be specific and actionable. Each sub-question should target a different aspect of the topic."""
+
+
 class PlannerAgent(BaseAgent):
     name = "planner"
     description = "Decomposes research queries into sub-questions and search strategies"
@@ -20,20 +31,10 @@ class PlannerAgent(BaseAgent):
             step=1,
         ))
 
-        system_prompt = """You are a research planning expert. Given a research query, create a detailed research plan.
-
-Return valid JSON with exactly these fields:
-- original_query: the original query string
-- decomposed_questions: array of 2-4 specific sub-questions that together answer the main query
-- search_strategies: array of 2-3 search strategy descriptions (e.g., "search academic sources", "find recent news")
-- expected_source_types: array of expected source types (e.g., "academic papers", "news articles", "official documentation")
-
-Be specific and actionable. Each sub-question should target a different aspect of the topic."""
-
         user_prompt = f"Create a research plan for this query: {query}"
 
         plan = await self._llm_structured(
-            system_prompt=system_prompt,
+            system_prompt=SYSTEM_PROMPT,
             user_prompt=user_prompt,
             response_model=ResearchPlan,
             temperature=0.3,
@@ -31,13 +31,13 @@ class SearcherAgent(BaseAgent):
         # Search all sub-questions in parallel
         queries = plan.decomposed_questions or [plan.original_query]
 
-        async def search_one(query: str) -> list[ExtractedContent]:
+        async def search_one(query: str) -> tuple[list[ExtractedContent], list[str]]:
             await emit(AgentActionEvent.create(
                 agent_name=self.name,
                 action="search",
                 input_summary=query[:100],
             ))
-            return await self.firecrawl.search_and_scrape(query, num_results=3)
+            return await self.firecrawl.search_for_contents(query, num_results=3)
 
         results_lists = await asyncio.gather(
             *[search_one(q) for q in queries],
@@ -48,16 +48,37 @@ class SearcherAgent(BaseAgent):
         all_contents: list[ExtractedContent] = []
         seen_urls: set[str] = set()
 
+        def add(content: ExtractedContent) -> None:
+            if content.url not in seen_urls:
+                seen_urls.add(content.url)
+                # Score credibility
+                content.credibility_score = self.content_extractor.score_credibility(content.url)
+                all_contents.append(content)
+
+        to_scrape: list[str] = []
         for result in results_lists:
             if isinstance(result, Exception):
-                self.logger.warning(f"Search failed: {result}")
+                self.logger.warning("Search failed: %s", result)
                 continue
-            for content in result:
-                if content.url not in seen_urls:
-                    seen_urls.add(content.url)
-                    # Score credibility
-                    content.credibility_score = self.content_extractor.score_credibility(content.url)
-                    all_contents.append(content)
+            contents, urls = result
+            for content in contents:
+                add(content)
+            to_scrape.extend(urls)
+
+        # Scrape what the searches didn't return content for in one fan-out across all
+        # sub-questions, so larger sets can go through a single batch job
+        to_scrape = [u for u in dict.fromkeys(to_scrape) if u not in seen_urls]
+        if to_scrape:
+            await emit(AgentActionEvent.create(
+                agent_name=self.name,
+                action="scrape",
+                input_summary=f"{len(to_scrape)} pages",
+            ))
+            try:
+                async for content in self.firecrawl.scrape_stream(to_scrape):
+                    add(content)
+            except Exception as e:
+                self.logger.warning("Scraping failed: %s", e)
 
         await emit(AgentThinkingEvent.create(
             agent_name=self.name,
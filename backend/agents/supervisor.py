@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import asyncio
+import uuid
 from typing import AsyncGenerator
 
 from ..config import Settings, get_settings
@@ -13,10 +14,15 @@ from ..models.events import (
 )
 from ..models.research import ResearchReport
 from ..providers.registry import get_provider_for_agent
+from ..providers.usage import BudgetExhaustedError, RunBudget, track_run_usage
 from ..tools.firecrawl_client import FirecrawlClient
 from ..tools.content_extractor import ContentExtractor
+from ..tools.page_spill import PageSpill
+from ..tools.scrape_scheduler import get_scrape_scheduler
 from ..memory.research_store import ResearchStore
-from ..logging_config import get_logger
+from ..observability.metrics import PHASE_SECONDS, PhaseTimer
+from ..observability.tracing import get_tracer
+from ..logging_config import current_run_id, get_logger
 
 from .planner import PlannerAgent
 from .searcher import SearcherAgent
@@ -37,8 +43,11 @@ class Supervisor:
         self,
         query: str,
         cancel_event: asyncio.Event | None = None,
+        run_id: str | None = None,
     ) -> AsyncGenerator[SSEEvent, None]:
         """Run the full research pipeline, yielding SSE events."""
+        run_id = run_id or str(uuid.uuid4())
+        current_run_id.set(run_id)
         store = ResearchStore()
         events: list[SSEEvent] = []
 
@@ -48,15 +57,50 @@ class Supervisor:
         def _cancelled() -> bool:
             return cancel_event is not None and cancel_event.is_set()
 
+        spill: PageSpill | None = None
+        tracer = get_tracer()
+        root_span = tracer.start_trace(run_id, query=query[:200])
+        phases = PhaseTimer(PHASE_SECONDS)
+        budget = RunBudget.from_settings(self.settings)
+        run_usage = track_run_usage(budget)
+        degraded = False
+
+        def _budget_state() -> str:
+            nonlocal degraded
+            state = run_usage.state()
+            if state != "ok" and not degraded:
+                degraded = True
+                logger.warning(
+                    "Run %s reached its %s budget ($%.4f, %d tokens)",
+                    run_id, state, run_usage.total.cost_usd, run_usage.total.total_tokens,
+                )
+            return state
+
+        def _done(status: str = "complete") -> DoneEvent:
+            return DoneEvent.create(
+                status,
+                usage=run_usage.to_dict(),
+                budget={**budget.to_dict(), "state": run_usage.state()},
+            )
+
+        def _budget_exhausted(stage: str) -> list[SSEEvent]:
+            return [
+                ErrorEvent.create(
+                    f"Run budget exhausted {stage} "
+                    f"(${run_usage.total.cost_usd:.4f}, {run_usage.total.total_tokens} tokens)"
+                ),
+                _done("budget_exhausted"),
+            ]
+
         try:
             # Initialize tools
-            firecrawl = FirecrawlClient(
-                api_key=self.settings.firecrawl_api_key,
-                max_concurrent=self.settings.max_concurrent_fetches,
-            )
-            content_extractor = ContentExtractor()
+            if self.settings.page_spill_threshold_chars:
+                spill = PageSpill(run_id)
+            firecrawl = FirecrawlClient.from_settings(self.settings, run_id=run_id, spill=spill)
+            content_extractor = ContentExtractor(spill=spill)
 
             # --- Phase 1: Planning ---
+            phases.enter("planning")
             yield StatusEvent.create(phase="planning", progress=0.0, active_agent="planner")
             if _cancelled():
                 return
@@ -69,15 +113,24 @@ class Supervisor:
             events.clear()
             store.set_plan(plan)
 
+            if _budget_state() == "hard":
+                for e in _budget_exhausted("after planning"):
+                    yield e
+                return
+
             # --- Phase 2: Searching ---
+            phases.enter("searching")
             yield StatusEvent.create(phase="searching", progress=0.2, active_agent="searcher")
             if _cancelled():
                 return
 
             searcher_provider, searcher_model = get_provider_for_agent("searcher")
-            # Give content extractor a provider for LLM-based extraction
             analyzer_provider, analyzer_model = get_provider_for_agent("analyzer")
-            content_extractor = ContentExtractor(provider=analyzer_provider, model=analyzer_model)
+            if not degraded:
+                # Give content extractor a provider for LLM-based extraction
+                content_extractor = ContentExtractor(
+                    provider=analyzer_provider, model=analyzer_model, spill=spill
+                )
 
             searcher = SearcherAgent(
                 provider=searcher_provider,
@@ -89,14 +142,28 @@ class Supervisor:
             for e in events:
                 yield e
             events.clear()
-            store.add_extracted_content(contents)
 
             if not contents:
                 yield ErrorEvent.create("No sources found. Try a different query.")
-                yield DoneEvent()
+                yield _done()
+                return
+
+            state = _budget_state()
+            if state == "hard":
+                for e in _budget_exhausted("after searching"):
+                    yield e
                 return
+            if state == "soft":
+                # Heuristic extraction over fewer sources keeps the remaining LLM spend to synthesis
+                contents = contents[:self.settings.run_budget_degraded_max_sources]
+                content_extractor = ContentExtractor(spill=spill)
+                yield AgentThinkingEvent.create(
+                    agent_name="supervisor",
+                    thought=f"Budget limit reached: analysing {len(contents)} sources without LLM extraction",
+                )
 
             # --- Phase 3: Analysis ---
+            phases.enter("analyzing")
             yield StatusEvent.create(phase="analyzing", progress=0.4, active_agent="analyzer")
             if _cancelled():
                 return
@@ -114,10 +181,15 @@ class Supervisor:
                 yield e
             events.clear()
 
-            # Update store with analysis results
+            # Store sources once, with the analyzer's facts attached
             store.add_extracted_content(analysis["contents"])
             store.set_cross_references(analysis["cross_references"])
 
+            if _budget_state() == "hard":
+                for e in _budget_exhausted("before synthesis"):
+                    yield e
+                return
+
             # --- Phase 4: Synthesis + Reflection Loop ---
             synth_provider, synth_model = get_provider_for_agent("synthesizer")
             critic_provider, critic_model = get_provider_for_agent("critic")
@@ -131,56 +203,97 @@ class Supervisor:
             for retry in range(self.settings.max_reflection_retries + 1):
                 if _cancelled():
                     return
+                if retry and _budget_state() == "hard":
+                    # Keep the report we have rather than paying for a revision
+                    break
 
                 # Synthesize
                 progress = 0.6 + (retry * 0.1)
+                phases.enter("synthesizing")
                 yield StatusEvent.create(
                     phase="synthesizing",
                     progress=min(progress, 0.9),
                     active_agent="synthesizer",
                 )
 
-                report = await synthesizer.run(
-                    {"store": store, "critique": critique_text},
-                    emit,
-                )
+                try:
+                    report = await synthesizer.run(
+                        {"store": store, "critique": critique_text},
+                        emit,
+                    )
+                except BudgetExhaustedError:
+                    if report is None:
+                        raise
+                    break
                 for e in events:
                     yield e
                 events.clear()
 
+                if _budget_state() != "ok":
+                    if retry < self.settings.max_reflection_retries:
+                        yield AgentThinkingEvent.create(
+                            agent_name="supervisor",
+                            thought="Budget limit reached: skipping critique and revisions",
+                        )
+                    break
+
                 # Critique (skip on last iteration)
                 if retry < self.settings.max_reflection_retries:
+                    phases.enter("reflecting")
                     yield StatusEvent.create(
                         phase="reflecting",
                         progress=min(progress + 0.05, 0.9),
                         active_agent="critic",
                     )
 
-                    reflection = await critic.run(
-                        {"report": report, "query": query, "retry_number": retry},
-                        emit,
-                    )
+                    try:
+                        reflection = await critic.run(
+                            {"report": report, "query": query, "retry_number": retry},
+                            emit,
+                        )
+                    except BudgetExhaustedError:
+                        break
                     for e in events:
                         yield e
                     events.clear()
 
                     if reflection.is_satisfactory:
-                        logger.info(f"Report accepted by critic (score={reflection.score:.2f})")
+                        logger.info("Report accepted by critic (score=%.2f)", reflection.score)
                         break
 
                     critique_text = (
                         f"{reflection.critique}\nSuggestions: {', '.join(reflection.suggestions)}"
                     )
-                    logger.info(f"Report rejected (score={reflection.score:.2f}), revising...")
+                    logger.info("Report rejected (score=%.2f), revising...", reflection.score)
+
+            # Progress events of a call the budget stopped
+            for e in events:
+                yield e
+            events.clear()
 
             # --- Done ---
+            phases.finish()
             yield StatusEvent.create(phase="done", progress=1.0, active_agent="")
-            yield DoneEvent()
+            yield _done()
 
+        except BudgetExhaustedError:
+            for e in events:
+                yield e
+            for e in _budget_exhausted(f"during {phases.phase or 'the run'}"):
+                yield e
         except asyncio.CancelledError:
             logger.info("Research cancelled")
             yield ErrorEvent.create("Research was cancelled")
         except Exception as e:
-            logger.error(f"Supervisor error: {e}", exc_info=True)
+            logger.error("Supervisor error: %s", e, exc_info=True)
             yield ErrorEvent.create(f"Research failed: {str(e)}")
-            yield DoneEvent()
+            yield _done("failed")
+        finally:
+            phases.finish()
+            tracer.finish_trace(root_span)
+            if spill is not None:
+                spill.close()
+            logger.info("Run %s LLM usage: %s", run_id, run_usage.total.to_dict())
+            queue_stats = get_scrape_scheduler().forget_run(run_id)
+            if queue_stats:
+                logger.info("Run %s scrape queue: %s", run_id, queue_stats)
@@ -1,51 +1,71 @@
 from __future__ import annotations
 
 import asyncio
-import json
+import secrets
 import uuid
 from contextlib import asynccontextmanager
 from typing import AsyncGenerator
 
-from fastapi import FastAPI, Request
+from fastapi import Depends, FastAPI, Header, HTTPException, Request, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel, Field
 from dotenv import load_dotenv
 
 load_dotenv()
 
 from .config import get_settings
-from .logging_config import setup_logging, get_logger
-from .agents.supervisor import Supervisor
+from .logging_config import setup_logging, shutdown_logging, get_logger
+from .observability import get_loop_lag_monitor, get_metrics_registry, get_profiler, get_tracer, render_waterfall
+from .observability.collectors import RUNTIME_COLLECTORS
+from .streaming import EventSerializer, EventStream, RunMultiplexer, TransportOptions
+from .streaming.runs import ResearchRun, StreamItem, Subscriber, get_run_manager
+from .tools.fact_cache import close_fact_cache
+from .tools.text_processing import get_text_processor, shutdown_text_processor
 
 
 logger = get_logger("app")
 
-# Active research runs (for cancellation)
-_active_runs: dict[str, asyncio.Event] = {}
-
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     settings = get_settings()
-    setup_logging(settings.log_level)
+    setup_logging(
+        settings.log_level,
+        fmt=settings.log_format,
+        queue_size=settings.log_queue_size,
+        rate_limit=settings.log_rate_limit_per_second,
+        rate_burst=settings.log_rate_limit_burst,
+    )
     logger.info("Server starting up")
 
     # Validate at least one provider is available
     try:
         _ = settings.active_provider
-        logger.info(f"Default LLM provider: {settings.active_provider}")
+        logger.info("Default LLM provider: %s", settings.active_provider)
     except ValueError as e:
-        logger.warning(f"No LLM provider configured: {e}")
+        logger.warning("No LLM provider configured: %s", e)
 
     if settings.firecrawl_api_key:
         logger.info("Firecrawl API key configured")
     else:
         logger.warning("No FIRECRAWL_API_KEY — search/scrape will fail")
 
+    loop_lag = get_loop_lag_monitor()
+    loop_lag.start()
+    if settings.admin_token:
+        # Only the admin endpoints read task attribution; skip the per-task hook without them
+        get_profiler().install()
+
     yield
 
     logger.info("Server shutting down")
+    get_run_manager().cancel_all()
+    get_profiler().stop_all()
+    await loop_lag.stop()
+    shutdown_text_processor()
+    close_fact_cache()
+    shutdown_logging()
 
 
 app = FastAPI(
@@ -69,10 +89,20 @@ class ResearchRequest(BaseModel):
     query: str = Field(..., min_length=1, max_length=2000)
 
 
+class ProfileRequest(BaseModel):
+    run_id: str = ""
+    duration_seconds: float = Field(30.0, gt=0)
+    interval_ms: float | None = Field(None, gt=0)
+    memory: bool = False
+
+
 class HealthResponse(BaseModel):
     status: str
     provider: str | None = None
     firecrawl: bool = False
+    event_loop_lag: dict = Field(default_factory=dict)
+    text_processing: dict = Field(default_factory=dict)
+    runs: dict = Field(default_factory=dict)
 
 
 # --- Endpoints ---
@@ -90,53 +120,217 @@ async def health() -> HealthResponse:
         status="ok",
         provider=provider,
         firecrawl=bool(settings.firecrawl_api_key),
+        event_loop_lag=get_loop_lag_monitor().stats(),
+        text_processing=get_text_processor().stats(),
+        runs=get_run_manager().stats(),
     )
 
 
+metrics_registry = get_metrics_registry()
+for collector in RUNTIME_COLLECTORS:
+    metrics_registry.register_collector(collector)
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics() -> PlainTextResponse:
+    """Prometheus text exposition of latency histograms, token counts and runtime gauges."""
+    return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4")
+
+
 @app.get("/")
 async def root():
     return {"status": "ok", "docs": "/docs", "health": "/api/health"}
 
 
-@app.post("/api/research")
-async def research(request: ResearchRequest):
-    """Start a research run, returning an SSE stream of events."""
-    run_id = str(uuid.uuid4())
-    cancel_event = asyncio.Event()
-    _active_runs[run_id] = cancel_event
+async def _watch_disconnect(http_request: Request, sub: Subscriber, interval: float) -> None:
+    while not sub.closed:
+        if await http_request.is_disconnected():
+            sub.close()
+            return
+        await asyncio.sleep(interval)
+
+
+def _stream_run(run: ResearchRun, http_request: Request, after: int = 0) -> StreamingResponse:
+    """Stream a run's events (replaying those after ``after``) to one HTTP client.
 
-    async def event_stream() -> AsyncGenerator[str, None]:
+    Framing, compression and event coalescing are negotiated from the request headers,
+    see ``TransportOptions``. A client that disconnects is unsubscribed; what happens to
+    the run then is up to the RunManager's orphan policy.
+    """
+    settings = get_settings()
+    options = TransportOptions.from_headers(
+        http_request.headers,
+        compression=settings.stream_compression_enabled,
+        default_coalesce_ms=settings.stream_coalesce_default_ms,
+        max_coalesce_ms=settings.stream_coalesce_max_ms,
+    )
+    stream = EventStream(EventSerializer(run.run_id), options, settings.stream_compression_level)
+    replay, sub = run.subscribe(after)
+
+    async def items() -> AsyncGenerator[StreamItem, None]:
+        watcher = asyncio.create_task(
+            _watch_disconnect(http_request, sub, settings.disconnect_poll_seconds)
+        )
         try:
-            supervisor = Supervisor()
-            async for event in supervisor.run(request.query, cancel_event=cancel_event):
-                payload = event.model_dump(mode="json")
-                # Include run_id in each event
-                payload["run_id"] = run_id
-                yield f"data: {json.dumps(payload)}\n\n"
-        except asyncio.CancelledError:
-            yield f'data: {json.dumps({"event": "error", "data": {"message": "Cancelled"}, "run_id": run_id})}\n\n'
-        except Exception as e:
-            logger.error(f"Research stream error: {e}", exc_info=True)
-            yield f'data: {json.dumps({"event": "error", "data": {"message": str(e)}, "run_id": run_id})}\n\n'
+            for item in replay:
+                yield item
+            while (item := await sub.get()) is not None:
+                yield item
         finally:
-            _active_runs.pop(run_id, None)
+            watcher.cancel()
+            run.unsubscribe(sub)
+
+    async def event_stream() -> AsyncGenerator[bytes, None]:
+        async for chunk in stream.encode(items()):
+            yield chunk
+        logger.debug(
+            "Run %s stream (%s, %s): %s, dropped %d",
+            run.run_id, options.format, options.encoding, stream.stats.to_dict(), sub.dropped,
+        )
 
     return StreamingResponse(
         event_stream(),
-        media_type="text/event-stream",
+        media_type=options.media_type,
         headers={
             "Cache-Control": "no-cache",
             "Connection": "keep-alive",
-            "X-Run-Id": run_id,
+            "X-Accel-Buffering": "no",
+            "X-Run-Id": run.run_id,
+            **options.response_headers(),
         },
     )
 
 
+@app.post("/api/research")
+async def research(request: ResearchRequest, http_request: Request):
+    """Start a research run, returning an SSE (or NDJSON) stream of events."""
+    run = get_run_manager().start(str(uuid.uuid4()), request.query)
+    return _stream_run(run, http_request)
+
+
+@app.get("/api/research/{run_id}/events")
+async def research_events(run_id: str, http_request: Request, after: int = 0):
+    """Re-attach to a running, detached or recently finished run.
+
+    Replays events after ``after`` (or the ``Last-Event-ID`` header) and then follows live.
+    """
+    run = get_run_manager().get(run_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired run")
+    last_event_id = http_request.headers.get("last-event-id", "")
+    if not after and last_event_id.isdigit():
+        after = int(last_event_id)
+    return _stream_run(run, http_request, after)
+
+
+@app.websocket("/ws/research")
+async def research_ws(websocket: WebSocket):
+    """Multiplex many research runs over one WebSocket; see ``ClientMessage`` for the protocol."""
+    settings = get_settings()
+    await websocket.accept()
+    mux = RunMultiplexer(
+        websocket,
+        get_run_manager(),
+        window=settings.ws_run_window,
+        max_runs=settings.ws_max_runs_per_connection,
+    )
+    await mux.serve()
+
+
+@app.get("/api/research/{run_id}/trace")
+async def research_trace(run_id: str, format: str = "json"):
+    """Span waterfall for a running or recent run (``?format=text`` for a plain-text chart)."""
+    trace = get_tracer().get(run_id)
+    if trace is None:
+        raise HTTPException(status_code=404, detail="No trace for this run")
+    if format == "text":
+        return PlainTextResponse(render_waterfall(trace))
+    return trace.to_dict()
+
+
+# --- Admin ---
+
+
+def require_admin(x_admin_token: str = Header(default="")) -> None:
+    expected = get_settings().admin_token
+    if not expected:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not secrets.compare_digest(x_admin_token.encode(), expected.encode()):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+@app.post("/api/admin/profile", dependencies=[Depends(require_admin)])
+async def start_profile(request: ProfileRequest):
+    """Sample the event loop for a while, for every run or just ``run_id``.
+
+    Samples are tagged with the Supervisor phase; ``memory`` adds a tracemalloc diff.
+    """
+    if request.run_id:
+        run = get_run_manager().get(request.run_id)
+        if run is None or run.finished:
+            raise HTTPException(status_code=404, detail="Unknown or finished run")
+    try:
+        session = get_profiler().start(
+            run_id=request.run_id,
+            duration=request.duration_seconds,
+            interval=request.interval_ms / 1000 if request.interval_ms else None,
+            memory=request.memory,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return session.to_dict()
+
+
+@app.get("/api/admin/profile", dependencies=[Depends(require_admin)])
+async def list_profiles():
+    return [s.to_dict() for s in get_profiler().sessions()]
+
+
+def _get_profile(session_id: str):
+    session = get_profiler().get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Unknown profiling session")
+    return session
+
+
+@app.get("/api/admin/profile/{session_id}", dependencies=[Depends(require_admin)])
+async def get_profile(session_id: str):
+    return _get_profile(session_id).to_dict()
+
+
+@app.post("/api/admin/profile/{session_id}/stop", dependencies=[Depends(require_admin)])
+async def stop_profile(session_id: str):
+    session = _get_profile(session_id)
+    session.stop()
+    await asyncio.get_running_loop().run_in_executor(None, session.join)
+    return session.to_dict()
+
+
+@app.get("/api/admin/profile/{session_id}/collapsed", dependencies=[Depends(require_admin)])
+async def profile_collapsed(session_id: str, kind: str = "cpu"):
+    """Collapsed stacks (``cpu`` samples or ``memory`` bytes) for flamegraph.pl / speedscope."""
+    if kind not in ("cpu", "memory"):
+        raise HTTPException(status_code=400, detail="kind must be cpu or memory")
+    session = _get_profile(session_id)
+    return PlainTextResponse(
+        session.collapsed(kind),
+        headers={"Content-Disposition": f'attachment; filename="profile-{session_id}-{kind}.collapsed"'},
+    )
+
+
+@app.get("/api/admin/tasks", dependencies=[Depends(require_admin)])
+async def dump_tasks(run_id: str = "", format: str = "json"):
+    """Pending asyncio tasks with their await chains (``?format=collapsed`` for flamegraphs)."""
+    if format == "collapsed":
+        return PlainTextResponse(get_profiler().collapsed_tasks(run_id))
+    return get_profiler().dump_tasks(run_id)
+
+
 @app.post("/api/research/{run_id}/stop")
 async def stop_research(run_id: str):
     """Cancel a running research task."""
-    cancel = _active_runs.get(run_id)
-    if cancel:
-        cancel.set()
+    run = get_run_manager().get(run_id)
+    if run is not None and not run.finished:
+        run.stop()
         return {"status": "cancelled", "run_id": run_id}
     return {"status": "not_found", "run_id": run_id}
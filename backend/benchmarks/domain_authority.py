@@ -0,0 +1,107 @@
+"""Compare the trie-based domain authority lookup with the original linear scan.
+
+Run with ``python -m backend.benchmarks.domain_authority [table_size] [lookups]``.
+"""
+from __future__ import annotations
+
+import random
+import sys
+import time
+from urllib.parse import urlparse
+
+from ..tools.domain_authority import DomainAuthorityIndex, load_domain_authority
+
+
+# The table score_credibility used to scan
+LEGACY_TABLE = {
+    ".edu": 0.9,
+    ".gov": 0.9,
+    ".org": 0.7,
+    "nature.com": 0.95,
+    "science.org": 0.95,
+    "arxiv.org": 0.85,
+    "ieee.org": 0.85,
+    "acm.org": 0.85,
+    "reuters.com": 0.85,
+    "bbc.com": 0.8,
+    "bbc.co.uk": 0.8,
+    "nytimes.com": 0.8,
+    "washingtonpost.com": 0.8,
+    "wikipedia.org": 0.7,
+}
+
+
+def legacy_score(table: dict[str, float], url: str) -> float:
+    """``score_credibility`` as it was: substring scan and ``lstrip("www.")``."""
+    parsed = urlparse(url)
+    domain = parsed.netloc.lower().lstrip("www.")
+    for known_domain, score in table.items():
+        if known_domain.startswith("."):
+            if domain.endswith(known_domain):
+                return score
+        elif known_domain in domain:
+            return score
+    return 0.55 if parsed.scheme == "https" else 0.5
+
+
+def trie_score(index: DomainAuthorityIndex, url: str) -> float:
+    parsed = urlparse(url)
+    score = index.score(parsed.hostname or "")
+    if score is not None:
+        return score
+    return 0.55 if parsed.scheme == "https" else 0.5
+
+
+def _synthetic_table(size: int, rng: random.Random) -> dict[str, float]:
+    tlds = ["com", "org", "net", "io", "co.uk", "de"]
+    table = {".edu": 0.9, ".gov": 0.9}
+    while len(table) < size:
+        name = "".join(rng.choices("abcdefghijklmnopqrstuvwxyz", k=rng.randint(4, 12)))
+        table[f"{name}.{rng.choice(tlds)}"] = round(rng.uniform(0.4, 0.95), 2)
+    return table
+
+
+def _time(fn, urls: list[str]) -> float:
+    start = time.perf_counter()
+    for url in urls:
+        fn(url)
+    return time.perf_counter() - start
+
+
+def main(table_size: int = 5000, lookups: int = 20000) -> None:
+    rng = random.Random(0)
+    table = _synthetic_table(table_size, rng)
+    index = load_domain_authority()
+    for domain, score in table.items():
+        index.add(domain, score)
+
+    known = [d for d in table if not d.startswith(".")]
+    hosts = [f"www.{rng.choice(known)}" for _ in range(lookups // 2)]
+    hosts += [f"news.unknown{i}.example.com" for i in range(lookups - len(hosts))]
+    rng.shuffle(hosts)
+    urls = [f"https://{h}/article/{i}" for i, h in enumerate(hosts)]
+
+    legacy = _time(lambda u: legacy_score(table, u), urls)
+    index.score_host.cache_clear()
+    cold = _time(lambda u: trie_score(index, u), urls)
+    warm = _time(lambda u: trie_score(index, u), urls)
+
+    print(f"table={len(table)} entries, {lookups} lookups (half known domains)")
+    for label, seconds in (("legacy scan", legacy), ("trie (cold)", cold), ("trie (memoized)", warm)):
+        print(f"  {label:<16} {seconds * 1000:9.1f} ms  {seconds / lookups * 1e6:8.2f} us/lookup")
+
+    # Cases the old matcher got wrong, against the original table
+    bundled = load_domain_authority()
+    print("original table vs bundled index:")
+    for url in (
+        "https://www.nytimes.com/2024/x.html",
+        "https://www.washingtonpost.com/x",
+        "https://notnature.com/",
+        "https://me.github.io/",
+        "https://www.ox.ac.uk/",
+    ):
+        print(f"  {url:<36} legacy={legacy_score(LEGACY_TABLE, url):.2f}  trie={trie_score(bundled, url):.2f}")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:3]))
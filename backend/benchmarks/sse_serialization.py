@@ -0,0 +1,97 @@
+"""Per-event cost of the SSE encoding path, old vs. new, across many concurrent streams.
+
+Run with ``python -m backend.benchmarks.sse_serialization [streams] [events_per_stream]``.
+"""
+from __future__ import annotations
+
+import json
+import sys
+import time
+import tracemalloc
+
+from ..models.events import (
+    AgentActionEvent,
+    AgentThinkingEvent,
+    ReportEvent,
+    SearchResultsEvent,
+    StatusEvent,
+)
+from ..models.research import Citation, ResearchReport, SearchResult
+from ..streaming import EventSerializer
+
+
+def _report() -> ResearchReport:
+    return ResearchReport(
+        summary="Lorem ipsum dolor sit amet. " * 80,
+        key_findings=[f"Finding {i}: " + "detail " * 20 for i in range(8)],
+        citations=[
+            Citation(title=f"Source {i}", url=f"https://example.com/{i}", relevant_claims=["claim " * 15] * 3)
+            for i in range(10)
+        ],
+    )
+
+
+def _events(n: int) -> list:
+    results = [SearchResult(url=f"https://example.com/{i}", title=f"Result {i}", snippet="snippet " * 20) for i in range(10)]
+    report = _report()
+    events = []
+    for i in range(n):
+        kind = i % 10
+        if kind < 5:
+            events.append(AgentActionEvent.create("analyzer", "extract_facts", f"Extracting from: page {i}"))
+        elif kind < 8:
+            events.append(AgentThinkingEvent.create("analyzer", f"Thinking about step {i}", step=i))
+        elif kind == 8:
+            events.append(StatusEvent.create("analyzing", 0.4, "analyzer"))
+        else:
+            events.append(ReportEvent.create(report) if i % 20 == 19 else SearchResultsEvent.create(results))
+    return events
+
+
+def legacy_sse(event, run_id: str) -> str:
+    payload = event.model_dump(mode="json")
+    payload["run_id"] = run_id
+    return f"data: {json.dumps(payload)}\n\n"
+
+
+def _measure(label: str, make_emit, streams: list[tuple[str, list]]) -> None:
+    start = time.perf_counter()
+    total = n = 0
+    for run_id, events in streams:
+        emit = make_emit(run_id)
+        for event in events:
+            total += len(emit(event))
+        n += len(events)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    run_id, events = streams[0]
+    emit = make_emit(run_id)
+    for event in events:
+        emit(event)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        f"  {label:<8} {elapsed * 1000:9.1f} ms  {elapsed / n * 1e6:7.2f} us/event  "
+        f"peak {peak / 1024:7.1f} KiB/stream  {total / 1e6:.1f} MB out"
+    )
+
+
+def main(streams: int = 200, events_per_stream: int = 100) -> None:
+    legacy = lambda run_id: lambda e: legacy_sse(e, run_id)  # noqa: E731
+    new = lambda run_id: EventSerializer(run_id).sse  # noqa: E731
+
+    # Subscribers to the same run share event objects, so cached bodies are reused
+    shared = _events(events_per_stream)
+    print(f"{streams} streams x {events_per_stream} events, shared event objects")
+    _measure("legacy", legacy, [(f"run-{i}", shared) for i in range(streams)])
+    _measure("new", new, [(f"run-{i}", shared) for i in range(streams)])
+
+    # Independent runs: every event is encoded exactly once
+    print(f"{streams} streams x {events_per_stream} events, one run per stream")
+    _measure("legacy", legacy, [(f"run-{i}", _events(events_per_stream)) for i in range(streams)])
+    _measure("new", new, [(f"run-{i}", _events(events_per_stream)) for i in range(streams)])
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:3]))
@@ -21,21 +21,175 @@ class Settings(BaseSettings):
     model_synthesizer: str = "gpt-4o"
     model_critic: str = "gpt-4o"
 
+    # Model cascade: run cascaded agents on a cheap model first and escalate
+    # to the per-agent model above only when the cheap answer is not good enough
+    cascade_enabled: bool = False
+    cascade_agents: str = "analyzer,synthesizer,critic"
+    cascade_model_openai: str = "gpt-4o-mini"
+    cascade_model_anthropic: str = "claude-3-5-haiku-latest"
+    cascade_min_confidence: float = 0.5
+    cascade_min_critic_score: float = 0.5
+
+    # Hedged requests: after a percentile-based delay, race a backup request on the
+    # alternate provider (or the same one if only one is configured)
+    hedging_enabled: bool = False
+    hedge_percentile: float = 0.95
+    hedge_initial_delay_seconds: float = 15.0
+    hedge_min_delay_seconds: float = 2.0
+    hedge_budget_ratio: float = 0.1
+
+    # Model used on the *other* provider for hedges and circuit-breaker failover
+    alternate_model_openai: str = "gpt-4o"
+    alternate_model_anthropic: str = "claude-3-5-sonnet-latest"
+
+    # Provider resilience: retries honour Retry-After and are capped process-wide at
+    # llm_retry_budget_ratio of recent calls; per-model breakers fail over to the other provider
+    llm_retry_max_attempts: int = 3
+    llm_retry_base_delay: float = 1.0
+    llm_retry_max_delay: float = 30.0
+    llm_retry_budget_ratio: float = 0.2
+    llm_breaker_failure_threshold: int = 5
+    llm_breaker_recovery_seconds: float = 30.0
+    llm_failover_enabled: bool = True
+
+    # "native": OpenAI json_schema response_format / Anthropic forced tool use;
+    # "json": JSON mode with the schema pasted into the prompt
+    structured_output_mode: Literal["native", "json"] = "native"
+
+    # Anthropic cache_control breakpoints on static system prompts
+    prompt_cache_enabled: bool = True
+
     # Firecrawl
     firecrawl_api_key: str = ""
+    firecrawl_base_url: str = "https://api.firecrawl.dev/v1"
+    # Use the batch scrape job API for URL sets at least this large (0 = never). The
+    # searcher scrapes the content-less results of every sub-question together, so this
+    # counts pages across the whole search phase (3 results per sub-question)
+    firecrawl_batch_threshold: int = 6
+    firecrawl_batch_poll_interval: float = 2.0
+    firecrawl_batch_timeout_seconds: float = 120.0
+
+    # Per-page memory bounds: cap markdown length, stop reading responses at
+    # max_response_bytes (keeping the page text read so far), and spill pages above the
+    # threshold to a per-run temp file (0 = off)
+    max_page_chars: int = 200_000
+    max_response_bytes: int = 8_000_000
+    page_spill_threshold_chars: int = 0
+    page_preview_chars: int = 4000
+
+    # CPU-bound text processing (markdown cleaning, heuristic extraction) runs on a
+    # "process" or "thread" pool, or "inline"; inputs shorter than the threshold stay inline
+    text_executor: Literal["process", "thread", "inline"] = "process"
+    text_executor_workers: int = 2
+    text_inline_max_chars: int = 20_000
+
+    # Source credibility tables (empty = the ones bundled in backend/tools/data)
+    domain_authority_path: str = ""
+    public_suffix_path: str = ""
+
+    # Local CPU embeddings for corroboration and the per-run fact index: "hashing"
+    # needs nothing extra; "sentence-transformers" loads embedding_model if installed
+    embedding_backend: Literal["hashing", "sentence-transformers"] = "hashing"
+    embedding_model: str = "sentence-transformers/all-MiniLM-L6-v2"
+    embedding_dim: int = 512
+    embedding_cache_size: int = 50_000
+    # Cosine similarity for two facts to corroborate each other (0 = backend default)
+    corroboration_threshold: float = 0.0
+
+    # Extracted facts cached by (page content hash, normalised query, model); the
+    # SQLite disk tier is used when fact_cache_path is set
+    fact_cache_enabled: bool = True
+    fact_cache_max_entries: int = 2048
+    fact_cache_ttl_seconds: float = 86400.0
+    fact_cache_path: str = ""
 
     # Server
     backend_host: str = "0.0.0.0"
     backend_port: int = 8000
     log_level: str = "INFO"
+    # Logs are written by a background thread from a bounded queue (records are dropped,
+    # not waited on, when it is full). Below WARNING, each call site is rate limited
+    log_format: Literal["text", "json"] = "text"
+    log_queue_size: int = 10000
+    log_rate_limit_per_second: float = 20.0
+    log_rate_limit_burst: int = 50
     allowed_origins: str = "http://localhost:3000"
+    loop_lag_interval_seconds: float = 0.5
+
+    # Per-run tracing (phases, agents, Firecrawl calls, retries, LLM calls). Recent traces
+    # are served at /api/research/{run_id}/trace; finished ones can also be exported as
+    # JSON lines ("json") or OTLP/HTTP JSON ("otlp")
+    tracing_enabled: bool = True
+    tracing_exporter: Literal["none", "json", "otlp"] = "none"
+    tracing_json_path: str = "traces.jsonl"
+    tracing_otlp_endpoint: str = "http://localhost:4318"
+    tracing_service_name: str = "research-agent"
+    tracing_max_spans: int = 2000
+    tracing_retain_traces: int = 100
+
+    # /api/research transport, negotiated per request: gzip/deflate via Accept-Encoding,
+    # NDJSON via Accept, event coalescing window via X-Event-Coalesce-Ms (capped)
+    stream_compression_enabled: bool = True
+    stream_compression_level: int = 6
+    stream_coalesce_default_ms: int = 0
+    stream_coalesce_max_ms: int = 250
+
+    # Runs outlive their HTTP stream. When the last client disconnects a run is either
+    # cancelled after the grace period ("cancel") or left to finish ("detach"); finished
+    # runs can be re-attached to for the retention period
+    orphaned_run_policy: Literal["cancel", "detach"] = "cancel"
+    orphaned_run_grace_seconds: float = 5.0
+    finished_run_retention_seconds: float = 300.0
+    disconnect_poll_seconds: float = 1.0
+    # Per-client buffer; when full, thinking/action events are dropped before the
+    # pipeline is made to wait, for at most the stall timeout before that client is
+    # disconnected (0 = wait indefinitely)
+    stream_buffer_max_events: int = 64
+    stream_stall_timeout_seconds: float = 30.0
+    run_history_max_events: int = 2000
+    # WebSocket multiplexing: runs per connection, and events a client may leave
+    # unacknowledged per run before that run's stream pauses (0 = no flow control)
+    ws_max_runs_per_connection: int = 16
+    ws_run_window: int = 32
+
+    # Process-wide Firecrawl admission control (shared by all runs)
+    scrape_global_max_concurrent: int = 20
+    scrape_max_per_host: int = 2
+
+    # scrape_many quorum / hedging: return once scrape_quorum of the pages succeeded or
+    # the soft deadline passed (0 = none); re-issue stragglers slower than the percentile
+    scrape_quorum: float = 1.0
+    scrape_soft_deadline_seconds: float = 0.0
+    scrape_hedge_enabled: bool = False
+    scrape_hedge_percentile: float = 0.9
+    scrape_hedge_budget_ratio: float = 0.1
 
     # Agent behavior
-    max_concurrent_fetches: int = 5
+    max_concurrent_fetches: int = 5  # per run
     max_reflection_retries: int = 2
     agent_max_steps: int = 5
     research_timeout_seconds: int = 120
 
+    # Per-run LLM budgets (0 = unlimited). Past a soft limit the run degrades: facts are
+    # extracted heuristically from at most run_budget_degraded_max_sources sources and
+    # the critic is skipped. Past a hard limit no further LLM phases start. Costs use
+    # built-in list prices, overridable per model with a JSON file at llm_prices_path
+    run_budget_soft_usd: float = 0.0
+    run_budget_hard_usd: float = 0.0
+    run_budget_soft_tokens: int = 0
+    run_budget_hard_tokens: int = 0
+    run_budget_degraded_max_sources: int = 4
+    llm_prices_path: str = ""
+
+    # Admin endpoints (/api/admin/*, e.g. on-demand profiling) require this token in the
+    # X-Admin-Token header; empty disables them (and the task hook profiling relies on)
+    admin_token: str = ""
+    profile_sample_interval_ms: float = 10.0
+    profile_max_seconds: float = 300.0
+    profile_max_active_sessions: int = 2
+    profile_retain_sessions: int = 10
+    profile_tracemalloc_frames: int = 10
+
     model_config = {"env_file": ".env", "env_file_encoding": "utf-8"}
 
     def get_agent_model(self, agent_name: str) -> str:
@@ -48,6 +202,32 @@ class Settings(BaseSettings):
         }
         return mapping.get(agent_name, self.model_planner)
 
+    def get_cascade_model(self, agent_name: str, provider_name: str) -> str:
+        """Cheap first-try model for an agent, or "" if the agent is not cascaded."""
+        if not self.cascade_enabled:
+            return ""
+        agents = {a.strip() for a in self.cascade_agents.split(",") if a.strip()}
+        if agent_name not in agents:
+            return ""
+        mapping = {
+            "openai": self.cascade_model_openai,
+            "anthropic": self.cascade_model_anthropic,
+        }
+        return mapping.get(provider_name, "")
+
+    def get_alternate_target(self, provider_name: str) -> tuple[str, str]:
+        """Returns (provider_name, model) to send hedged or failed-over requests to.
+
+        Falls back to the same provider and model ("") when no alternate is configured.
+        """
+        for alt in ("anthropic", "openai"):
+            if alt != provider_name and self.has_provider(alt):
+                break
+        else:
+            return provider_name, ""
+        model = self.alternate_model_anthropic if alt == "anthropic" else self.alternate_model_openai
+        return alt, model
+
     def has_provider(self, name: str) -> bool:
         if name == "openai":
             return bool(self.openai_api_key)
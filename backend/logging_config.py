@@ -1,35 +1,202 @@
 from __future__ import annotations
 
+import atexit
+import json
 import logging
+import queue
 import sys
-from typing import Optional
+import threading
+import time
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Literal, Optional
+
+# Log context, set by the Supervisor (run) and BaseAgent (agent) and copied into
+# tasks they spawn, so every line can be attributed without passing ids around
+current_run_id: ContextVar[str] = ContextVar("current_run_id", default="")
+current_agent: ContextVar[str] = ContextVar("current_agent", default="none")
+
+LogFormat = Literal["text", "json"]
+
+# Attributes every LogRecord has; anything else came in through ``extra=``
+_RECORD_FIELDS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+
+class ContextFilter(logging.Filter):
+    """Stamps records with the run and agent of the code that logged them.
+
+    Runs on the caller's thread, where the context variables are visible.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.run_id = current_run_id.get()
+        record.agent = current_agent.get()
+        return True
+
+
+class RateLimitFilter(logging.Filter):
+    """Token bucket per call site for records below WARNING.
+
+    Each logging call site may emit ``rate`` records per second with bursts of
+    ``burst``; the rest are dropped, and the next record let through from that site
+    carries ``suppressed=<count>``. Loggers are called from worker threads as well as
+    the event loop, so bucket updates are locked.
+    """
+
+    def __init__(self, rate: float = 20.0, burst: int = 50) -> None:
+        super().__init__()
+        self.rate = rate
+        self.burst = burst
+        # (pathname, lineno) -> [tokens, last refill, suppressed]
+        self._buckets: dict[tuple[str, int], list] = {}
+        self._lock = threading.Lock()
+        self.suppressed = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or self.rate <= 0:
+            return True
+        key = (record.pathname, record.lineno)
+        with self._lock:
+            now = time.monotonic()
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [float(self.burst), now, 0]
+            else:
+                bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+                bucket[1] = now
+            if bucket[0] < 1.0:
+                bucket[2] += 1
+                self.suppressed += 1
+                return False
+            bucket[0] -= 1.0
+            if bucket[2]:
+                record.suppressed = bucket[2]
+                bucket[2] = 0
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, message, run_id, agent, any
+    ``extra=`` fields, and the traceback under ``exc``."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_FIELDS and value not in ("", None):
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self) -> None:
+        super().__init__(
+            fmt="%(asctime)s | %(levelname)-8s | %(name)-30s | %(message)s",
+            datefmt="%Y-%m-%d %H:%M:%S",
+        )
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        suppressed = getattr(record, "suppressed", 0)
+        return f"{line} (+{suppressed} suppressed)" if suppressed else line
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """Hands records to a background listener without blocking the caller.
+
+    The message is merged with its arguments here, as the stdlib handler does, so
+    mutable arguments are captured as they were at the call; records the level and
+    rate-limit filters reject never get that far. Tracebacks are rendered here too,
+    since they reference live frames. Layout (text or JSON) is left to the listener
+    thread. When the queue is full the record is dropped and counted rather than
+    stalling the event loop.
+    """
+
+    def __init__(self, log_queue: queue.Queue) -> None:
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
 
 
 _configured = False
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional[NonBlockingQueueHandler] = None
+_rate_limiter: Optional[RateLimitFilter] = None
+_lock = threading.Lock()
 
 
-def setup_logging(level: str = "INFO") -> None:
-    global _configured
-    if _configured:
-        return
-    _configured = True
+def setup_logging(
+    level: str = "INFO",
+    fmt: LogFormat = "text",
+    queue_size: int = 10000,
+    rate_limit: float = 20.0,
+    rate_burst: int = 50,
+) -> None:
+    """Route ``backend.*`` logs through a bounded queue to a background stdout writer."""
+    global _configured, _listener, _queue_handler, _rate_limiter
+    with _lock:
+        if _configured:
+            return
+        _configured = True
 
     numeric_level = getattr(logging, level.upper(), logging.INFO)
 
-    fmt = logging.Formatter(
-        fmt="%(asctime)s | %(levelname)-8s | %(name)-30s | %(message)s",
-        datefmt="%Y-%m-%d %H:%M:%S",
-    )
-
     handler = logging.StreamHandler(sys.stdout)
-    handler.setFormatter(fmt)
+    handler.setFormatter(JsonFormatter() if fmt == "json" else TextFormatter())
     handler.setLevel(numeric_level)
 
+    _rate_limiter = RateLimitFilter(rate=rate_limit, burst=rate_burst)
+    _queue_handler = NonBlockingQueueHandler(queue.Queue(maxsize=queue_size))
+    _queue_handler.addFilter(ContextFilter())
+    _queue_handler.addFilter(_rate_limiter)
+    _listener = QueueListener(_queue_handler.queue, handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
     root = logging.getLogger("backend")
     root.setLevel(numeric_level)
-    root.addHandler(handler)
+    root.addHandler(_queue_handler)
     root.propagate = False
 
 
+def shutdown_logging() -> None:
+    """Flush queued records and stop the writer thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def logging_stats() -> dict:
+    return {
+        "queued": _queue_handler.queue.qsize() if _queue_handler else 0,
+        "dropped_queue_full": _queue_handler.dropped if _queue_handler else 0,
+        "suppressed_rate_limited": _rate_limiter.suppressed if _rate_limiter else 0,
+    }
+
+
 def get_logger(name: str) -> logging.Logger:
     return logging.getLogger(f"backend.{name}")
@@ -1,86 +1,345 @@
 from __future__ import annotations
 
+import asyncio
+from bisect import bisect_right
+from dataclasses import dataclass, field
+
 from ..models.research import (
     ResearchPlan,
     SearchResult,
     ExtractedContent,
     Citation,
 )
+from ..tools.embeddings import VectorIndex, get_embedder
 from ..logging_config import get_logger
 
 logger = get_logger("memory.research_store")
 
 
+@dataclass(slots=True)
+class SearchRecord:
+    url: str
+    title: str
+    snippet: str
+
+
+@dataclass(slots=True)
+class SourceRecord:
+    sid: int
+    url: str
+    title: str
+    credibility: float
+    # Page opening, shown when a source has no facts
+    snippet: str
+    fact_ids: list[int] = field(default_factory=list)
+    version: int = 0
+
+
+@dataclass(slots=True)
+class FactRecord:
+    fid: int
+    text: str
+    # Back-references to every source that stated this fact
+    source_ids: list[int] = field(default_factory=list)
+    version: int = 0
+
+
+@dataclass(slots=True)
+class StoreDelta:
+    """Sources and facts added or changed after ``since`` (up to ``version``)."""
+
+    since: int
+    version: int
+    sources: list[SourceRecord]
+    facts: list[FactRecord]
+
+
+def _fact_key(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
 class ResearchStore:
-    """Session-scoped in-memory store shared across agents during a research run."""
+    """Session-scoped in-memory store shared across agents during a research run.
+
+    Sources are indexed by URL and facts live in a deduplicated table with back-references
+    to their sources. Every mutation bumps ``version`` and stamps the records it touched,
+    so readers can ask for just what changed since the version they last saw; stamps are
+    also appended to version-ordered change logs, so such deltas cost O(changes). Pydantic
+    models are only used at the edges (inputs from agents, citations out).
+    """
 
     def __init__(self) -> None:
         self.plan: ResearchPlan | None = None
-        self.search_results: list[SearchResult] = []
-        self.extracted_contents: list[ExtractedContent] = []
-        self.all_facts: list[str] = []
         self.cross_reference_results: dict[str, list[str]] = {}
+        self.version = 0
+
+        self._search: dict[str, SearchRecord] = {}
+        self._sources: dict[str, SourceRecord] = {}  # url -> record, insertion ordered
+        self._source_list: list[SourceRecord] = []  # sid -> record
+        self._facts: list[FactRecord] = []  # fid -> record
+        self._fact_ids: dict[str, int] = {}  # normalised text -> fid
+        self._live_facts = 0  # facts with at least one source
+        # (version, record) per stamp, in version order; a record reappears on each change
+        self._source_log: list[tuple[int, SourceRecord]] = []
+        self._fact_log: list[tuple[int, FactRecord]] = []
+
+        # Built on first search, in a worker thread: creating it may load an embedding model
+        self.fact_index: VectorIndex | None = None
+        self._indexed_facts = 0
+        self._index_lock = asyncio.Lock()
+        self._summary_cache: tuple[int, str] | None = None
+
+    # --- writers ---
+
+    def _bump(self) -> int:
+        self.version += 1
+        return self.version
+
+    def _stamp_source(self, record: SourceRecord, version: int) -> None:
+        record.version = version
+        self._source_log.append((version, record))
+
+    def _stamp_fact(self, fact: FactRecord, version: int) -> None:
+        fact.version = version
+        self._fact_log.append((version, fact))
 
     def set_plan(self, plan: ResearchPlan) -> None:
         self.plan = plan
-        logger.info(f"Plan stored: {len(plan.decomposed_questions)} sub-questions")
+        self._bump()
+        logger.info("Plan stored: %d sub-questions", len(plan.decomposed_questions))
 
     def add_search_results(self, results: list[SearchResult]) -> None:
         # Deduplicate by URL
-        existing_urls = {r.url for r in self.search_results}
-        new = [r for r in results if r.url not in existing_urls]
-        self.search_results.extend(new)
-        logger.info(f"Added {len(new)} search results (total: {len(self.search_results)})")
+        new = [r for r in results if r.url not in self._search]
+        for r in new:
+            self._search[r.url] = SearchRecord(r.url, r.title, r.snippet)
+        if new:
+            self._bump()
+        logger.info("Added %d search results (total: %d)", len(new), len(self._search))
 
     def add_extracted_content(self, contents: list[ExtractedContent]) -> None:
-        existing_urls = {c.url for c in self.extracted_contents}
-        new = [c for c in contents if c.url not in existing_urls]
-        self.extracted_contents.extend(new)
-        for c in new:
-            self.all_facts.extend(c.facts)
+        """Add new sources, or update facts/credibility of sources already stored."""
+        added = updated = 0
+        version = self.version + 1
+        for c in contents:
+            record = self._sources.get(c.url)
+            if record is None:
+                record = SourceRecord(
+                    sid=len(self._source_list),
+                    url=c.url,
+                    title=c.title,
+                    credibility=c.credibility_score,
+                    snippet=c.content[:500],
+                )
+                self._stamp_source(record, version)
+                self._sources[c.url] = record
+                self._source_list.append(record)
+                self._set_facts(record, c.facts, version)
+                added += 1
+            elif self._update_source(record, c, version):
+                updated += 1
+
+        if added or updated:
+            self._bump()
         logger.info(
-            f"Added {len(new)} extracted contents, {len(self.all_facts)} total facts"
+            "Added %d extracted contents, updated %d, %d total facts", added, updated, self._live_facts
         )
 
+    def _update_source(self, record: SourceRecord, content: ExtractedContent, version: int) -> bool:
+        changed = False
+        if content.credibility_score != record.credibility:
+            record.credibility = content.credibility_score
+            changed = True
+        current = [_fact_key(self._facts[i].text) for i in record.fact_ids]
+        if list(dict.fromkeys(map(_fact_key, content.facts))) != current:
+            self._set_facts(record, content.facts, version)
+            changed = True
+        if changed:
+            self._stamp_source(record, version)
+        return changed
+
+    def _set_facts(self, record: SourceRecord, facts: list[str], version: int) -> None:
+        for fid in record.fact_ids:
+            fact = self._facts[fid]
+            fact.source_ids.remove(record.sid)
+            if not fact.source_ids:
+                self._live_facts -= 1
+            self._stamp_fact(fact, version)
+        record.fact_ids = []
+
+        for text in facts:
+            key = _fact_key(text)
+            fid = self._fact_ids.get(key)
+            if fid is None:
+                fid = len(self._facts)
+                self._facts.append(FactRecord(fid=fid, text=text))
+                self._fact_ids[key] = fid
+            fact = self._facts[fid]
+            if record.sid not in fact.source_ids:
+                if not fact.source_ids:
+                    self._live_facts += 1
+                fact.source_ids.append(record.sid)
+                self._stamp_fact(fact, version)
+                record.fact_ids.append(fid)
+
     def set_cross_references(self, refs: dict[str, list[str]]) -> None:
         self.cross_reference_results = refs
+        self._bump()
+
+    # --- readers ---
+
+    @property
+    def all_facts(self) -> list[str]:
+        return [f.text for f in self._facts if f.source_ids]
+
+    @property
+    def fact_count(self) -> int:
+        """Number of facts still backed by at least one source."""
+        return self._live_facts
+
+    @property
+    def sources(self) -> list[SourceRecord]:
+        return self._source_list
+
+    def _sources_since(self, version: int) -> list[SourceRecord]:
+        if version <= 0:
+            return [s for s in self._source_list if s.version > version]
+        start = bisect_right(self._source_log, version, key=lambda entry: entry[0])
+        changed = {record.sid: record for _, record in self._source_log[start:]}
+        return [changed[sid] for sid in sorted(changed)]
+
+    def _facts_since(self, version: int) -> list[FactRecord]:
+        if version <= 0:
+            return [f for f in self._facts if f.version > version]
+        start = bisect_right(self._fact_log, version, key=lambda entry: entry[0])
+        changed = {fact.fid: fact for _, fact in self._fact_log[start:]}
+        return [changed[fid] for fid in sorted(changed)]
+
+    def changes_since(self, version: int) -> StoreDelta:
+        return StoreDelta(
+            since=version,
+            version=self.version,
+            sources=self._sources_since(version),
+            facts=self._facts_since(version),
+        )
+
+    def fact_sources(self, fid: int) -> list[str]:
+        return [self._source_list[sid].url for sid in self._facts[fid].source_ids]
+
+    def _search_index(
+        self, texts: list[str], fids: list[int], queries: list[str], k: int, min_score: float
+    ) -> list[list[tuple[int, float]]]:
+        # Runs in a worker thread: only touches the index and the arguments it was handed
+        if self.fact_index is None:
+            self.fact_index = VectorIndex(get_embedder())
+        self.fact_index.add(texts, fids)
+        k = k or max(len(self.fact_index), 1)
+        return [self.fact_index.search(query, k, min_score) for query in queries]
+
+    async def _query_facts(self, queries: list[str], k: int, min_score: float) -> list[list[tuple[int, float]]]:
+        """Embed facts added since the last search, then run ``queries`` (``k=0``: all facts).
+
+        Embedding runs off the event loop; the lock keeps concurrent searches from
+        indexing the same tail twice.
+        """
+        async with self._index_lock:
+            # Facts are append-only, so only the tail since the last search needs embedding
+            new = self._facts[self._indexed_facts:]
+            self._indexed_facts = len(self._facts)
+            return await asyncio.to_thread(
+                self._search_index, [f.text for f in new], [f.fid for f in new], queries, k, min_score
+            )
+
+    def _fact_hits(self, matches: list[tuple[int, float]], k: int) -> list[tuple[str, str, float]]:
+        hits = []
+        # Over-fetched: facts orphaned by a source update are skipped
+        for fid, score in matches:
+            fact = self._facts[fid]
+            if fact.source_ids:
+                hits.append((fact.text, self._source_list[fact.source_ids[0]].url, score))
+            if len(hits) == k:
+                break
+        return hits
+
+    async def search_facts(self, query: str, k: int = 5, min_score: float = 0.1) -> list[tuple[str, str, float]]:
+        """Facts most similar to ``query`` as (fact, first source url, score)."""
+        [matches] = await self._query_facts([query], k * 2, min_score)
+        return self._fact_hits(matches, k)
+
+    async def rank_sources(self, query: str) -> list[tuple[str, float]]:
+        """Source URLs ordered by their best fact's similarity to ``query``."""
+        [matches] = await self._query_facts([query], 0, 0.0)
+        best: dict[str, float] = {}
+        for fid, score in matches:
+            for sid in self._facts[fid].source_ids:
+                best.setdefault(self._source_list[sid].url, score)
+        return sorted(best.items(), key=lambda item: item[1], reverse=True)
+
+    def get_citations(self, since_version: int = 0) -> list[Citation]:
+        """Citations for all sources, or only those added/changed after ``since_version``."""
+        return [
+            Citation(
+                title=s.title,
+                url=s.url,
+                credibility_score=s.credibility,
+                relevant_claims=[self._facts[i].text for i in s.fact_ids[:3]],
+            )
+            for s in self._sources_since(since_version)
+        ]
+
+    async def get_context_summary(self, since_version: int = 0) -> str:
+        """Build a summary of all gathered research for the synthesizer.
+
+        With ``since_version`` only sources added or changed after that version are
+        listed. The full summary is cached until the store changes.
+        """
+        version = self.version
+        if since_version == 0 and self._summary_cache and self._summary_cache[0] == version:
+            return self._summary_cache[1]
 
-    def get_citations(self) -> list[Citation]:
-        citations = []
-        for content in self.extracted_contents:
-            citations.append(Citation(
-                title=content.title,
-                url=content.url,
-                credibility_score=content.credibility_score,
-                relevant_claims=content.facts[:3],
-            ))
-        return citations
-
-    def get_context_summary(self) -> str:
-        """Build a summary of all gathered research for the synthesizer."""
         parts = []
         if self.plan:
             parts.append(f"Original query: {self.plan.original_query}")
             parts.append(f"Sub-questions: {', '.join(self.plan.decomposed_questions)}")
 
-        parts.append(f"\nSources analyzed: {len(self.extracted_contents)}")
+        sources = self._sources_since(since_version)
+        if since_version:
+            parts.append(f"\nNew or updated sources since v{since_version}: {len(sources)}")
+        else:
+            parts.append(f"\nSources analyzed: {len(sources)}")
 
-        for i, content in enumerate(self.extracted_contents, 1):
-            parts.append(f"\n--- Source {i}: {content.title} ({content.url}) ---")
-            parts.append(f"Credibility: {content.credibility_score:.1f}")
-            if content.facts:
+        for i, source in enumerate(sources, 1):
+            parts.append(f"\n--- Source {source.sid + 1 if since_version else i}: {source.title} ({source.url}) ---")
+            parts.append(f"Credibility: {source.credibility:.1f}")
+            if source.fact_ids:
                 parts.append("Key facts:")
-                for fact in content.facts[:5]:
-                    parts.append(f"  - {fact}")
-            elif content.content:
-                parts.append(content.content[:500])
+                for fid in source.fact_ids[:5]:
+                    parts.append(f"  - {self._facts[fid].text}")
+            elif source.snippet:
+                parts.append(source.snippet)
+
+        if self.plan and self.plan.decomposed_questions and not since_version:
+            questions = self.plan.decomposed_questions
+            matches = await self._query_facts(questions, 6, 0.1)
+            findings = [(q, self._fact_hits(m, 3)) for q, m in zip(questions, matches)]
+            if any(hits for _, hits in findings):
+                parts.append("\n--- Most relevant findings per sub-question ---")
+                for question, hits in findings:
+                    if hits:
+                        parts.append(f"{question}")
+                        for fact, url, _ in hits:
+                            parts.append(f"  - {fact} ({url})")
 
         if self.cross_reference_results.get("corroborated"):
             parts.append("\n--- Corroborated findings (multiple sources) ---")
             for f in self.cross_reference_results["corroborated"][:5]:
                 parts.append(f"  * {f}")
 
-        return "\n".join(parts)
+        summary = "\n".join(parts)
+        if not since_version:
+            # Keyed by the version read before the search: a write while it ran invalidates it
+            self._summary_cache = (version, summary)
+        return summary
 
     def clear(self) -> None:
         self.__init__()
@@ -22,3 +22,7 @@ class ReflectionResult(BaseModel):
     critique: str = ""
     suggestions: list[str] = Field(default_factory=list)
     score: float = Field(default=0.0, ge=0.0, le=1.0)
+
+
+class ExtractedFacts(BaseModel):
+    facts: list[str] = Field(default_factory=list)
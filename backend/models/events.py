@@ -3,7 +3,7 @@ from __future__ import annotations
 from datetime import datetime, timezone
 from typing import Any, Literal, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 
 from .research import ResearchPlan, ResearchReport, SearchResult
 
@@ -26,11 +26,12 @@ class SSEEvent(BaseModel):
     event: EventType
     data: Any
     timestamp: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    # JSON body cached by streaming.serializer.encode_event
+    _encoded: Optional[bytes] = PrivateAttr(default=None)
 
     def to_sse(self) -> str:
-        import json
-        payload = self.model_dump(mode="json")
-        return f"data: {json.dumps(payload)}\n\n"
+        from ..streaming.serializer import encode_event
+        return f"data: {encode_event(self).decode()}\n\n"
 
 
 class StatusEvent(SSEEvent):
@@ -39,7 +40,7 @@ class StatusEvent(SSEEvent):
 
     @classmethod
     def create(cls, phase: str, progress: float, active_agent: str = "") -> StatusEvent:
-        return cls(data={"phase": phase, "progress": progress, "active_agent": active_agent})
+        return cls.model_construct(data={"phase": phase, "progress": progress, "active_agent": active_agent})
 
 
 class PlanEvent(SSEEvent):
@@ -47,7 +48,7 @@ class PlanEvent(SSEEvent):
 
     @classmethod
     def create(cls, plan: ResearchPlan) -> PlanEvent:
-        return cls(data=plan.model_dump())
+        return cls.model_construct(data=plan.model_dump())
 
 
 class AgentThinkingEvent(SSEEvent):
@@ -55,7 +56,7 @@ class AgentThinkingEvent(SSEEvent):
 
     @classmethod
     def create(cls, agent_name: str, thought: str, step: int = 0) -> AgentThinkingEvent:
-        return cls(data={"agent_name": agent_name, "thought": thought, "step": step})
+        return cls.model_construct(data={"agent_name": agent_name, "thought": thought, "step": step})
 
 
 class AgentActionEvent(SSEEvent):
@@ -63,7 +64,7 @@ class AgentActionEvent(SSEEvent):
 
     @classmethod
     def create(cls, agent_name: str, action: str, input_summary: str = "") -> AgentActionEvent:
-        return cls(data={"agent_name": agent_name, "action": action, "input_summary": input_summary})
+        return cls.model_construct(data={"agent_name": agent_name, "action": action, "input_summary": input_summary})
 
 
 class SearchResultsEvent(SSEEvent):
@@ -71,7 +72,10 @@ class SearchResultsEvent(SSEEvent):
 
     @classmethod
     def create(cls, results: list[SearchResult], query_used: str = "") -> SearchResultsEvent:
-        return cls(data={"results": [r.model_dump() for r in results], "query_used": query_used})
+        return cls.model_construct(data={
+            "results": [{"url": r.url, "title": r.title, "snippet": r.snippet} for r in results],
+            "query_used": query_used,
+        })
 
 
 class ReportEvent(SSEEvent):
@@ -79,7 +83,7 @@ class ReportEvent(SSEEvent):
 
     @classmethod
     def create(cls, report: ResearchReport) -> ReportEvent:
-        return cls(data=report.model_dump())
+        return cls.model_construct(data=report.model_dump())
 
 
 class ReflectionEvent(SSEEvent):
@@ -87,7 +91,7 @@ class ReflectionEvent(SSEEvent):
 
     @classmethod
     def create(cls, critique: str, suggestions: list[str], retry_number: int, score: float) -> ReflectionEvent:
-        return cls(data={
+        return cls.model_construct(data={
             "critique": critique,
             "suggestions": suggestions,
             "retry_number": retry_number,
@@ -100,9 +104,16 @@ class ErrorEvent(SSEEvent):
 
     @classmethod
     def create(cls, message: str, agent_name: str = "") -> ErrorEvent:
-        return cls(data={"message": message, "agent_name": agent_name})
+        return cls.model_construct(data={"message": message, "agent_name": agent_name})
 
 
 class DoneEvent(SSEEvent):
     event: Literal["done"] = "done"
     data: dict = Field(default_factory=lambda: {"status": "complete"})
+
+    @classmethod
+    def create(cls, status: str = "complete", usage: Optional[dict] = None, **extra: Any) -> DoneEvent:
+        data: dict = {"status": status, **extra}
+        if usage is not None:
+            data["usage"] = usage
+        return cls.model_construct(data=data)
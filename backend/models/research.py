@@ -24,6 +24,10 @@ class ExtractedContent(BaseModel):
     facts: list[str] = Field(default_factory=list)
     credibility_score: float = Field(default=0.5, ge=0.0, le=1.0)
     extraction_method: str = "firecrawl"
+    # (offset, length) of the full body in the run's PageSpill when only a preview is kept
+    spill_ref: Optional[tuple[int, int]] = Field(default=None, exclude=True)
+    # Fact-cache key of the full body, taken while it was in hand (required for spilled pages)
+    content_hash: Optional[str] = Field(default=None, exclude=True)
 
 
 class Citation(BaseModel):
@@ -41,6 +45,16 @@ class ResearchReport(BaseModel):
     methodology_note: str = ""
 
 
+class ReportDraft(BaseModel):
+    """The part of a ResearchReport the synthesizer asks the LLM for; citations come
+    from the store, so they stay out of the (strict) response schema."""
+
+    summary: str
+    key_findings: list[str] = Field(default_factory=list)
+    confidence_score: float = Field(default=0.5, ge=0.0, le=1.0)
+    methodology_note: str = ""
+
+
 class ResearchPlan(BaseModel):
     original_query: str
     decomposed_questions: list[str] = Field(default_factory=list)
@@ -0,0 +1,35 @@
+from .loop_lag import LoopLagMonitor, get_loop_lag_monitor
+from .metrics import (
+    Counter,
+    Histogram,
+    MetricFamily,
+    MetricsRegistry,
+    PhaseTimer,
+    current_agent,
+    get_metrics_registry,
+)
+from .profiling import ProfileSession, Profiler, get_profiler
+from .tracing import Span, Trace, Tracer, current_span, get_tracer, render_waterfall, span, start_span
+
+__all__ = [
+    "LoopLagMonitor",
+    "get_loop_lag_monitor",
+    "Counter",
+    "Histogram",
+    "MetricFamily",
+    "MetricsRegistry",
+    "PhaseTimer",
+    "current_agent",
+    "get_metrics_registry",
+    "ProfileSession",
+    "Profiler",
+    "get_profiler",
+    "Span",
+    "Trace",
+    "Tracer",
+    "current_span",
+    "get_tracer",
+    "render_waterfall",
+    "span",
+    "start_span",
+]
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+from typing import Iterator
+
+from ..logging_config import logging_stats
+from ..providers import get_cascade_stats, get_hedge_stats
+from ..resilience.circuit_breaker import get_breaker_snapshots
+from ..streaming.runs import get_run_manager
+from ..tools.embeddings import get_embedder
+from ..tools.fact_cache import get_fact_cache
+from ..tools.scrape_scheduler import get_scrape_scheduler
+from ..tools.text_processing import get_text_processor
+from .loop_lag import get_loop_lag_monitor
+from .metrics import MetricFamily
+
+_BREAKER_STATES = {"closed": 0, "half_open": 1, "open": 2}
+
+
+def breaker_metrics() -> Iterator[MetricFamily]:
+    snapshots = get_breaker_snapshots()
+    state = MetricFamily("circuit_breaker_state", "gauge", "0 = closed, 1 = half-open, 2 = open.", ("name",))
+    calls = MetricFamily("circuit_breaker_calls_total", "counter", "Calls through the breaker.", ("name",))
+    failures = MetricFamily("circuit_breaker_failures_total", "counter", "Calls that failed.", ("name",))
+    rejected = MetricFamily("circuit_breaker_rejected_total", "counter", "Calls rejected while open.", ("name",))
+    opened = MetricFamily("circuit_breaker_opened_total", "counter", "Times the breaker opened.", ("name",))
+    for s in snapshots:
+        state.add(_BREAKER_STATES.get(s["state"], 0), s["name"])
+        calls.add(s["total_calls"], s["name"])
+        failures.add(s["total_failures"], s["name"])
+        rejected.add(s["total_rejected"], s["name"])
+        opened.add(s["times_opened"], s["name"])
+    yield from (state, calls, failures, rejected, opened)
+
+
+def scheduler_metrics() -> Iterator[MetricFamily]:
+    stats = get_scrape_scheduler().stats()
+    yield MetricFamily("scrape_slots_active", "gauge", "Firecrawl requests holding a scheduler slot.").add(
+        stats["active"]
+    )
+    yield MetricFamily("scrape_slots_max", "gauge", "Global Firecrawl concurrency cap.").add(stats["max_concurrent"])
+    yield MetricFamily("scrape_queue_depth", "gauge", "Firecrawl requests waiting for a slot.").add(stats["queued"])
+    yield MetricFamily(
+        "scrape_queued_runs", "gauge", "Runs with at least one Firecrawl request waiting."
+    ).add(sum(1 for depth in stats["queued_by_run"].values() if depth))
+
+
+def cascade_metrics() -> Iterator[MetricFamily]:
+    calls = MetricFamily("llm_cascade_calls_total", "counter", "Calls started on the cheap model.", ("agent",))
+    escalations = MetricFamily(
+        "llm_cascade_escalations_total", "counter", "Calls escalated to the agent's model.", ("agent", "reason")
+    )
+    for agent, stats in sorted(get_cascade_stats().items()):
+        calls.add(stats["calls"], agent)
+        for reason, count in sorted(stats["reasons"].items()):
+            escalations.add(count, agent, reason)
+    yield from (calls, escalations)
+
+
+def hedge_metrics() -> Iterator[MetricFamily]:
+    stats = get_hedge_stats()
+    yield MetricFamily("llm_hedge_calls_total", "counter", "LLM calls eligible for hedging.").add(stats["calls"])
+    outcomes = MetricFamily("llm_hedges_total", "counter", "Hedge decisions by outcome.", ("outcome",))
+    outcomes.add(stats["hedges"], "issued")
+    outcomes.add(stats["backup_wins"], "backup_won")
+    outcomes.add(stats["budget_denied"], "budget_denied")
+    yield outcomes
+    if "budget" in stats:
+        yield MetricFamily("llm_hedge_budget_balance", "gauge", "Hedge tokens available.").add(
+            stats["budget"]["balance"]
+        )
+
+
+def run_metrics() -> Iterator[MetricFamily]:
+    stats = get_run_manager().stats()
+    runs = MetricFamily("research_runs", "gauge", "Research runs held by the run manager.", ("state",))
+    for state in ("running", "detached", "finished"):
+        runs.add(stats[state], state)
+    yield runs
+    yield MetricFamily("research_run_subscribers", "gauge", "Clients attached to runs.").add(stats["subscribers"])
+    yield MetricFamily(
+        "research_run_dropped_events", "gauge", "Low-priority events shed for slow clients (retained runs)."
+    ).add(stats["dropped_events"])
+    yield MetricFamily(
+        "research_run_stalled_subscribers", "gauge", "Clients disconnected for not reading (retained runs)."
+    ).add(stats["stalled_subscribers"])
+    yield MetricFamily(
+        "research_runs_orphan_cancelled_total", "counter", "Runs cancelled after losing every client."
+    ).add(stats["orphans_cancelled"])
+
+
+def loop_metrics() -> Iterator[MetricFamily]:
+    monitor = get_loop_lag_monitor()
+    yield MetricFamily("event_loop_lag_max_seconds", "gauge", "Worst event-loop lag seen.").add(monitor.max_lag)
+    yield MetricFamily("event_loop_stalls_total", "counter", "Lag samples over the stall threshold.").add(
+        monitor.stalls
+    )
+
+
+def worker_metrics() -> Iterator[MetricFamily]:
+    stats = get_text_processor().stats()
+    jobs = MetricFamily("text_processing_jobs_total", "counter", "Text processing jobs by where they ran.", ("where",))
+    jobs.add(stats["inline"], "inline").add(stats["offloaded"], "offloaded")
+    yield jobs
+    yield MetricFamily("text_processing_pool_failures_total", "counter", "Worker pool breakages.").add(
+        stats["pool_failures"]
+    )
+
+
+def cache_metrics() -> Iterator[MetricFamily]:
+    lookups = MetricFamily("cache_lookups_total", "counter", "Cache lookups by cache and result.", ("cache", "result"))
+    entries = MetricFamily("cache_entries", "gauge", "Entries held in memory.", ("cache",))
+
+    fact_cache = get_fact_cache()
+    if fact_cache is not None:
+        stats = fact_cache.stats()
+        lookups.add(stats["memory_hits"], "facts", "memory_hit")
+        lookups.add(stats["disk_hits"], "facts", "disk_hit")
+        lookups.add(stats["misses"], "facts", "miss")
+        entries.add(stats["entries"], "facts")
+
+    stats = get_embedder().stats()
+    lookups.add(stats["hits"], "embeddings", "hit").add(stats["misses"], "embeddings", "miss")
+    entries.add(stats["cached"], "embeddings")
+    yield from (lookups, entries)
+
+
+def logging_metrics() -> Iterator[MetricFamily]:
+    stats = logging_stats()
+    yield MetricFamily("log_queue_depth", "gauge", "Log records waiting for the writer thread.").add(stats["queued"])
+    dropped = MetricFamily("log_records_dropped_total", "counter", "Log records not written.", ("reason",))
+    dropped.add(stats["dropped_queue_full"], "queue_full").add(stats["suppressed_rate_limited"], "rate_limited")
+    yield dropped
+
+
+RUNTIME_COLLECTORS = (
+    breaker_metrics,
+    scheduler_metrics,
+    cascade_metrics,
+    hedge_metrics,
+    run_metrics,
+    loop_metrics,
+    worker_metrics,
+    cache_metrics,
+    logging_metrics,
+)
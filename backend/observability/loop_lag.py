@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from typing import Optional
+
+from ..config import get_settings
+from ..logging_config import get_logger
+from .metrics import LOOP_LAG_SECONDS
+
+logger = get_logger("observability.loop_lag")
+
+
+class LoopLagMonitor:
+    """Measures event-loop lag: how late a periodic sleep wakes up.
+
+    Anything that holds the loop (CPU-bound parsing, blocking I/O) shows up directly as
+    lag, and every open SSE stream is delayed by the same amount.
+    """
+
+    def __init__(self, interval: float = 0.5, window: int = 240, stall_threshold: float = 0.1) -> None:
+        self.interval = interval
+        self.stall_threshold = stall_threshold
+        self._samples: deque[float] = deque(maxlen=window)
+        self._task: Optional[asyncio.Task] = None
+        self.max_lag = 0.0
+        self.stalls = 0
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run(), name="loop-lag-monitor")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            self.record(max(loop.time() - start - self.interval, 0.0))
+
+    def record(self, lag: float) -> None:
+        self._samples.append(lag)
+        LOOP_LAG_SECONDS.observe(lag)
+        self.max_lag = max(self.max_lag, lag)
+        if lag >= self.stall_threshold:
+            self.stalls += 1
+            logger.debug("Event loop stalled for %.0fms", lag * 1000)
+
+    def percentile(self, q: float) -> float:
+        if not self._samples:
+            return 0.0
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def stats(self) -> dict:
+        samples = len(self._samples)
+        return {
+            "samples": samples,
+            "last_ms": round(self._samples[-1] * 1000, 2) if samples else 0.0,
+            "mean_ms": round(sum(self._samples) / samples * 1000, 2) if samples else 0.0,
+            "p99_ms": round(self.percentile(0.99) * 1000, 2),
+            "max_ms": round(self.max_lag * 1000, 2),
+            "stalls": self.stalls,
+        }
+
+
+_monitor: Optional[LoopLagMonitor] = None
+
+
+def get_loop_lag_monitor() -> LoopLagMonitor:
+    global _monitor
+    if _monitor is None:
+        _monitor = LoopLagMonitor(interval=get_settings().loop_lag_interval_seconds)
+    return _monitor
@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+import bisect
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, Optional, Sequence
+
+from ..logging_config import current_agent, current_run_id, get_logger
+from .profiling import enter_phase, leave_phase
+from .tracing import NOOP_SPAN, start_span
+
+logger = get_logger("observability.metrics")
+
+LabelValues = tuple[str, ...]
+
+# Seconds; covers sub-second cache hits through multi-minute synthesis
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)) + "}"
+
+
+@dataclass
+class MetricFamily:
+    """A metric family assembled at scrape time from some component's stats."""
+
+    name: str
+    type: str
+    help: str
+    labelnames: tuple[str, ...] = ()
+    samples: list[tuple[LabelValues, float]] = field(default_factory=list)
+
+    def add(self, value: float, *labels: str) -> MetricFamily:
+        self.samples.append((labels, value))
+        return self
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+        for labels, value in self.samples:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}")
+        return lines
+
+
+class Counter:
+    """Monotonic counter with labels."""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, *labels: str) -> None:
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> list[str]:
+        family = MetricFamily(self.name, "counter", self.help, self.labelnames)
+        for labels, value in sorted(self._values.items()):
+            family.add(value, *labels)
+        return family.render()
+
+
+class Histogram:
+    """Cumulative-bucket histogram with labels, rendered in Prometheus text format."""
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [per-bucket counts..., +Inf count], sum
+        self._counts: dict[LabelValues, list[int]] = {}
+        self._sums: dict[LabelValues, float] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        counts = self._counts.get(labels)
+        if counts is None:
+            counts = self._counts[labels] = [0] * (len(self.buckets) + 1)
+            self._sums[labels] = 0.0
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        self._sums[labels] += value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        names = self.labelnames + ("le",)
+        for labels, counts in sorted(self._counts.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(names, labels + (_format_value(bound),))} {cumulative}"
+                )
+            suffix = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{suffix} {_format_value(self._sums[labels])}")
+            lines.append(f"{self.name}_count{suffix} {cumulative}")
+        return lines
+
+
+class PhaseTimer:
+    """Times consecutive pipeline phases: entering a phase ends the previous one.
+
+    Each phase is also a trace span, so work done during it nests under the phase,
+    and is published to the profiler so stack samples can be tagged with it.
+    """
+
+    def __init__(self, histogram: Histogram) -> None:
+        self.histogram = histogram
+        self._run_id = ""
+        self._phase: Optional[str] = None
+        self._started = 0.0
+        self._span = NOOP_SPAN
+
+    @property
+    def phase(self) -> Optional[str]:
+        return self._phase
+
+    def enter(self, phase: str) -> None:
+        self.finish()
+        self._phase = phase
+        self._started = time.monotonic()
+        self._span = start_span(f"phase.{phase}")
+        self._run_id = current_run_id.get()
+        enter_phase(self._run_id, phase)
+
+    def finish(self, error: Optional[BaseException] = None) -> None:
+        if self._phase is not None:
+            self.histogram.observe(time.monotonic() - self._started, self._phase)
+            self._span.end(error)
+            self._span = NOOP_SPAN
+            self._phase = None
+            leave_phase(self._run_id)
+
+
+Collector = Callable[[], Iterable[MetricFamily]]
+
+
+class MetricsRegistry:
+    """Instruments updated as work happens, plus collectors that turn component
+    stats (breakers, queues, caches) into gauges when scraped."""
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, Counter | Histogram] = {}
+        self._collectors: list[Collector] = []
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        metric = self._metrics.setdefault(name, Counter(name, help, labelnames))
+        assert isinstance(metric, Counter)
+        return metric
+
+    def histogram(
+        self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        metric = self._metrics.setdefault(name, Histogram(name, help, labelnames, buckets))
+        assert isinstance(metric, Histogram)
+        return metric
+
+    def register_collector(self, collector: Collector) -> None:
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        for collector in self._collectors:
+            try:
+                for family in collector():
+                    lines.extend(family.render())
+            except Exception as e:
+                logger.warning("Metrics collector %s failed: %s", getattr(collector, "__name__", collector), e)
+        return "\n".join(lines) + "\n"
+
+
+_registry = MetricsRegistry()
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    return _registry
+
+
+PHASE_SECONDS = _registry.histogram(
+    "research_phase_duration_seconds",
+    "Wall time of each Supervisor phase.",
+    ("phase",),
+)
+LLM_CALL_SECONDS = _registry.histogram(
+    "llm_call_duration_seconds",
+    "Latency of successful LLM API calls.",
+    ("agent", "provider", "model"),
+)
+LLM_TOKENS = _registry.counter(
+    "llm_tokens_total",
+    "LLM tokens by agent and model; type is input, output, cached_input or cache_write.",
+    ("agent", "provider", "model", "type"),
+)
+LLM_COST_USD = _registry.counter(
+    "llm_cost_usd_total",
+    "Estimated LLM spend in USD from the configured price table.",
+    ("agent", "provider", "model"),
+)
+FIRECRAWL_REQUEST_SECONDS = _registry.histogram(
+    "firecrawl_request_duration_seconds",
+    "Latency of Firecrawl API requests (excluding scheduler queueing).",
+    ("endpoint", "outcome"),
+)
+LOOP_LAG_SECONDS = _registry.histogram(
+    "event_loop_lag_seconds",
+    "How late the event loop woke a periodic sleep.",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
@@ -0,0 +1,403 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import secrets
+import sys
+import threading
+import time
+import tracemalloc
+import weakref
+from collections import Counter, OrderedDict
+from typing import Any, Optional
+
+from ..config import get_settings
+from ..logging_config import current_run_id, get_logger
+
+logger = get_logger("observability.profiling")
+
+# run_id -> phase the run is in, kept by PhaseTimer
+_run_phases: dict[str, str] = {}
+# task -> run_id it works for, filled by the task factory and PhaseTimer
+_task_runs: weakref.WeakKeyDictionary[asyncio.Task, str] = weakref.WeakKeyDictionary()
+# loop -> task running on it right now; private to asyncio, so an empty dict (every
+# sample unattributed) if a future Python moves it
+_current_tasks: dict = getattr(asyncio.tasks, "_current_tasks", {})
+
+
+def enter_phase(run_id: str, phase: str) -> None:
+    """Record the run's phase and tie the calling task to the run."""
+    if not run_id:
+        return
+    _run_phases[run_id] = phase
+    try:
+        task = asyncio.current_task()
+    except RuntimeError:
+        task = None
+    if task is not None:
+        _task_runs[task] = run_id
+
+
+def leave_phase(run_id: str) -> None:
+    _run_phases.pop(run_id, None)
+
+
+def _task_factory(loop: asyncio.AbstractEventLoop, coro: Any, **kwargs: Any) -> asyncio.Task:
+    # Called in the creating task's context, so children inherit its run
+    task = asyncio.Task(coro, loop=loop, **kwargs)
+    context = kwargs.get("context")
+    run_id = context.get(current_run_id, "") if context is not None else current_run_id.get()
+    if run_id:
+        _task_runs[task] = run_id
+    return task
+
+
+# --- frame labels ---
+
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) + os.sep
+_labels: dict[Any, str] = {}
+
+
+def _short_path(filename: str) -> str:
+    if filename.startswith(_PROJECT_ROOT):
+        return filename[len(_PROJECT_ROOT):]
+    marker = "site-packages" + os.sep
+    index = filename.rfind(marker)
+    if index >= 0:
+        return filename[index + len(marker):]
+    return os.path.basename(filename)
+
+
+def _frame_label(code: Any) -> str:
+    label = _labels.get(code)
+    if label is None:
+        label = _labels[code] = f"{_short_path(code.co_filename)}:{getattr(code, 'co_qualname', code.co_name)}"
+    return label
+
+
+# Everything from here up is event-loop machinery shared by every callback
+_HANDLE_RUN = asyncio.events.Handle._run.__code__
+
+
+def _stack_labels(frame: Any, limit: int = 128) -> list[str]:
+    """Labels of ``frame`` and its callers up to the loop callback, outermost first."""
+    labels = []
+    while frame is not None and frame.f_code is not _HANDLE_RUN and len(labels) < limit:
+        labels.append(_frame_label(frame.f_code))
+        frame = frame.f_back
+    labels.reverse()
+    return labels
+
+
+def _await_chain(coro: Any, limit: int = 64) -> list[tuple[str, int]]:
+    """(label, line) of each coroutine in a suspended await chain, outermost first."""
+    chain = []
+    while coro is not None and len(chain) < limit:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None) or getattr(coro, "ag_frame", None)
+        if frame is None:
+            break
+        chain.append((_frame_label(frame.f_code), frame.f_lineno))
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None) or getattr(coro, "ag_await", None)
+    return chain
+
+
+def _collapsed(stacks: Counter[str]) -> str:
+    """Brendan Gregg's collapsed format (``frame;frame;frame count``), for
+    flamegraph.pl, speedscope or inferno."""
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+# --- sessions ---
+
+class ProfileSession:
+    """One profiling window, optionally limited to a single run.
+
+    A background thread samples the event-loop thread's Python stack every
+    ``interval`` seconds and attributes each sample to the run of the task that was
+    executing, rooted at ``phase:<phase>``. Only time spent holding the loop shows up
+    here; for where tasks are waiting, see ``Profiler.dump_tasks``. With ``memory``,
+    tracemalloc snapshots taken at the start and end are diffed (process-wide).
+    """
+
+    def __init__(
+        self,
+        profiler: Profiler,
+        loop: asyncio.AbstractEventLoop,
+        run_id: str = "",
+        duration: float = 30.0,
+        interval: float = 0.01,
+        memory: bool = False,
+    ) -> None:
+        self.profiler = profiler
+        self.session_id = secrets.token_hex(6)
+        self.loop = loop
+        self.loop_thread_id = threading.get_ident()
+        self.run_id = run_id
+        self.duration = duration
+        self.interval = interval
+        self.memory = memory
+        self.stacks: Counter[str] = Counter()
+        self.by_phase: Counter[str] = Counter()
+        self.samples = 0
+        self.idle_samples = 0
+        self.other_samples = 0
+        self.started_at = time.time()
+        self.ended_at: Optional[float] = None
+        self.error = ""
+        # Held by the sampler while it updates the counters, and by readers copying them
+        self._lock = threading.Lock()
+        self._memory_start: Optional[tracemalloc.Snapshot] = None
+        self._memory_diff: list[tracemalloc.StatisticDiff] = []
+        self._memory_stacks: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"profiler-{self.session_id}", daemon=True)
+
+    @property
+    def running(self) -> bool:
+        return self.ended_at is None
+
+    def start(self) -> None:
+        if self.memory:
+            self.profiler._acquire_tracemalloc()
+            self._memory_start = tracemalloc.take_snapshot()
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        self._thread.join(timeout)
+
+    def _run(self) -> None:
+        deadline = time.monotonic() + self.duration
+        try:
+            while not self._stop.wait(self.interval) and time.monotonic() < deadline:
+                self._sample()
+        except Exception as e:
+            self.error = f"{type(e).__name__}: {e}"
+            logger.warning("Profiler session %s failed: %s", self.session_id, e)
+        finally:
+            if self.memory:
+                self._finish_memory()
+            self.ended_at = time.time()
+
+    def _sample(self) -> None:
+        frame = sys._current_frames().get(self.loop_thread_id)
+        if frame is None:
+            return
+        task = _current_tasks.get(self.loop)
+        if task is None and frame.f_code.co_filename.endswith("selectors.py"):
+            # Waiting in select(): the loop is idle
+            self.idle_samples += 1
+            return
+        run_id = _task_runs.get(task, "") if task is not None else ""
+        if self.run_id and run_id != self.run_id:
+            self.other_samples += 1
+            return
+        if task is None:
+            phase = "loop"
+        else:
+            phase = _run_phases.get(run_id, "none") if run_id else "none"
+        stack = ";".join([f"phase:{phase}", *_stack_labels(frame)])
+        with self._lock:
+            self.samples += 1
+            self.by_phase[phase] += 1
+            self.stacks[stack] += 1
+
+    def _finish_memory(self) -> None:
+        try:
+            ignore = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+            end = tracemalloc.take_snapshot().filter_traces(ignore)
+            start = self._memory_start.filter_traces(ignore)
+            self._memory_diff = end.compare_to(start, "lineno")
+            for stat in end.compare_to(start, "traceback"):
+                if stat.size_diff > 0:
+                    frames = ";".join(f"{_short_path(f.filename)}:{f.lineno}" for f in stat.traceback)
+                    self._memory_stacks[frames] += stat.size_diff
+        finally:
+            self._memory_start = None
+            self.profiler._release_tracemalloc()
+
+    def collapsed(self, kind: str = "cpu") -> str:
+        """CPU samples per stack, or bytes allocated (and still held) per stack."""
+        if kind == "memory":
+            return _collapsed(self._memory_stacks)
+        with self._lock:
+            stacks = self.stacks.copy()
+        return _collapsed(stacks)
+
+    def top_functions(self, n: int = 20) -> list[dict]:
+        with self._lock:
+            stacks = list(self.stacks.items())
+        self_samples: Counter[str] = Counter()
+        for stack, count in stacks:
+            self_samples[stack.rsplit(";", 1)[-1]] += count
+        return [{"function": fn, "samples": count} for fn, count in self_samples.most_common(n)]
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            by_phase = self.by_phase.copy()
+        total = self.samples + self.idle_samples + self.other_samples
+        data = {
+            "session_id": self.session_id,
+            "run_id": self.run_id or None,
+            "status": "running" if self.running else "finished",
+            "error": self.error or None,
+            "started_at": self.started_at,
+            "elapsed_seconds": round((self.ended_at or time.time()) - self.started_at, 3),
+            "duration_seconds": self.duration,
+            "interval_ms": round(self.interval * 1000, 3),
+            "samples": self.samples,
+            "idle_samples": self.idle_samples,
+            "other_run_samples": self.other_samples,
+            "loop_busy_ratio": round((total - self.idle_samples) / total, 3) if total else 0.0,
+            "by_phase": dict(by_phase.most_common()),
+            "top_functions": self.top_functions(),
+        }
+        if self.memory:
+            data["memory"] = [
+                {
+                    "where": f"{_short_path(stat.traceback[0].filename)}:{stat.traceback[0].lineno}",
+                    "size_diff_kb": round(stat.size_diff / 1024, 1),
+                    "count_diff": stat.count_diff,
+                }
+                for stat in self._memory_diff[:20]
+            ]
+        return data
+
+
+class Profiler:
+    """On-demand profiling of the live server: stack sampling and tracemalloc
+    sessions, plus asyncio task dumps, all attributable to research runs."""
+
+    def __init__(
+        self,
+        default_interval: float = 0.01,
+        max_seconds: float = 300.0,
+        max_active: int = 2,
+        retain: int = 10,
+        tracemalloc_frames: int = 10,
+    ) -> None:
+        self.default_interval = default_interval
+        self.max_seconds = max_seconds
+        self.max_active = max_active
+        self.retain = retain
+        self.tracemalloc_frames = tracemalloc_frames
+        self._sessions: OrderedDict[str, ProfileSession] = OrderedDict()
+        self._lock = threading.Lock()
+        self._tracemalloc_users = 0
+        self._started_tracemalloc = False
+
+    def install(self, loop: Optional[asyncio.AbstractEventLoop] = None) -> None:
+        """Install the task factory that ties new tasks to the run that created them."""
+        loop = loop or asyncio.get_running_loop()
+        factory = loop.get_task_factory()
+        if factory is None:
+            loop.set_task_factory(_task_factory)
+        elif factory is not _task_factory:
+            logger.warning("Event loop already has a task factory; profiles will only attribute run tasks")
+
+    def start(
+        self,
+        run_id: str = "",
+        duration: float = 30.0,
+        interval: Optional[float] = None,
+        memory: bool = False,
+    ) -> ProfileSession:
+        """Start a session sampling the calling event loop. Raises ValueError when too
+        many sessions are already running."""
+        if sum(1 for s in self._sessions.values() if s.running) >= self.max_active:
+            raise ValueError(f"At most {self.max_active} profiling sessions may run at once")
+        session = ProfileSession(
+            self,
+            asyncio.get_running_loop(),
+            run_id=run_id,
+            duration=min(duration, self.max_seconds),
+            interval=max(interval or self.default_interval, 0.001),
+            memory=memory,
+        )
+        session.start()
+        self._sessions[session.session_id] = session
+        while len(self._sessions) > self.retain:
+            oldest = next(iter(self._sessions))
+            if self._sessions[oldest].running:
+                break
+            del self._sessions[oldest]
+        logger.info(
+            "Profiling session %s started (run=%s, %.0fs, memory=%s)",
+            session.session_id, run_id or "all", session.duration, memory,
+        )
+        return session
+
+    def get(self, session_id: str) -> Optional[ProfileSession]:
+        return self._sessions.get(session_id)
+
+    def sessions(self) -> list[ProfileSession]:
+        return list(self._sessions.values())
+
+    def stop_all(self) -> None:
+        for session in self._sessions.values():
+            session.stop()
+
+    def _acquire_tracemalloc(self) -> None:
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(self.tracemalloc_frames)
+                self._started_tracemalloc = True
+            self._tracemalloc_users += 1
+
+    def _release_tracemalloc(self) -> None:
+        with self._lock:
+            self._tracemalloc_users -= 1
+            # Leave tracemalloc alone if something else (PYTHONTRACEMALLOC) started it
+            if self._tracemalloc_users == 0 and self._started_tracemalloc:
+                tracemalloc.stop()
+                self._started_tracemalloc = False
+
+    def dump_tasks(self, run_id: str = "") -> list[dict]:
+        """Every pending task on the running loop with its await chain and what it is
+        blocked on. Must be called from the loop."""
+        tasks = []
+        for task in asyncio.all_tasks():
+            task_run = _task_runs.get(task, "")
+            if run_id and task_run != run_id:
+                continue
+            waiter = getattr(task, "_fut_waiter", None)
+            tasks.append({
+                "name": task.get_name(),
+                "run_id": task_run or None,
+                "phase": _run_phases.get(task_run) if task_run else None,
+                "stack": [f"{label}:{line}" for label, line in _await_chain(task.get_coro())],
+                "waiting_on": repr(waiter)[:200] if waiter is not None else None,
+            })
+        tasks.sort(key=lambda t: (t["run_id"] or "", t["name"]))
+        return tasks
+
+    def collapsed_tasks(self, run_id: str = "") -> str:
+        """Pending tasks per await chain, as collapsed stacks."""
+        stacks: Counter[str] = Counter()
+        for task in asyncio.all_tasks():
+            task_run = _task_runs.get(task, "")
+            if run_id and task_run != run_id:
+                continue
+            phase = _run_phases.get(task_run, "none") if task_run else "none"
+            chain = [label for label, _ in _await_chain(task.get_coro())]
+            stacks[";".join([f"phase:{phase}", *chain])] += 1
+        return _collapsed(stacks)
+
+
+_profiler: Optional[Profiler] = None
+
+
+def get_profiler() -> Profiler:
+    global _profiler
+    if _profiler is None:
+        settings = get_settings()
+        _profiler = Profiler(
+            default_interval=settings.profile_sample_interval_ms / 1000,
+            max_seconds=settings.profile_max_seconds,
+            max_active=settings.profile_max_active_sessions,
+            retain=settings.profile_retain_sessions,
+            tracemalloc_frames=settings.profile_tracemalloc_frames,
+        )
+    return _profiler
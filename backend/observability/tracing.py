@@ -0,0 +1,356 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import secrets
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+from typing import Any, Optional
+
+import httpx
+
+from ..config import get_settings
+from ..logging_config import get_logger
+
+logger = get_logger("observability.tracing")
+
+AttributeValue = str | int | float | bool
+
+
+class Span:
+    """One timed operation in a run's trace. Ending a span makes its parent current again."""
+
+    __slots__ = ("trace", "name", "span_id", "parent", "start_ns", "end_ns", "attributes", "status", "error")
+
+    def __init__(self, trace: Trace, name: str, parent: Optional[Span], attributes: dict[str, AttributeValue]) -> None:
+        self.trace = trace
+        self.name = name
+        self.span_id = secrets.token_hex(8)
+        self.parent = parent
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes = attributes
+        self.status = "ok"
+        self.error = ""
+
+    @property
+    def parent_id(self) -> Optional[str]:
+        return self.parent.span_id if self.parent is not None else None
+
+    def set(self, **attributes: Any) -> Span:
+        for key, value in attributes.items():
+            if value is not None:
+                self.attributes[key] = value if isinstance(value, (str, int, float, bool)) else str(value)
+        return self
+
+    def end(self, error: Optional[BaseException] = None) -> None:
+        if self.end_ns is not None:
+            return
+        self.end_ns = time.time_ns()
+        if isinstance(error, (asyncio.CancelledError, GeneratorExit)):
+            self.status = "cancelled"
+        elif error is not None:
+            self.status = "error"
+            self.error = f"{type(error).__name__}: {error}"[:500]
+        if _current_span.get() is self:
+            _current_span.set(self.parent)
+
+
+class _NoopSpan:
+    """Stands in for a span when no trace is active, so call sites need no checks."""
+
+    span_id = ""
+    attributes: dict = {}
+
+    def set(self, **attributes: Any) -> _NoopSpan:
+        return self
+
+    def end(self, error: Optional[BaseException] = None) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+class Trace:
+    """All spans of one research run, capped at ``max_spans``."""
+
+    def __init__(self, run_id: str, max_spans: int = 2000) -> None:
+        self.run_id = run_id
+        self.trace_id = secrets.token_hex(16)
+        self.max_spans = max_spans
+        self.spans: list[Span] = []
+        self.dropped = 0
+
+    def _add(self, span: Span) -> bool:
+        if len(self.spans) >= self.max_spans:
+            self.dropped += 1
+            return False
+        self.spans.append(span)
+        return True
+
+    @property
+    def root(self) -> Optional[Span]:
+        return self.spans[0] if self.spans else None
+
+    def waterfall(self) -> list[dict]:
+        """Spans in start order with their depth and offsets from the root, in ms.
+
+        Spans still running are reported up to now with status ``running``.
+        """
+        if not self.spans:
+            return []
+        origin = self.spans[0].start_ns
+        now = time.time_ns()
+        depth: dict[str, int] = {}
+        rows = []
+        for span in sorted(self.spans, key=lambda s: s.start_ns):
+            depth[span.span_id] = depth.get(span.parent_id, -1) + 1 if span.parent_id else 0
+            rows.append({
+                "name": span.name,
+                "span_id": span.span_id,
+                "parent_id": span.parent_id,
+                "depth": depth[span.span_id],
+                "start_ms": round((span.start_ns - origin) / 1e6, 2),
+                "duration_ms": round(((span.end_ns or now) - span.start_ns) / 1e6, 2),
+                "status": span.status if span.end_ns is not None else "running",
+                "error": span.error or None,
+                "attributes": dict(span.attributes),
+            })
+        return rows
+
+    def to_dict(self) -> dict:
+        return {
+            "run_id": self.run_id,
+            "trace_id": self.trace_id,
+            "dropped_spans": self.dropped,
+            "spans": self.waterfall(),
+        }
+
+
+def render_waterfall(trace: Trace, width: int = 60) -> str:
+    """Plain-text waterfall: one line per span with a bar on a shared time axis."""
+    rows = trace.waterfall()
+    if not rows:
+        return ""
+    total = max(r["start_ms"] + r["duration_ms"] for r in rows) or 1.0
+    label_width = min(max(2 * r["depth"] + len(r["name"]) for r in rows), 48)
+    lines = [f"trace {trace.trace_id} run {trace.run_id} ({total:.0f} ms)"]
+    for r in rows:
+        start = int(r["start_ms"] / total * width)
+        length = max(1, int(r["duration_ms"] / total * width))
+        bar = " " * start + ("#" if r["status"] == "ok" else "!") * min(length, width - start)
+        label = ("  " * r["depth"] + r["name"])[:label_width]
+        lines.append(f"{label:<{label_width}} |{bar:<{width}}| {r['duration_ms']:>9.1f} ms")
+    return "\n".join(lines)
+
+
+class _SpanScope:
+    """``with span(...)`` / ``async with span(...)``: starts on enter, ends on exit."""
+
+    __slots__ = ("name", "attributes", "span")
+
+    def __init__(self, name: str, attributes: dict[str, Any]) -> None:
+        self.name = name
+        self.attributes = attributes
+        self.span: Span | _NoopSpan = NOOP_SPAN
+
+    def __enter__(self) -> Span | _NoopSpan:
+        self.span = start_span(self.name, **self.attributes)
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.span.end(exc)
+
+    async def __aenter__(self) -> Span | _NoopSpan:
+        return self.__enter__()
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        self.__exit__(exc_type, exc, tb)
+
+
+def current_span() -> Span | _NoopSpan:
+    return _current_span.get() or NOOP_SPAN
+
+
+def start_span(name: str, **attributes: Any) -> Span | _NoopSpan:
+    """Start a child of the current span and make it current. A no-op outside a trace.
+
+    Tasks created while a span is current inherit it as their parent.
+    """
+    parent = _current_span.get()
+    if parent is None:
+        return NOOP_SPAN
+    span = Span(parent.trace, name, parent, {})
+    if not parent.trace._add(span):
+        return NOOP_SPAN
+    span.set(**attributes)
+    _current_span.set(span)
+    return span
+
+
+def span(name: str, **attributes: Any) -> _SpanScope:
+    return _SpanScope(name, attributes)
+
+
+# --- exporters ---
+
+class TraceExporter(ABC):
+    @abstractmethod
+    def export(self, trace: Trace) -> None:
+        """Ship one finished trace; called from the tracer's export thread."""
+
+
+class JsonFileExporter(TraceExporter):
+    """Appends one JSON line per finished trace."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, trace: Trace) -> None:
+        line = json.dumps(trace.to_dict(), default=str)
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+def _otlp_value(value: AttributeValue) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class OtlpHttpExporter(TraceExporter):
+    """Posts traces as OTLP/HTTP JSON to ``{endpoint}/v1/traces`` (collector, Jaeger, Tempo...)."""
+
+    _STATUS_CODES = {"ok": 1, "error": 2, "cancelled": 2}
+
+    def __init__(self, endpoint: str, service_name: str = "research-agent", timeout: float = 5.0) -> None:
+        self.url = endpoint.rstrip("/") + "/v1/traces"
+        self.service_name = service_name
+        self.timeout = timeout
+
+    def payload(self, trace: Trace) -> dict:
+        spans = []
+        for s in trace.spans:
+            spans.append({
+                "traceId": trace.trace_id,
+                "spanId": s.span_id,
+                "parentSpanId": s.parent_id or "",
+                "name": s.name,
+                "kind": 1,
+                "startTimeUnixNano": str(s.start_ns),
+                "endTimeUnixNano": str(s.end_ns or time.time_ns()),
+                "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in s.attributes.items()],
+                "status": {"code": self._STATUS_CODES.get(s.status, 0), "message": s.error},
+            })
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": [
+                    {"key": "service.name", "value": {"stringValue": self.service_name}},
+                ]},
+                "scopeSpans": [{"scope": {"name": "backend.observability.tracing"}, "spans": spans}],
+            }]
+        }
+
+    def export(self, trace: Trace) -> None:
+        httpx.post(self.url, json=self.payload(trace), timeout=self.timeout).raise_for_status()
+
+
+# --- run traces ---
+
+class Tracer:
+    """Starts and finishes per-run traces, keeps recent ones for the waterfall endpoint
+    and hands finished ones to the exporter off the event loop."""
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        exporter: Optional[TraceExporter] = None,
+        max_spans: int = 2000,
+        retain: int = 100,
+    ) -> None:
+        self.enabled = enabled
+        self.exporter = exporter
+        self.max_spans = max_spans
+        self.retain = retain
+        self._traces: OrderedDict[str, Trace] = OrderedDict()
+        self.export_failures = 0
+        # Exports get their own thread so a slow collector never ties up the default
+        # executor that asyncio.to_thread work shares
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="trace-export")
+        return self._executor
+
+    def start_trace(self, run_id: str, name: str = "research", **attributes: Any) -> Span | _NoopSpan:
+        """Begin a run's trace with a root span and make it current."""
+        if not self.enabled:
+            return NOOP_SPAN
+        trace = Trace(run_id, self.max_spans)
+        root = Span(trace, name, None, {})
+        trace._add(root)
+        root.set(run_id=run_id, **attributes)
+        _current_span.set(root)
+        self._traces[run_id] = trace
+        while len(self._traces) > self.retain:
+            self._traces.popitem(last=False)
+        return root
+
+    def finish_trace(self, root: Span | _NoopSpan, error: Optional[BaseException] = None) -> None:
+        if not isinstance(root, Span):
+            return
+        for s in root.trace.spans:
+            # Spans left open by cancelled work end with the run
+            if s.end_ns is None and s is not root:
+                s.end(asyncio.CancelledError())
+        root.end(error)
+        _current_span.set(None)
+        if self.exporter is not None:
+            try:
+                asyncio.get_running_loop().run_in_executor(self._get_executor(), self._export, root.trace)
+            except RuntimeError:
+                self._export(root.trace)
+
+    def _export(self, trace: Trace) -> None:
+        try:
+            self.exporter.export(trace)
+        except Exception as e:
+            self.export_failures += 1
+            logger.warning("Trace export for run %s failed: %s", trace.run_id, e)
+
+    def get(self, run_id: str) -> Optional[Trace]:
+        return self._traces.get(run_id)
+
+
+_tracer: Optional[Tracer] = None
+
+
+def get_tracer() -> Tracer:
+    global _tracer
+    if _tracer is None:
+        settings = get_settings()
+        exporter: Optional[TraceExporter] = None
+        if settings.tracing_exporter == "json":
+            exporter = JsonFileExporter(settings.tracing_json_path)
+        elif settings.tracing_exporter == "otlp":
+            exporter = OtlpHttpExporter(settings.tracing_otlp_endpoint, settings.tracing_service_name)
+        _tracer = Tracer(
+            enabled=settings.tracing_enabled,
+            exporter=exporter,
+            max_spans=settings.tracing_max_spans,
+            retain=settings.tracing_retain_traces,
+        )
+    return _tracer
@@ -1,10 +1,36 @@
-from .base import LLMProvider, LLMProviderError, LLMRateLimitError
-from .registry import get_provider, get_provider_for_agent
+from .base import LLMProvider, LLMProviderError, LLMRateLimitError, LLMServerError
+from .hedging import get_hedge_stats
+from .usage import (
+    BudgetExhaustedError,
+    RunBudget,
+    RunUsage,
+    TokenUsage,
+    check_run_budget,
+    get_usage_totals,
+    run_budget_state,
+    track_run_usage,
+)
+from .pricing import ModelPrice, PriceTable, get_price_table
+from .registry import get_provider, get_provider_for_agent, get_cascade_stats
 
 __all__ = [
     "LLMProvider",
     "LLMProviderError",
     "LLMRateLimitError",
+    "LLMServerError",
     "get_provider",
     "get_provider_for_agent",
+    "get_cascade_stats",
+    "get_hedge_stats",
+    "TokenUsage",
+    "get_usage_totals",
+    "RunUsage",
+    "RunBudget",
+    "track_run_usage",
+    "run_budget_state",
+    "check_run_budget",
+    "BudgetExhaustedError",
+    "ModelPrice",
+    "PriceTable",
+    "get_price_table",
 ]
@@ -1,11 +1,22 @@
 from __future__ import annotations
 
-import json
-from typing import TypeVar
+import time
+from typing import Any, TypeVar
 
 from pydantic import BaseModel
 
-from .base import LLMProvider, LLMProviderError, LLMRateLimitError, LLMContextLengthError
+from .base import (
+    LLMProvider,
+    LLMProviderError,
+    LLMRateLimitError,
+    LLMContextLengthError,
+    LLMServerError,
+    compiled_schema,
+    is_transient_error,
+)
+from .usage import anthropic_usage, record_usage
+from ..observability.tracing import span
+from ..resilience.retry import retry_after_seconds
 from ..logging_config import get_logger
 
 T = TypeVar("T", bound=BaseModel)
@@ -15,42 +26,72 @@ logger = get_logger("providers.anthropic")
 class AnthropicProvider(LLMProvider):
     name = "anthropic"
 
-    def __init__(self, api_key: str) -> None:
+    def __init__(
+        self,
+        api_key: str,
+        prompt_cache: bool = True,
+        structured_mode: str = "native",
+        max_retries: int = 2,
+    ) -> None:
         from anthropic import AsyncAnthropic
-        self._client = AsyncAnthropic(api_key=api_key)
+        self._client = AsyncAnthropic(api_key=api_key, max_retries=max_retries)
+        self.prompt_cache = prompt_cache
+        self.structured_mode = structured_mode
 
-    async def complete(
+    def _system_blocks(self, system_parts: list[str]) -> list[dict]:
+        """System prompt as text blocks, with a cache breakpoint after the static prefix."""
+        blocks: list[dict] = [{"type": "text", "text": part} for part in system_parts]
+        if self.prompt_cache and blocks:
+            blocks[-1]["cache_control"] = {"type": "ephemeral"}
+        return blocks
+
+    async def _create(
         self,
         messages: list[dict[str, str]],
         model: str,
-        temperature: float = 0.3,
-        max_tokens: int = 2048,
-    ) -> str:
-        system_msg = ""
+        temperature: float,
+        max_tokens: int,
+        **extra: Any,
+    ) -> Any:
+        system_parts: list[str] = []
         chat_msgs = []
         for m in messages:
             if m["role"] == "system":
-                system_msg = m["content"]
+                system_parts.append(m["content"])
             else:
                 chat_msgs.append(m)
 
         if not chat_msgs:
             chat_msgs = [{"role": "user", "content": "Please respond."}]
 
-        try:
-            kwargs = dict(
-                model=model,
-                messages=chat_msgs,
-                temperature=temperature,
-                max_tokens=max_tokens,
-            )
-            if system_msg:
-                kwargs["system"] = system_msg
-
-            resp = await self._client.messages.create(**kwargs)
-            return resp.content[0].text if resp.content else ""
-        except Exception as e:
-            self._map_error(e)
+        with span("llm.complete", provider=self.name, model=model):
+            try:
+                kwargs = dict(
+                    model=model,
+                    messages=chat_msgs,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    **extra,
+                )
+                if system_parts:
+                    kwargs["system"] = self._system_blocks(system_parts)
+
+                start = time.monotonic()
+                resp = await self._client.messages.create(**kwargs)
+                record_usage(self.name, model, anthropic_usage(resp), time.monotonic() - start)
+                return resp
+            except Exception as e:
+                self._map_error(e)
+
+    async def complete(
+        self,
+        messages: list[dict[str, str]],
+        model: str,
+        temperature: float = 0.3,
+        max_tokens: int = 2048,
+    ) -> str:
+        resp = await self._create(messages, model, temperature, max_tokens)
+        return resp.content[0].text if resp.content else ""
 
     async def complete_structured(
         self,
@@ -60,12 +101,11 @@ class AnthropicProvider(LLMProvider):
         temperature: float = 0.3,
         max_tokens: int = 2048,
     ) -> T:
-        schema = self._schema_to_json(response_model)
-        messages_copy = list(messages)
-        messages_copy.append({
-            "role": "user",
-            "content": f"Respond ONLY with valid JSON matching this schema:\n{json.dumps(schema, indent=2)}"
-        })
+        if self.structured_mode == "native":
+            return await self._complete_tool(messages, model, response_model, temperature, max_tokens)
+
+        # Schema joins the cached system prefix instead of trailing the user turn
+        messages_copy = self._with_schema(messages, response_model)
 
         raw = await self.complete(messages_copy, model, temperature, max_tokens)
         try:
@@ -73,10 +113,44 @@ class AnthropicProvider(LLMProvider):
         except Exception as e:
             raise LLMProviderError(f"Failed to parse structured output: {e}") from e
 
+    async def _complete_tool(
+        self,
+        messages: list[dict[str, str]],
+        model: str,
+        response_model: type[T],
+        temperature: float,
+        max_tokens: int,
+    ) -> T:
+        """Structured output via a single tool whose input schema is the response model,
+        with tool_choice forcing the model to call it."""
+        tool_name = response_model.__name__
+        resp = await self._create(
+            messages,
+            model,
+            temperature,
+            max_tokens,
+            tools=[{
+                "name": tool_name,
+                "description": f"Return the {tool_name} result.",
+                "input_schema": compiled_schema(response_model),
+            }],
+            tool_choice={"type": "tool", "name": tool_name},
+        )
+        for block in resp.content or []:
+            if getattr(block, "type", "") == "tool_use" and block.name == tool_name:
+                try:
+                    return response_model.model_validate(block.input)
+                except Exception as e:
+                    raise LLMProviderError(f"Failed to parse structured output: {e}") from e
+        raise LLMProviderError(f"Model did not call the {tool_name} tool")
+
     def _map_error(self, e: Exception) -> None:
         error_str = str(e).lower()
-        if "rate_limit" in error_str or "429" in error_str:
-            raise LLMRateLimitError(str(e)) from e
+        retry_after = retry_after_seconds(e)
+        if getattr(e, "status_code", None) == 429 or "rate_limit" in error_str or "429" in error_str:
+            raise LLMRateLimitError(str(e), retry_after=retry_after) from e
         if "context_length" in error_str or "too long" in error_str:
             raise LLMContextLengthError(str(e)) from e
+        if is_transient_error(e):
+            raise LLMServerError(str(e), retry_after=retry_after) from e
         raise LLMProviderError(str(e)) from e
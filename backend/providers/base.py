@@ -2,7 +2,8 @@ from __future__ import annotations
 
 import json
 from abc import ABC, abstractmethod
-from typing import Any, TypeVar
+from functools import lru_cache
+from typing import Any, Optional, TypeVar
 
 from pydantic import BaseModel
 
@@ -10,7 +11,9 @@ T = TypeVar("T", bound=BaseModel)
 
 
 class LLMProviderError(Exception):
-    pass
+    def __init__(self, message: str = "", retry_after: Optional[float] = None) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
 
 
 class LLMRateLimitError(LLMProviderError):
@@ -21,6 +24,64 @@ class LLMContextLengthError(LLMProviderError):
     pass
 
 
+class LLMServerError(LLMProviderError):
+    """Transient upstream failure: 5xx, overload, timeout or connection error."""
+    pass
+
+
+def is_transient_error(e: Exception) -> bool:
+    status = getattr(e, "status_code", None)
+    if isinstance(status, int) and (status >= 500 or status == 408):
+        return True
+    kind = type(e).__name__
+    return "Timeout" in kind or "Connection" in kind or "overloaded" in str(e).lower()
+
+
+@lru_cache(maxsize=64)
+def schema_instruction(model: type[BaseModel]) -> str:
+    """Compact, byte-stable JSON-schema instruction for a response model, built once per model."""
+    schema = json.dumps(model.model_json_schema(), separators=(",", ":"), sort_keys=True)
+    return f"Respond ONLY with valid JSON matching this schema:\n{schema}"
+
+
+# Keywords whose value maps names to subschemas (the names are not keywords) and
+# keywords whose value is instance data rather than a schema
+_SCHEMA_MAPS = ("properties", "patternProperties", "$defs", "definitions")
+_SCHEMA_DATA = ("enum", "const", "examples")
+
+
+def _strictify(node: Any) -> Any:
+    if isinstance(node, dict):
+        node = {
+            k: (
+                v if k in _SCHEMA_DATA
+                else {name: _strictify(sub) for name, sub in v.items()} if k in _SCHEMA_MAPS
+                else _strictify(v)
+            )
+            for k, v in node.items()
+            if k != "default"
+        }
+        if node.get("type") == "object" and "properties" in node:
+            node["additionalProperties"] = False
+            node["required"] = list(node["properties"].keys())
+        return node
+    if isinstance(node, list):
+        return [_strictify(v) for v in node]
+    return node
+
+
+@lru_cache(maxsize=64)
+def compiled_schema(model: type[BaseModel], strict: bool = False) -> dict:
+    """JSON schema for a response model, compiled once per model.
+
+    ``strict=True`` produces the subset accepted by OpenAI strict structured outputs:
+    every object closed with ``additionalProperties: false``, every property required
+    and no ``default`` keywords. Callers must treat the returned dict as read-only.
+    """
+    schema = model.model_json_schema()
+    return _strictify(schema) if strict else schema
+
+
 class LLMProvider(ABC):
     name: str
 
@@ -51,6 +112,20 @@ class LLMProvider(ABC):
         schema = model.model_json_schema()
         return schema
 
+    def _with_schema(
+        self, messages: list[dict[str, str]], response_model: type[BaseModel]
+    ) -> list[dict[str, str]]:
+        """Insert the schema instruction right after the leading system messages.
+
+        Keeping the static system prompt and schema ahead of the per-call user content
+        gives every call for the same agent an identical prefix that providers can cache.
+        """
+        idx = 0
+        while idx < len(messages) and messages[idx]["role"] == "system":
+            idx += 1
+        instruction = {"role": "system", "content": schema_instruction(response_model)}
+        return [*messages[:idx], instruction, *messages[idx:]]
+
     def _parse_model(self, model_class: type[T], raw: str) -> T:
         """Parse raw JSON string into a Pydantic model, handling markdown fences."""
         text = raw.strip()
@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+
+from pydantic import BaseModel
+
+from .base import LLMProvider
+from ..resilience.budget import RatioBudget
+from ..resilience.hedging import get_latency_tracker
+from ..logging_config import get_logger
+
+T = TypeVar("T", bound=BaseModel)
+logger = get_logger("providers.hedging")
+
+
+@dataclass
+class HedgeStats:
+    calls: int = 0
+    hedges: int = 0
+    backup_wins: int = 0
+    budget_denied: int = 0
+
+    def to_dict(self) -> dict:
+        return {
+            "calls": self.calls,
+            "hedges": self.hedges,
+            "backup_wins": self.backup_wins,
+            "budget_denied": self.budget_denied,
+        }
+
+
+_hedge_stats = HedgeStats()
+_hedge_budget: Optional[RatioBudget] = None
+
+
+def get_hedge_budget(ratio: float) -> RatioBudget:
+    """Process-wide hedge budget shared by all hedged providers."""
+    global _hedge_budget
+    if _hedge_budget is None:
+        _hedge_budget = RatioBudget(ratio=ratio)
+    return _hedge_budget
+
+
+def get_hedge_stats() -> dict:
+    stats = _hedge_stats.to_dict()
+    if _hedge_budget is not None:
+        stats["budget"] = _hedge_budget.to_dict()
+    return stats
+
+
+class HedgedProvider(LLMProvider):
+    """Issues a backup request to an alternate provider/model when the primary call is
+    slower than a percentile of its recent latency, and returns the first valid answer.
+
+    An empty ``alternate_model`` re-issues the call with the primary's model.
+    """
+
+    def __init__(
+        self,
+        provider: LLMProvider,
+        alternate: LLMProvider,
+        alternate_model: str,
+        budget: RatioBudget,
+        percentile: float = 0.95,
+        initial_delay: float = 15.0,
+        min_delay: float = 2.0,
+    ) -> None:
+        self._provider = provider
+        self._alternate = alternate
+        self.name = provider.name
+        self.alternate_model = alternate_model
+        self.budget = budget
+        self.percentile = percentile
+        self.initial_delay = initial_delay
+        self.min_delay = min_delay
+
+    async def _race(
+        self,
+        model: str,
+        primary_call: Callable[[], Awaitable[Any]],
+        backup_call: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        tracker = get_latency_tracker(f"llm:{self.name}:{model}")
+        delay = tracker.hedge_delay(self.percentile, self.initial_delay, self.min_delay)
+        _hedge_stats.calls += 1
+        self.budget.deposit()
+
+        start = time.monotonic()
+        primary = asyncio.ensure_future(primary_call())
+        backup: Optional[asyncio.Future] = None
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=delay)
+            if done or not self.budget.try_withdraw():
+                if not done:
+                    _hedge_stats.budget_denied += 1
+                result = await primary
+                tracker.record(time.monotonic() - start)
+                return result
+
+            _hedge_stats.hedges += 1
+            logger.info(
+                "Hedging %s:%s after %.1fs -> %s:%s",
+                self.name, model, delay, self._alternate.name, self.alternate_model or model,
+            )
+            backup = asyncio.ensure_future(backup_call())
+            pending = {primary, backup}
+            last_error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    error = task.exception()
+                    if error is not None:
+                        last_error = error
+                        continue
+                    if task is backup:
+                        _hedge_stats.backup_wins += 1
+                    else:
+                        tracker.record(time.monotonic() - start)
+                    return task.result()
+            raise last_error
+        finally:
+            if not primary.done():
+                # Censored sample: the primary took at least this long
+                tracker.record(time.monotonic() - start)
+            for task in (primary, backup):
+                if task is not None and not task.done():
+                    task.cancel()
+
+    async def complete(
+        self,
+        messages: list[dict[str, str]],
+        model: str,
+        temperature: float = 0.3,
+        max_tokens: int = 2048,
+    ) -> str:
+        return await self._race(
+            model,
+            lambda: self._provider.complete(messages, model, temperature, max_tokens),
+            lambda: self._alternate.complete(messages, self.alternate_model or model, temperature, max_tokens),
+        )
+
+    async def complete_structured(
+        self,
+        messages: list[dict[str, str]],
+        model: str,
+        response_model: type[T],
+        temperature: float = 0.3,
+        max_tokens: int = 2048,
+    ) -> T:
+        return await self._race(
+            model,
+            lambda: self._provider.complete_structured(
+                messages, model, response_model, temperature, max_tokens
+            ),
+            lambda: self._alternate.complete_structured(
+                messages, self.alternate_model or model, response_model, temperature, max_tokens
+            ),
+        )
@@ -1,11 +1,22 @@
 from __future__ import annotations
 
-import json
+import time
 from typing import TypeVar
 
 from pydantic import BaseModel
 
-from .base import LLMProvider, LLMProviderError, LLMRateLimitError, LLMContextLengthError
+from .base import (
+    LLMProvider,
+    LLMProviderError,
+    LLMRateLimitError,
+    LLMContextLengthError,
+    LLMServerError,
+    compiled_schema,
+    is_transient_error,
+)
+from .usage import openai_usage, record_usage
+from ..observability.tracing import span
+from ..resilience.retry import retry_after_seconds
 from ..logging_config import get_logger
 
 T = TypeVar("T", bound=BaseModel)
@@ -15,9 +26,10 @@ logger = get_logger("providers.openai")
 class OpenAIProvider(LLMProvider):
     name = "openai"
 
-    def __init__(self, api_key: str) -> None:
+    def __init__(self, api_key: str, structured_mode: str = "native", max_retries: int = 2) -> None:
         from openai import AsyncOpenAI
-        self._client = AsyncOpenAI(api_key=api_key)
+        self._client = AsyncOpenAI(api_key=api_key, max_retries=max_retries)
+        self.structured_mode = structured_mode
 
     async def complete(
         self,
@@ -26,16 +38,19 @@ class OpenAIProvider(LLMProvider):
         temperature: float = 0.3,
         max_tokens: int = 2048,
     ) -> str:
-        try:
-            resp = await self._client.chat.completions.create(
-                model=model,
-                messages=messages,
-                temperature=temperature,
-                max_tokens=max_tokens,
-            )
-            return resp.choices[0].message.content or ""
-        except Exception as e:
-            self._map_error(e)
+        start = time.monotonic()
+        with span("llm.complete", provider=self.name, model=model):
+            try:
+                resp = await self._client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                )
+                record_usage(self.name, model, openai_usage(resp), time.monotonic() - start)
+                return resp.choices[0].message.content or ""
+            except Exception as e:
+                self._map_error(e)
 
     async def complete_structured(
         self,
@@ -45,32 +60,50 @@ class OpenAIProvider(LLMProvider):
         temperature: float = 0.3,
         max_tokens: int = 2048,
     ) -> T:
-        schema = self._schema_to_json(response_model)
-        messages_with_format = list(messages)
-        messages_with_format.append({
-            "role": "user",
-            "content": f"Respond ONLY with valid JSON matching this schema:\n{json.dumps(schema, indent=2)}"
-        })
+        if self.structured_mode == "native":
+            # Strict json_schema: the API enforces the schema, no schema text in the prompt
+            request_messages = messages
+            response_format = {
+                "type": "json_schema",
+                "json_schema": {
+                    "name": response_model.__name__,
+                    "schema": compiled_schema(response_model, strict=True),
+                    "strict": True,
+                },
+            }
+        else:
+            # Static system prompt + schema first so OpenAI's automatic prefix cache can hit
+            request_messages = self._with_schema(messages, response_model)
+            response_format = {"type": "json_object"}
 
-        try:
-            resp = await self._client.chat.completions.create(
-                model=model,
-                messages=messages_with_format,
-                temperature=temperature,
-                max_tokens=max_tokens,
-                response_format={"type": "json_object"},
-            )
-            raw = resp.choices[0].message.content or "{}"
-            return self._parse_model(response_model, raw)
-        except LLMProviderError:
-            raise
-        except Exception as e:
-            self._map_error(e)
+        start = time.monotonic()
+        with span("llm.complete", provider=self.name, model=model):
+            try:
+                resp = await self._client.chat.completions.create(
+                    model=model,
+                    messages=request_messages,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    response_format=response_format,
+                )
+                record_usage(self.name, model, openai_usage(resp), time.monotonic() - start)
+                message = resp.choices[0].message
+                if getattr(message, "refusal", None):
+                    raise LLMProviderError(f"Model refused structured output: {message.refusal}")
+                raw = message.content or "{}"
+                return self._parse_model(response_model, raw)
+            except LLMProviderError:
+                raise
+            except Exception as e:
+                self._map_error(e)
 
     def _map_error(self, e: Exception) -> None:
         error_str = str(e).lower()
-        if "rate_limit" in error_str or "429" in error_str:
-            raise LLMRateLimitError(str(e)) from e
+        retry_after = retry_after_seconds(e)
+        if getattr(e, "status_code", None) == 429 or "rate_limit" in error_str or "429" in error_str:
+            raise LLMRateLimitError(str(e), retry_after=retry_after) from e
         if "context_length" in error_str or "maximum context" in error_str:
             raise LLMContextLengthError(str(e)) from e
+        if is_transient_error(e):
+            raise LLMServerError(str(e), retry_after=retry_after) from e
         raise LLMProviderError(str(e)) from e
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Optional
+
+from ..config import get_settings
+from ..logging_config import get_logger
+
+if TYPE_CHECKING:
+    from .usage import TokenUsage
+
+logger = get_logger("providers.pricing")
+
+
+@dataclass(frozen=True)
+class ModelPrice:
+    """USD per million tokens."""
+
+    input: float
+    output: float
+    cached_input: Optional[float] = None
+    cache_write: Optional[float] = None
+
+    def cost(self, usage: TokenUsage) -> float:
+        uncached = max(usage.input_tokens - usage.cached_input_tokens - usage.cache_write_tokens, 0)
+        cached_rate = self.input if self.cached_input is None else self.cached_input
+        write_rate = self.input if self.cache_write is None else self.cache_write
+        return (
+            uncached * self.input
+            + usage.cached_input_tokens * cached_rate
+            + usage.cache_write_tokens * write_rate
+            + usage.output_tokens * self.output
+        ) / 1_000_000
+
+
+# List prices for the models in the default configuration; override or extend with
+# llm_prices_path. Dated snapshots resolve to the longest matching prefix.
+DEFAULT_PRICES: dict[str, ModelPrice] = {
+    "gpt-4o": ModelPrice(input=2.50, output=10.00, cached_input=1.25),
+    "gpt-4o-mini": ModelPrice(input=0.15, output=0.60, cached_input=0.075),
+    "gpt-4.1": ModelPrice(input=2.00, output=8.00, cached_input=0.50),
+    "gpt-4.1-mini": ModelPrice(input=0.40, output=1.60, cached_input=0.10),
+    "gpt-4.1-nano": ModelPrice(input=0.10, output=0.40, cached_input=0.025),
+    "claude-3-5-sonnet": ModelPrice(input=3.00, output=15.00, cached_input=0.30, cache_write=3.75),
+    "claude-3-7-sonnet": ModelPrice(input=3.00, output=15.00, cached_input=0.30, cache_write=3.75),
+    "claude-sonnet-4": ModelPrice(input=3.00, output=15.00, cached_input=0.30, cache_write=3.75),
+    "claude-3-5-haiku": ModelPrice(input=0.80, output=4.00, cached_input=0.08, cache_write=1.00),
+}
+
+
+class PriceTable:
+    def __init__(self, prices: dict[str, ModelPrice]) -> None:
+        self.prices = dict(prices)
+        # Longest first, so "gpt-4o-mini-2024-07-18" matches gpt-4o-mini before gpt-4o
+        self._prefixes = sorted(self.prices, key=len, reverse=True)
+        self._unpriced: set[str] = set()
+
+    def lookup(self, model: str) -> Optional[ModelPrice]:
+        price = self.prices.get(model)
+        if price is not None:
+            return price
+        for prefix in self._prefixes:
+            if model.startswith(prefix):
+                return self.prices[prefix]
+        if model not in self._unpriced:
+            self._unpriced.add(model)
+            logger.warning("No price configured for model %r; its calls are counted at $0", model)
+        return None
+
+    def cost(self, model: str, usage: TokenUsage) -> float:
+        price = self.lookup(model)
+        return price.cost(usage) if price is not None else 0.0
+
+
+def load_price_table(path: str = "") -> PriceTable:
+    """Default prices, overridden by a JSON file of
+    ``{"model": {"input": .., "output": .., "cached_input": .., "cache_write": ..}}``."""
+    prices = dict(DEFAULT_PRICES)
+    if path:
+        try:
+            with open(path, encoding="utf-8") as f:
+                for model, entry in json.load(f).items():
+                    prices[model] = ModelPrice(**entry)
+        except (OSError, ValueError, TypeError) as e:
+            logger.warning("Could not load LLM prices from %s: %s", path, e)
+    return PriceTable(prices)
+
+
+_prices: Optional[PriceTable] = None
+
+
+def get_price_table() -> PriceTable:
+    global _prices
+    if _prices is None:
+        _prices = load_price_table(get_settings().llm_prices_path)
+    return _prices
@@ -1,25 +1,159 @@
 from __future__ import annotations
 
+from dataclasses import dataclass, field
 from functools import lru_cache
-from typing import Optional
+from typing import Optional, TypeVar
 
-from .base import LLMProvider
+from pydantic import BaseModel
+
+from .base import LLMProvider, LLMProviderError, LLMRateLimitError
 from .openai_provider import OpenAIProvider
 from .anthropic_provider import AnthropicProvider
+from .hedging import HedgedProvider, get_hedge_budget
+from .resilient import ResilientProvider, get_retry_budget
 from ..config import get_settings
 from ..logging_config import get_logger
 
+T = TypeVar("T", bound=BaseModel)
 logger = get_logger("providers.registry")
 
 _providers: dict[str, LLMProvider] = {}
 
 
+@dataclass
+class CascadeStats:
+    calls: int = 0
+    escalations: int = 0
+    reasons: dict[str, int] = field(default_factory=dict)
+
+    @property
+    def escalation_rate(self) -> float:
+        return self.escalations / self.calls if self.calls else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "calls": self.calls,
+            "escalations": self.escalations,
+            "escalation_rate": round(self.escalation_rate, 4),
+            "reasons": dict(self.reasons),
+        }
+
+
+# Per-agent cascade counters (process-wide)
+_cascade_stats: dict[str, CascadeStats] = {}
+
+
+def get_cascade_stats() -> dict[str, dict]:
+    """Snapshot of per-agent cascade call and escalation counts."""
+    return {agent: stats.to_dict() for agent, stats in _cascade_stats.items()}
+
+
+class CascadeProvider(LLMProvider):
+    """Runs each call on a cheap model first, escalating to the agent's configured
+    model when structured parsing fails or the answer reports low confidence."""
+
+    def __init__(
+        self,
+        provider: LLMProvider,
+        agent_name: str,
+        cheap_model: str,
+        min_confidence: float = 0.5,
+        min_critic_score: float = 0.5,
+    ) -> None:
+        self._provider = provider
+        self.name = provider.name
+        self.agent_name = agent_name
+        self.cheap_model = cheap_model
+        self.min_confidence = min_confidence
+        self.min_critic_score = min_critic_score
+
+    @property
+    def _stats(self) -> CascadeStats:
+        return _cascade_stats.setdefault(self.agent_name, CascadeStats())
+
+    def _escalate(self, reason: str, model: str) -> None:
+        stats = self._stats
+        stats.escalations += 1
+        stats.reasons[reason] = stats.reasons.get(reason, 0) + 1
+        logger.info(
+            "Cascade escalation for '%s': %s -> %s (%s)", self.agent_name, self.cheap_model, model, reason
+        )
+
+    def _weak_answer(self, result: BaseModel) -> Optional[str]:
+        confidence = getattr(result, "confidence_score", None)
+        if isinstance(confidence, (int, float)) and confidence < self.min_confidence:
+            return "low_confidence"
+        score = getattr(result, "score", None)
+        if isinstance(score, (int, float)) and score < self.min_critic_score:
+            return "low_score"
+        return None
+
+    async def complete(
+        self,
+        messages: list[dict[str, str]],
+        model: str,
+        temperature: float = 0.3,
+        max_tokens: int = 2048,
+    ) -> str:
+        self._stats.calls += 1
+        try:
+            text = await self._provider.complete(messages, self.cheap_model, temperature, max_tokens)
+            if text.strip():
+                return text
+            reason = "empty_response"
+        except LLMRateLimitError:
+            raise
+        except LLMProviderError as e:
+            logger.debug("Cheap model %s failed: %s", self.cheap_model, e)
+            reason = "provider_error"
+
+        self._escalate(reason, model)
+        return await self._provider.complete(messages, model, temperature, max_tokens)
+
+    async def complete_structured(
+        self,
+        messages: list[dict[str, str]],
+        model: str,
+        response_model: type[T],
+        temperature: float = 0.3,
+        max_tokens: int = 2048,
+    ) -> T:
+        self._stats.calls += 1
+        try:
+            result = await self._provider.complete_structured(
+                messages, self.cheap_model, response_model, temperature, max_tokens
+            )
+            reason = self._weak_answer(result)
+            if reason is None:
+                return result
+        except LLMRateLimitError:
+            raise
+        except LLMProviderError as e:
+            logger.debug("Cheap model %s structured output failed: %s", self.cheap_model, e)
+            reason = "parse_failure"
+
+        self._escalate(reason, model)
+        return await self._provider.complete_structured(
+            messages, model, response_model, temperature, max_tokens
+        )
+
+
 def _init_provider(name: str) -> Optional[LLMProvider]:
     settings = get_settings()
+    # SDK-level retries are disabled; ResilientProvider owns the retry policy
     if name == "openai" and settings.openai_api_key:
-        return OpenAIProvider(api_key=settings.openai_api_key)
+        return OpenAIProvider(
+            api_key=settings.openai_api_key,
+            structured_mode=settings.structured_output_mode,
+            max_retries=0,
+        )
     if name == "anthropic" and settings.anthropic_api_key:
-        return AnthropicProvider(api_key=settings.anthropic_api_key)
+        return AnthropicProvider(
+            api_key=settings.anthropic_api_key,
+            prompt_cache=settings.prompt_cache_enabled,
+            structured_mode=settings.structured_output_mode,
+            max_retries=0,
+        )
     return None
 
 
@@ -32,11 +166,32 @@ def get_provider(name: Optional[str] = None) -> LLMProvider:
         if provider is None:
             raise ValueError(f"Provider '{provider_name}' not available. Check API key.")
         _providers[provider_name] = provider
-        logger.info(f"Initialized LLM provider: {provider_name}")
+        logger.info("Initialized LLM provider: %s", provider_name)
 
     return _providers[provider_name]
 
 
+def _resilient_provider(provider_name: str) -> LLMProvider:
+    """Provider wrapped with retries, a per-model breaker and failover to the other provider."""
+    settings = get_settings()
+    fallback, fallback_model = None, ""
+    if settings.llm_failover_enabled:
+        alt_name, alt_model = settings.get_alternate_target(provider_name)
+        if alt_name != provider_name:
+            fallback, fallback_model = get_provider(alt_name), alt_model
+    return ResilientProvider(
+        get_provider(provider_name),
+        budget=get_retry_budget(settings.llm_retry_budget_ratio),
+        fallback=fallback,
+        fallback_model=fallback_model,
+        max_attempts=settings.llm_retry_max_attempts,
+        base_delay=settings.llm_retry_base_delay,
+        max_delay=settings.llm_retry_max_delay,
+        failure_threshold=settings.llm_breaker_failure_threshold,
+        recovery_timeout=settings.llm_breaker_recovery_seconds,
+    )
+
+
 def get_provider_for_agent(agent_name: str) -> tuple[LLMProvider, str]:
     """Returns (provider, model_name) for a given agent."""
     settings = get_settings()
@@ -50,5 +205,28 @@ def get_provider_for_agent(agent_name: str) -> tuple[LLMProvider, str]:
     else:
         provider_name = settings.active_provider
 
-    provider = get_provider(provider_name)
+    provider = _resilient_provider(provider_name)
+
+    if settings.hedging_enabled:
+        alt_name, alt_model = settings.get_alternate_target(provider_name)
+        provider = HedgedProvider(
+            provider,
+            alternate=_resilient_provider(alt_name),
+            alternate_model=alt_model,
+            budget=get_hedge_budget(settings.hedge_budget_ratio),
+            percentile=settings.hedge_percentile,
+            initial_delay=settings.hedge_initial_delay_seconds,
+            min_delay=settings.hedge_min_delay_seconds,
+        )
+
+    cheap_model = settings.get_cascade_model(agent_name, provider_name)
+    if cheap_model and cheap_model != model:
+        provider = CascadeProvider(
+            provider,
+            agent_name=agent_name,
+            cheap_model=cheap_model,
+            min_confidence=settings.cascade_min_confidence,
+            min_critic_score=settings.cascade_min_critic_score,
+        )
+
     return provider, model
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+
+from pydantic import BaseModel
+
+from .base import LLMProvider, LLMRateLimitError, LLMServerError
+from ..resilience.budget import RatioBudget
+from ..resilience.circuit_breaker import CircuitBreaker, CircuitOpenError, CircuitState, get_breaker
+from ..resilience.retry import backoff_delay
+from ..observability.tracing import span
+from ..logging_config import get_logger
+
+T = TypeVar("T", bound=BaseModel)
+logger = get_logger("providers.resilient")
+
+# Errors worth retrying or failing over on; parse and context-length errors are not
+TRANSIENT_ERRORS = (LLMRateLimitError, LLMServerError)
+
+_retry_budget: Optional[RatioBudget] = None
+
+
+def get_retry_budget(ratio: float) -> RatioBudget:
+    """Process-wide LLM retry budget, so retries cannot amplify a provider outage.
+
+    Starts full so the first transient errors after startup are retried; a sustained
+    outage drains it to the ``ratio`` steady state.
+    """
+    global _retry_budget
+    if _retry_budget is None:
+        _retry_budget = RatioBudget(ratio=ratio, max_balance=10.0, initial_balance=10.0)
+    return _retry_budget
+
+
+class ResilientProvider(LLMProvider):
+    """Wraps a provider with Retry-After-aware retries under a shared retry budget and a
+    per-model circuit breaker. When the breaker is open or retries are exhausted on a
+    transient error, the call fails over to ``fallback`` / ``fallback_model`` if given."""
+
+    def __init__(
+        self,
+        provider: LLMProvider,
+        budget: RatioBudget,
+        fallback: Optional[LLMProvider] = None,
+        fallback_model: str = "",
+        max_attempts: int = 3,
+        base_delay: float = 1.0,
+        max_delay: float = 30.0,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+    ) -> None:
+        self._provider = provider
+        self.name = provider.name
+        self.budget = budget
+        self.fallback = fallback
+        self.fallback_model = fallback_model
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+
+    def _breaker(self, provider_name: str, model: str) -> CircuitBreaker:
+        return get_breaker(
+            f"llm:{provider_name}:{model}",
+            failure_threshold=self.failure_threshold,
+            recovery_timeout=self.recovery_timeout,
+        )
+
+    async def _attempt(
+        self, breaker: CircuitBreaker, call: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        try:
+            return await breaker.call(call, failure_on=TRANSIENT_ERRORS)
+        except CircuitOpenError as e:
+            raise LLMServerError(str(e)) from e
+
+    async def _with_retries(self, model: str, call: Callable[[], Awaitable[Any]]) -> Any:
+        breaker = self._breaker(self.name, model)
+        self.budget.deposit()
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                return await self._attempt(breaker, call)
+            except TRANSIENT_ERRORS as e:
+                if attempt == self.max_attempts or breaker.state != CircuitState.CLOSED:
+                    raise
+                if e.retry_after is not None and e.retry_after > self.max_delay:
+                    logger.warning(
+                        "%s:%s asked to retry after %.0fs, not retrying", self.name, model, e.retry_after
+                    )
+                    raise
+                if not self.budget.try_withdraw():
+                    logger.warning("%s:%s retry budget exhausted: %s", self.name, model, e)
+                    raise
+                delay = backoff_delay(attempt, self.base_delay, self.max_delay, retry_after=e.retry_after)
+                logger.info(
+                    "%s:%s attempt %d/%d failed: %s. Retrying in %.1fs",
+                    self.name, model, attempt, self.max_attempts, e, delay,
+                )
+                with span("retry.backoff", provider=self.name, model=model, attempt=attempt, error=str(e)[:200]):
+                    await asyncio.sleep(delay)
+
+    async def _call(
+        self,
+        model: str,
+        primary: Callable[[str], Awaitable[Any]],
+        secondary: Callable[[str], Awaitable[Any]],
+    ) -> Any:
+        try:
+            return await self._with_retries(model, lambda: primary(model))
+        except TRANSIENT_ERRORS as e:
+            if self.fallback is None:
+                raise
+            fallback_model = self.fallback_model or model
+            breaker = self._breaker(self.fallback.name, fallback_model)
+            if breaker.state == CircuitState.OPEN:
+                raise
+            logger.warning(
+                "Failing over %s:%s -> %s:%s (%s)", self.name, model, self.fallback.name, fallback_model, e
+            )
+            return await self._attempt(breaker, lambda: secondary(fallback_model))
+
+    async def complete(
+        self,
+        messages: list[dict[str, str]],
+        model: str,
+        temperature: float = 0.3,
+        max_tokens: int = 2048,
+    ) -> str:
+        return await self._call(
+            model,
+            lambda m: self._provider.complete(messages, m, temperature, max_tokens),
+            lambda m: self.fallback.complete(messages, m, temperature, max_tokens),
+        )
+
+    async def complete_structured(
+        self,
+        messages: list[dict[str, str]],
+        model: str,
+        response_model: type[T],
+        temperature: float = 0.3,
+        max_tokens: int = 2048,
+    ) -> T:
+        return await self._call(
+            model,
+            lambda m: self._provider.complete_structured(
+                messages, m, response_model, temperature, max_tokens
+            ),
+            lambda m: self.fallback.complete_structured(
+                messages, m, response_model, temperature, max_tokens
+            ),
+        )
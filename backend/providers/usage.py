@@ -0,0 +1,231 @@
+from __future__ import annotations
+
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Literal, Optional
+
+from ..config import Settings
+from ..logging_config import get_logger
+from ..observability.metrics import LLM_CALL_SECONDS, LLM_COST_USD, LLM_TOKENS, current_agent
+from ..observability.tracing import current_span
+from .pricing import get_price_table
+
+logger = get_logger("providers.usage")
+
+
+@dataclass
+class TokenUsage:
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cached_input_tokens: int = 0
+    cache_write_tokens: int = 0
+    calls: int = 0
+    cost_usd: float = 0.0
+
+    def add(self, other: TokenUsage) -> None:
+        self.input_tokens += other.input_tokens
+        self.output_tokens += other.output_tokens
+        self.cached_input_tokens += other.cached_input_tokens
+        self.cache_write_tokens += other.cache_write_tokens
+        self.calls += other.calls
+        self.cost_usd += other.cost_usd
+
+    @property
+    def total_tokens(self) -> int:
+        return self.input_tokens + self.output_tokens
+
+    @property
+    def cache_hit_ratio(self) -> float:
+        return self.cached_input_tokens / self.input_tokens if self.input_tokens else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "calls": self.calls,
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "cached_input_tokens": self.cached_input_tokens,
+            "cache_write_tokens": self.cache_write_tokens,
+            "cache_hit_ratio": round(self.cache_hit_ratio, 4),
+            "cost_usd": round(self.cost_usd, 6),
+        }
+
+
+BudgetState = Literal["ok", "soft", "hard"]
+
+
+@dataclass
+class RunBudget:
+    """Per-run spending limits in USD and/or tokens (input + output); 0 disables a limit.
+
+    Past the soft limit a run degrades to cheaper work; past the hard limit it stops.
+    """
+
+    soft_usd: float = 0.0
+    hard_usd: float = 0.0
+    soft_tokens: int = 0
+    hard_tokens: int = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.soft_usd or self.hard_usd or self.soft_tokens or self.hard_tokens)
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> RunBudget:
+        return cls(
+            soft_usd=settings.run_budget_soft_usd,
+            hard_usd=settings.run_budget_hard_usd,
+            soft_tokens=settings.run_budget_soft_tokens,
+            hard_tokens=settings.run_budget_hard_tokens,
+        )
+
+    @staticmethod
+    def _over(limit: float, spent: float) -> bool:
+        return bool(limit) and spent >= limit
+
+    def state(self, usage: TokenUsage) -> BudgetState:
+        if self._over(self.hard_usd, usage.cost_usd) or self._over(self.hard_tokens, usage.total_tokens):
+            return "hard"
+        if self._over(self.soft_usd, usage.cost_usd) or self._over(self.soft_tokens, usage.total_tokens):
+            return "soft"
+        return "ok"
+
+    def to_dict(self) -> dict:
+        return {
+            "soft_usd": self.soft_usd,
+            "hard_usd": self.hard_usd,
+            "soft_tokens": self.soft_tokens,
+            "hard_tokens": self.hard_tokens,
+        }
+
+
+@dataclass
+class RunUsage:
+    """Token and cost totals for one research run, overall and by agent and model."""
+
+    total: TokenUsage = field(default_factory=TokenUsage)
+    by_agent: dict[str, TokenUsage] = field(default_factory=dict)
+    by_model: dict[str, TokenUsage] = field(default_factory=dict)
+    budget: RunBudget = field(default_factory=RunBudget)
+
+    def state(self) -> BudgetState:
+        return self.budget.state(self.total)
+
+    def add(self, agent: str, key: str, usage: TokenUsage) -> None:
+        self.total.add(usage)
+        self.by_agent.setdefault(agent, TokenUsage()).add(usage)
+        self.by_model.setdefault(key, TokenUsage()).add(usage)
+
+    def to_dict(self) -> dict:
+        return {
+            **self.total.to_dict(),
+            "by_agent": {agent: u.to_dict() for agent, u in self.by_agent.items()},
+            "by_model": {key: u.to_dict() for key, u in self.by_model.items()},
+        }
+
+
+def openai_usage(resp: Any) -> TokenUsage:
+    """Read token usage (including prefix-cache hits) from an OpenAI chat completion."""
+    usage = getattr(resp, "usage", None)
+    if usage is None:
+        return TokenUsage(calls=1)
+    details = getattr(usage, "prompt_tokens_details", None)
+    return TokenUsage(
+        input_tokens=getattr(usage, "prompt_tokens", 0) or 0,
+        output_tokens=getattr(usage, "completion_tokens", 0) or 0,
+        cached_input_tokens=(getattr(details, "cached_tokens", 0) or 0) if details else 0,
+        calls=1,
+    )
+
+
+def anthropic_usage(resp: Any) -> TokenUsage:
+    """Read token usage from an Anthropic message.
+
+    Anthropic reports cache reads and writes separately from ``input_tokens``, so they
+    are folded back in to keep ``input_tokens`` the total prompt size for both providers.
+    """
+    usage = getattr(resp, "usage", None)
+    if usage is None:
+        return TokenUsage(calls=1)
+    cache_read = getattr(usage, "cache_read_input_tokens", 0) or 0
+    cache_write = getattr(usage, "cache_creation_input_tokens", 0) or 0
+    return TokenUsage(
+        input_tokens=(getattr(usage, "input_tokens", 0) or 0) + cache_read + cache_write,
+        output_tokens=getattr(usage, "output_tokens", 0) or 0,
+        cached_input_tokens=cache_read,
+        cache_write_tokens=cache_write,
+        calls=1,
+    )
+
+
+# Process-wide totals keyed by "provider:model"
+_usage_totals: dict[str, TokenUsage] = {}
+
+# Usage of the run in progress; tasks spawned by the run share the same object
+_run_usage: ContextVar[Optional[RunUsage]] = ContextVar("run_usage", default=None)
+
+
+class BudgetExhaustedError(Exception):
+    """Raised instead of making an LLM call once the run is past its hard budget."""
+
+
+def track_run_usage(budget: Optional[RunBudget] = None) -> RunUsage:
+    """Start accumulating LLM usage for the current run (and tasks it spawns)."""
+    usage = RunUsage(budget=budget or RunBudget())
+    _run_usage.set(usage)
+    return usage
+
+
+def current_run_usage() -> Optional[RunUsage]:
+    return _run_usage.get()
+
+
+def run_budget_state() -> BudgetState:
+    """Budget state of the run in progress; "ok" outside a tracked run."""
+    usage = _run_usage.get()
+    return usage.state() if usage is not None else "ok"
+
+
+def check_run_budget() -> None:
+    """Call before an LLM request: raises BudgetExhaustedError past the hard limit."""
+    usage = _run_usage.get()
+    if usage is not None and usage.state() == "hard":
+        raise BudgetExhaustedError(
+            f"Run budget exhausted (${usage.total.cost_usd:.4f}, {usage.total.total_tokens} tokens)"
+        )
+
+
+def record_usage(provider: str, model: str, usage: TokenUsage, seconds: Optional[float] = None) -> None:
+    key = f"{provider}:{model}"
+    usage.cost_usd = get_price_table().cost(model, usage)
+    _usage_totals.setdefault(key, TokenUsage()).add(usage)
+
+    current_span().set(
+        input_tokens=usage.input_tokens,
+        output_tokens=usage.output_tokens,
+        cached_input_tokens=usage.cached_input_tokens,
+        cost_usd=round(usage.cost_usd, 6),
+    )
+    agent = current_agent.get()
+    run_usage = _run_usage.get()
+    if run_usage is not None:
+        run_usage.add(agent, key, usage)
+    if usage.cost_usd:
+        LLM_COST_USD.inc(usage.cost_usd, agent, provider, model)
+    if seconds is not None:
+        LLM_CALL_SECONDS.observe(seconds, agent, provider, model)
+    for kind, tokens in (
+        ("input", usage.input_tokens),
+        ("output", usage.output_tokens),
+        ("cached_input", usage.cached_input_tokens),
+        ("cache_write", usage.cache_write_tokens),
+    ):
+        if tokens:
+            LLM_TOKENS.inc(tokens, agent, provider, model, kind)
+    logger.debug(
+        "%s usage: in=%d (cached=%d) out=%d $%.5f",
+        key, usage.input_tokens, usage.cached_input_tokens, usage.output_tokens, usage.cost_usd,
+    )
+
+
+def get_usage_totals() -> dict[str, dict]:
+    return {key: usage.to_dict() for key, usage in _usage_totals.items()}
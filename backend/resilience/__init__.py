@@ -1,4 +1,15 @@
 from .retry import retry
-from .circuit_breaker import circuit_breaker
+from .circuit_breaker import circuit_breaker, get_breaker, get_breaker_snapshots, CircuitOpenError
+from .budget import RatioBudget
+from .hedging import LatencyTracker, get_latency_tracker
 
-__all__ = ["retry", "circuit_breaker"]
+__all__ = [
+    "retry",
+    "circuit_breaker",
+    "get_breaker",
+    "get_breaker_snapshots",
+    "CircuitOpenError",
+    "RatioBudget",
+    "LatencyTracker",
+    "get_latency_tracker",
+]
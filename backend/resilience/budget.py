@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+
+class RatioBudget:
+    """Token bucket that caps extra calls (hedges, retries) at a fraction of request volume.
+
+    Every primary request deposits ``ratio`` tokens and every extra call withdraws one,
+    so extra calls can never exceed ``ratio`` of the recent request volume. The balance
+    is capped at ``max_balance`` so a long quiet period cannot bank a burst.
+    """
+
+    def __init__(self, ratio: float, max_balance: float = 10.0, initial_balance: float = 0.0) -> None:
+        self.ratio = max(ratio, 0.0)
+        self.max_balance = max_balance
+        self._balance = min(initial_balance, max_balance)
+        self.deposits = 0
+        self.withdrawals = 0
+        self.denied = 0
+
+    @property
+    def balance(self) -> float:
+        return self._balance
+
+    def deposit(self) -> None:
+        self.deposits += 1
+        self._balance = min(self._balance + self.ratio, self.max_balance)
+
+    def try_withdraw(self) -> bool:
+        if self._balance >= 1.0:
+            self._balance -= 1.0
+            self.withdrawals += 1
+            return True
+        self.denied += 1
+        return False
+
+    def to_dict(self) -> dict:
+        return {
+            "ratio": self.ratio,
+            "balance": round(self._balance, 3),
+            "deposits": self.deposits,
+            "withdrawals": self.withdrawals,
+            "denied": self.denied,
+        }
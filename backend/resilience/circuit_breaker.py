@@ -3,8 +3,9 @@ from __future__ import annotations
 import asyncio
 import functools
 import time
+from collections import deque
 from enum import Enum
-from typing import Any, Callable
+from typing import Any, Callable, Optional, Tuple, Type
 
 from ..logging_config import get_logger
 
@@ -17,98 +18,250 @@ class CircuitState(Enum):
     HALF_OPEN = "half_open"
 
 
+class CircuitOpenError(Exception):
+    pass
+
+
 class CircuitBreaker:
+    """Circuit breaker driven by the failure rate over a sliding time window.
+
+    The circuit opens once the window holds at least ``failure_threshold`` failures and
+    the failure rate reaches ``failure_rate_threshold``. After ``recovery_timeout`` it
+    goes half-open and admits at most ``half_open_max_calls`` concurrent probes; every
+    other caller is rejected until a probe succeeds (close) or fails (re-open).
+    """
+
     def __init__(
         self,
         name: str,
         failure_threshold: int = 5,
         recovery_timeout: float = 30.0,
         half_open_max_calls: int = 1,
+        failure_rate_threshold: float = 0.5,
+        window_seconds: float = 60.0,
     ) -> None:
         self.name = name
         self.failure_threshold = failure_threshold
         self.recovery_timeout = recovery_timeout
         self.half_open_max_calls = half_open_max_calls
+        self.failure_rate_threshold = failure_rate_threshold
+        self.window_seconds = window_seconds
 
         self._state = CircuitState.CLOSED
-        self._failure_count = 0
-        self._last_failure_time = 0.0
+        self._window: deque[tuple[float, bool]] = deque()  # (timestamp, failed)
+        self._window_failures = 0
+        self._opened_at = 0.0
         self._half_open_calls = 0
+        self._last_used = time.monotonic()
+
+        self.total_calls = 0
+        self.total_failures = 0
+        self.total_rejected = 0
+        self.times_opened = 0
+
+    # --- sliding window ---
+
+    def _prune(self, now: float) -> None:
+        cutoff = now - self.window_seconds
+        while self._window and self._window[0][0] < cutoff:
+            _, failed = self._window.popleft()
+            if failed:
+                self._window_failures -= 1
+
+    def _observe(self, failed: bool) -> None:
+        now = time.monotonic()
+        self._window.append((now, failed))
+        if failed:
+            self._window_failures += 1
+        self._prune(now)
+
+    @property
+    def failure_rate(self) -> float:
+        self._prune(time.monotonic())
+        return self._window_failures / len(self._window) if self._window else 0.0
+
+    # --- state machine ---
 
     @property
     def state(self) -> CircuitState:
         if self._state == CircuitState.OPEN:
-            if time.monotonic() - self._last_failure_time >= self.recovery_timeout:
+            if time.monotonic() - self._opened_at >= self.recovery_timeout:
                 self._state = CircuitState.HALF_OPEN
                 self._half_open_calls = 0
-                logger.info(f"Circuit '{self.name}' transitioned to HALF_OPEN")
+                logger.info("Circuit '%s' transitioned to HALF_OPEN", self.name)
         return self._state
 
-    def record_success(self) -> None:
-        if self._state == CircuitState.HALF_OPEN:
+    def _open(self, reason: str) -> None:
+        self._state = CircuitState.OPEN
+        self._opened_at = time.monotonic()
+        self._half_open_calls = 0
+        self.times_opened += 1
+        logger.warning("Circuit '%s' OPENED (%s)", self.name, reason)
+
+    def try_acquire(self) -> bool:
+        """Admit a call, returning True if it is a half-open probe.
+
+        Raises CircuitOpenError when the circuit is open or the probe quota is taken.
+        The check and the slot reservation happen without yielding to the event loop,
+        so concurrent coroutines cannot over-admit probes.
+        """
+        self._last_used = time.monotonic()
+        state = self.state
+        if state == CircuitState.CLOSED:
+            return False
+        if state == CircuitState.HALF_OPEN and self._half_open_calls < self.half_open_max_calls:
+            self._half_open_calls += 1
+            return True
+        self.total_rejected += 1
+        raise CircuitOpenError(f"Circuit '{self.name}' is {state.value.upper()}. Service unavailable.")
+
+    def release(self, probe: bool = False) -> None:
+        """Give back a probe slot for a call that ended without a verdict (e.g. cancelled)."""
+        if probe and self._state == CircuitState.HALF_OPEN:
+            self._half_open_calls = max(self._half_open_calls - 1, 0)
+
+    def record_success(self, probe: bool = False) -> None:
+        self.total_calls += 1
+        if probe and self._state == CircuitState.HALF_OPEN:
             self._state = CircuitState.CLOSED
-            self._failure_count = 0
-            logger.info(f"Circuit '{self.name}' CLOSED (recovered)")
-        elif self._state == CircuitState.CLOSED:
-            self._failure_count = 0
-
-    def record_failure(self) -> None:
-        self._failure_count += 1
-        self._last_failure_time = time.monotonic()
-
-        if self._state == CircuitState.HALF_OPEN:
-            self._state = CircuitState.OPEN
-            logger.warning(f"Circuit '{self.name}' re-OPENED from HALF_OPEN")
-        elif self._failure_count >= self.failure_threshold:
-            self._state = CircuitState.OPEN
-            logger.warning(
-                f"Circuit '{self.name}' OPENED after {self._failure_count} failures"
+            self._half_open_calls = 0
+            self._window.clear()
+            self._window_failures = 0
+            logger.info("Circuit '%s' CLOSED (recovered)", self.name)
+            return
+        self._observe(failed=False)
+
+    def record_failure(self, probe: bool = False) -> None:
+        self.total_calls += 1
+        self.total_failures += 1
+        if probe and self._state == CircuitState.HALF_OPEN:
+            self._open("probe failed in HALF_OPEN")
+            return
+        self._observe(failed=True)
+        if (
+            self._state == CircuitState.CLOSED
+            and self._window_failures >= self.failure_threshold
+            and self.failure_rate >= self.failure_rate_threshold
+        ):
+            self._open(
+                f"{self._window_failures}/{len(self._window)} failures in "
+                f"{self.window_seconds:.0f}s window"
             )
 
+    async def call(
+        self,
+        func: Callable[..., Any],
+        *args: Any,
+        failure_on: Tuple[Type[BaseException], ...] = (Exception,),
+        ignore: Tuple[Type[BaseException], ...] = (),
+        **kwargs: Any,
+    ) -> Any:
+        """Run ``func`` through the breaker.
+
+        Only exceptions in ``failure_on`` and not in ``ignore`` count as failures; other
+        exceptions mean the service answered and count as successes. Cancellation
+        releases the probe slot.
+        """
+        probe = self.try_acquire()
+        try:
+            result = await func(*args, **kwargs)
+        except (asyncio.CancelledError, CircuitOpenError):
+            self.release(probe)
+            raise
+        except ignore:
+            self.record_success(probe)
+            raise
+        except failure_on:
+            self.record_failure(probe)
+            raise
+        except BaseException:
+            self.record_success(probe)
+            raise
+        self.record_success(probe)
+        return result
+
+    def snapshot(self) -> dict:
+        return {
+            "name": self.name,
+            "state": self.state.value,
+            "failure_rate": round(self.failure_rate, 4),
+            "window_calls": len(self._window),
+            "window_failures": self._window_failures,
+            "half_open_in_flight": self._half_open_calls,
+            "seconds_since_opened": (
+                round(time.monotonic() - self._opened_at, 1) if self.times_opened else None
+            ),
+            "total_calls": self.total_calls,
+            "total_failures": self.total_failures,
+            "total_rejected": self.total_rejected,
+            "times_opened": self.times_opened,
+        }
+
 
 _breakers: dict[str, CircuitBreaker] = {}
 
+# Scoped breakers (one per host) are evicted once idle and closed beyond this many
+MAX_BREAKERS = 1024
+BREAKER_IDLE_SECONDS = 600.0
 
-def _get_breaker(name: str, **kwargs: Any) -> CircuitBreaker:
+
+def _evict_idle_breakers() -> None:
+    cutoff = time.monotonic() - BREAKER_IDLE_SECONDS
+    for key in [
+        k for k, b in _breakers.items()
+        if b.state == CircuitState.CLOSED and b._last_used < cutoff
+    ]:
+        del _breakers[key]
+
+
+def get_breaker(name: str, **kwargs: Any) -> CircuitBreaker:
     if name not in _breakers:
+        if len(_breakers) >= MAX_BREAKERS:
+            _evict_idle_breakers()
         _breakers[name] = CircuitBreaker(name=name, **kwargs)
     return _breakers[name]
 
 
-class CircuitOpenError(Exception):
-    pass
+def get_breaker_snapshots(prefix: str = "") -> list[dict]:
+    """State and metrics for every breaker whose name starts with ``prefix``."""
+    return [b.snapshot() for name, b in sorted(_breakers.items()) if name.startswith(prefix)]
 
 
 def circuit_breaker(
     name: str,
     failure_threshold: int = 5,
     recovery_timeout: float = 30.0,
+    half_open_max_calls: int = 1,
+    failure_rate_threshold: float = 0.5,
+    window_seconds: float = 60.0,
+    scope: Optional[Callable[..., str]] = None,
+    failure_on: Tuple[Type[BaseException], ...] = (Exception,),
+    ignore: Tuple[Type[BaseException], ...] = (),
 ) -> Callable:
-    """Decorator that wraps an async function with a circuit breaker."""
+    """Decorator that wraps an async function with a circuit breaker.
+
+    ``scope`` receives the call's arguments and returns a key (e.g. the target host);
+    each key gets its own breaker named ``"{name}:{key}"``. ``failure_on`` and
+    ``ignore`` are passed to ``CircuitBreaker.call``.
+    """
 
     def decorator(func: Callable) -> Callable:
         @functools.wraps(func)
         async def wrapper(*args: Any, **kwargs: Any) -> Any:
-            breaker = _get_breaker(
-                name,
+            breaker_name = name
+            if scope is not None:
+                key = scope(*args, **kwargs)
+                if key:
+                    breaker_name = f"{name}:{key}"
+            breaker = get_breaker(
+                breaker_name,
                 failure_threshold=failure_threshold,
                 recovery_timeout=recovery_timeout,
+                half_open_max_calls=half_open_max_calls,
+                failure_rate_threshold=failure_rate_threshold,
+                window_seconds=window_seconds,
             )
-
-            if breaker.state == CircuitState.OPEN:
-                raise CircuitOpenError(
-                    f"Circuit '{name}' is OPEN. Service unavailable."
-                )
-
-            try:
-                result = await func(*args, **kwargs)
-                breaker.record_success()
-                return result
-            except CircuitOpenError:
-                raise
-            except Exception as e:
-                breaker.record_failure()
-                raise
+            return await breaker.call(func, *args, failure_on=failure_on, ignore=ignore, **kwargs)
 
         return wrapper
     return decorator
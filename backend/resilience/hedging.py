@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+from collections import deque
+from typing import Optional
+
+
+class LatencyTracker:
+    """Sliding window of recent call latencies used to pick a percentile-based hedge delay."""
+
+    def __init__(self, window: int = 200, min_samples: int = 20) -> None:
+        self._samples: deque[float] = deque(maxlen=window)
+        self.min_samples = min_samples
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Return the q-quantile (0..1) of recorded latencies, or None until warmed up."""
+        if len(self._samples) < self.min_samples:
+            return None
+        ordered = sorted(self._samples)
+        idx = min(len(ordered) - 1, max(0, int(q * len(ordered))))
+        return ordered[idx]
+
+    def hedge_delay(self, q: float, default: float, min_delay: float = 0.0) -> float:
+        value = self.percentile(q)
+        if value is None:
+            return default
+        return max(value, min_delay)
+
+
+_trackers: dict[str, LatencyTracker] = {}
+
+
+def get_latency_tracker(key: str) -> LatencyTracker:
+    if key not in _trackers:
+        _trackers[key] = LatencyTracker()
+    return _trackers[key]
@@ -3,13 +3,68 @@ from __future__ import annotations
 import asyncio
 import functools
 import random
-from typing import Any, Callable, Tuple, Type
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Optional, Tuple, Type
 
 from ..logging_config import get_logger
+from ..observability.tracing import span
 
 logger = get_logger("resilience.retry")
 
 
+def retry_after_seconds(exc: BaseException) -> Optional[float]:
+    """Server-requested delay from an exception, if any.
+
+    Checks an explicit ``retry_after`` attribute first, then the ``Retry-After`` /
+    ``retry-after-ms`` headers of an attached HTTP response (httpx and the OpenAI /
+    Anthropic SDK errors all expose ``.response.headers``).
+    """
+    explicit = getattr(exc, "retry_after", None)
+    if isinstance(explicit, (int, float)):
+        return max(float(explicit), 0.0)
+
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+
+    value = headers.get("retry-after-ms")
+    if value:
+        try:
+            return max(float(value) / 1000.0, 0.0)
+        except ValueError:
+            pass
+
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(
+    attempt: int,
+    base_delay: float,
+    max_delay: float,
+    jitter: bool = True,
+    retry_after: Optional[float] = None,
+) -> float:
+    """Exponential backoff for ``attempt`` (1-based), never shorter than ``retry_after``."""
+    delay = min(base_delay * (2 ** (attempt - 1)), max_delay)
+    if jitter:
+        delay += random.uniform(0, delay * 0.5)
+    if retry_after is not None:
+        delay = max(delay, retry_after)
+    return delay
+
+
 def retry(
     max_attempts: int = 3,
     base_delay: float = 1.0,
@@ -28,19 +83,25 @@ def retry(
                     return await func(*args, **kwargs)
                 except retry_on as e:
                     last_exception = e
+                    retry_after = retry_after_seconds(e)
                     if attempt == max_attempts:
                         logger.warning(
-                            f"{func.__name__} failed after {max_attempts} attempts: {e}"
+                            "%s failed after %d attempts: %s", func.__name__, max_attempts, e
+                        )
+                        raise
+                    if retry_after is not None and retry_after > max_delay:
+                        logger.warning(
+                            "%s asked to retry after %.0fs (> %.0fs), giving up",
+                            func.__name__, retry_after, max_delay,
                         )
                         raise
-                    delay = min(base_delay * (2 ** (attempt - 1)), max_delay)
-                    if jitter:
-                        delay += random.uniform(0, delay * 0.5)
+                    delay = backoff_delay(attempt, base_delay, max_delay, jitter, retry_after)
                     logger.info(
-                        f"{func.__name__} attempt {attempt}/{max_attempts} failed: {e}. "
-                        f"Retrying in {delay:.1f}s"
+                        "%s attempt %d/%d failed: %s. Retrying in %.1fs",
+                        func.__name__, attempt, max_attempts, e, delay,
                     )
-                    await asyncio.sleep(delay)
+                    with span("retry.backoff", function=func.__name__, attempt=attempt, error=str(e)[:200]):
+                        await asyncio.sleep(delay)
             raise last_exception  # unreachable but satisfies type checker
 
         return wrapper
@@ -0,0 +1,19 @@
+from .serializer import EventSerializer, encode_event, dumps
+from .transport import EventStream, StreamStats, TransportOptions
+from .runs import ResearchRun, RunManager, Subscriber, get_run_manager
+from .multiplex import ClientMessage, RunMultiplexer
+
+__all__ = [
+    "EventSerializer",
+    "encode_event",
+    "dumps",
+    "EventStream",
+    "StreamStats",
+    "TransportOptions",
+    "ResearchRun",
+    "RunManager",
+    "Subscriber",
+    "get_run_manager",
+    "ClientMessage",
+    "RunMultiplexer",
+]
@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import asyncio
+import uuid
+from collections import deque
+from typing import Literal, Optional
+
+from fastapi import WebSocket, WebSocketDisconnect
+from pydantic import BaseModel, Field, ValidationError
+
+from ..logging_config import get_logger
+from .runs import ResearchRun, RunManager, StreamItem, Subscriber
+from .serializer import EventSerializer, dumps
+
+logger = get_logger("streaming.multiplex")
+
+
+class ClientMessage(BaseModel):
+    """A control message from a WebSocket client.
+
+    - ``start``: begin a run for ``query`` and subscribe to it. The server assigns the
+      run id; a ``run_id`` sent with ``start`` is only echoed back as ``ref`` so the
+      client can match the ``started`` reply to its request.
+    - ``subscribe``: attach to an existing run, replaying its events from the start.
+    - ``resume``: attach to an existing run, replaying only events after ``after``.
+    - ``unsubscribe``: stop receiving a run's events (the run's orphan policy applies).
+    - ``stop``: cancel a run.
+    - ``ack``: the client has processed a run's events up to ``seq``, returning credit.
+    """
+
+    type: Literal["start", "subscribe", "resume", "unsubscribe", "stop", "ack"]
+    run_id: Optional[str] = None
+    query: Optional[str] = Field(default=None, min_length=1, max_length=2000)
+    after: int = 0
+    seq: int = 0
+    # Unacknowledged events allowed in flight for this run; 0 turns flow control off
+    window: Optional[int] = Field(default=None, ge=0)
+
+
+class _Subscription:
+    """One run on one connection: its subscriber buffer, credit window and pump task."""
+
+    __slots__ = ("run", "sub", "serializer", "window", "in_flight", "credit", "task")
+
+    def __init__(self, run: ResearchRun, sub: Subscriber, window: int) -> None:
+        self.run = run
+        self.sub = sub
+        self.serializer = EventSerializer(run.run_id)
+        self.window = window
+        self.in_flight: deque[int] = deque()
+        self.credit = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+
+    def ack(self, seq: int) -> None:
+        while self.in_flight and self.in_flight[0] <= seq:
+            self.in_flight.popleft()
+        self.credit.set()
+
+    async def wait_for_credit(self) -> None:
+        while self.window and len(self.in_flight) >= self.window:
+            self.credit.clear()
+            await self.credit.wait()
+
+
+class RunMultiplexer:
+    """Serves many research runs over one WebSocket.
+
+    Each subscribed run gets its own pump task reading from a ``Subscriber``, so a
+    client that stops acknowledging one run only stalls that run: its buffer sheds
+    low-priority events and then holds back that run's pipeline, up to the stall
+    timeout after which the subscription is dropped with a ``stalled`` reply, while
+    other runs on the connection keep flowing. Events are sent as text frames in the same JSON shape
+    as the SSE stream (with ``seq`` and ``run_id``); control replies carry ``type``.
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        manager: RunManager,
+        window: int = 32,
+        max_runs: int = 16,
+    ) -> None:
+        self.websocket = websocket
+        self.manager = manager
+        self.window = window
+        self.max_runs = max_runs
+        self._subscriptions: dict[str, _Subscription] = {}
+        self._send_lock = asyncio.Lock()
+
+    async def _send(self, data: bytes) -> None:
+        async with self._send_lock:
+            await self.websocket.send_text(data.decode("utf-8"))
+
+    async def _reply(self, type: str, run_id: Optional[str] = None, **fields) -> None:
+        await self._send(dumps({"type": type, "run_id": run_id, **fields}))
+
+    async def serve(self) -> None:
+        try:
+            while True:
+                text = await self.websocket.receive_text()
+                try:
+                    message = ClientMessage.model_validate_json(text)
+                except ValidationError as e:
+                    await self._reply("error", message=f"Invalid message: {e.errors()[0]['msg']}")
+                    continue
+                await self._handle(message)
+        except WebSocketDisconnect:
+            pass
+        finally:
+            for run_id in list(self._subscriptions):
+                self._unsubscribe(run_id)
+
+    async def _handle(self, message: ClientMessage) -> None:
+        if message.type == "ack":
+            subscription = self._subscriptions.get(message.run_id or "")
+            if subscription is not None:
+                subscription.ack(message.seq)
+            return
+
+        if message.type == "start":
+            ref = message.run_id
+            if not message.query:
+                await self._reply("error", ref=ref, message="start requires a query")
+                return
+            if len(self._subscriptions) >= self.max_runs:
+                await self._reply("error", ref=ref, message=f"At most {self.max_runs} runs per connection")
+                return
+            run = self.manager.start(str(uuid.uuid4()), message.query)
+            self._subscribe(run, 0, message.window)
+            await self._reply("started", run.run_id, ref=ref)
+            return
+
+        run = self.manager.get(message.run_id or "")
+        if run is None:
+            await self._reply("error", message.run_id, message="Unknown or expired run")
+            return
+
+        if message.type in ("subscribe", "resume"):
+            if run.run_id in self._subscriptions:
+                self._unsubscribe(run.run_id)
+            elif len(self._subscriptions) >= self.max_runs:
+                await self._reply("error", run.run_id, message=f"At most {self.max_runs} runs per connection")
+                return
+            after = message.after if message.type == "resume" else 0
+            self._subscribe(run, after, message.window)
+            await self._reply("subscribed", run.run_id, after=after)
+        elif message.type == "unsubscribe":
+            self._unsubscribe(run.run_id)
+            await self._reply("unsubscribed", run.run_id)
+        elif message.type == "stop":
+            run.stop()
+            await self._reply("stopping", run.run_id)
+
+    def _subscribe(self, run: ResearchRun, after: int, window: Optional[int]) -> None:
+        replay, sub = run.subscribe(after)
+        subscription = _Subscription(run, sub, self.window if window is None else window)
+        subscription.task = asyncio.create_task(self._pump(subscription, replay))
+        self._subscriptions[run.run_id] = subscription
+
+    def _unsubscribe(self, run_id: str) -> None:
+        subscription = self._subscriptions.pop(run_id, None)
+        if subscription is None:
+            return
+        if subscription.task is not None and subscription.task is not asyncio.current_task():
+            subscription.task.cancel()
+        subscription.run.unsubscribe(subscription.sub)
+
+    async def _pump(self, subscription: _Subscription, replay: list[StreamItem]) -> None:
+        run_id = subscription.run.run_id
+        try:
+            for item in replay:
+                await self._forward(subscription, item)
+            while (item := await subscription.sub.get()) is not None:
+                await self._forward(subscription, item)
+            if subscription.sub.stalled:
+                await self._reply("stalled", run_id)
+            elif not subscription.sub.closed:
+                await self._reply("ended", run_id, seq=subscription.run.seq)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Usually the socket closing under us; serve() cleans up the rest
+            logger.debug("Run %s pump stopped: %s", run_id, e)
+        if self._subscriptions.get(run_id) is subscription:
+            self._unsubscribe(run_id)
+
+    async def _forward(self, subscription: _Subscription, item: StreamItem) -> None:
+        await subscription.wait_for_credit()
+        seq, event = item
+        if subscription.window:
+            subscription.in_flight.append(seq)
+        await self._send(subscription.serializer.encode(event, seq))
@@ -0,0 +1,323 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from typing import Callable, Literal, Optional
+
+from ..agents.supervisor import Supervisor
+from ..config import get_settings
+from ..models.events import ErrorEvent, SSEEvent
+from ..logging_config import get_logger
+
+logger = get_logger("streaming.runs")
+
+OrphanPolicy = Literal["cancel", "detach"]
+
+# Progress chatter a slow consumer can lose without missing results
+LOW_PRIORITY_EVENTS = frozenset({"agent_thinking", "agent_action"})
+
+StreamItem = tuple[int, SSEEvent]
+
+
+class Subscriber:
+    """Bounded per-consumer buffer of (seq, event).
+
+    When full, low-priority events are dropped (the incoming one, or else the oldest
+    buffered one) and the producer only waits when the buffer holds nothing but
+    high-priority events. If the consumer frees no space for ``stall_timeout`` seconds
+    (0 = wait forever) the subscriber is marked ``stalled`` and ``put`` gives up.
+    """
+
+    def __init__(self, max_events: int = 64, stall_timeout: float = 0.0) -> None:
+        self.max_events = max_events
+        self.stall_timeout = stall_timeout
+        self.stalled = False
+        self.dropped = 0
+        self.delivered = 0
+        self._buffer: deque[StreamItem] = deque()
+        self._readable = asyncio.Event()
+        self._writable = asyncio.Event()
+        self._writable.set()
+        self._finished = False
+        self.closed = False
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    def _append(self, item: StreamItem) -> None:
+        self._buffer.append(item)
+        self._readable.set()
+
+    async def put(self, item: StreamItem) -> None:
+        while not self.closed:
+            if len(self._buffer) < self.max_events:
+                self._append(item)
+                return
+            if item[1].event in LOW_PRIORITY_EVENTS:
+                self.dropped += 1
+                return
+            for i, (_, buffered) in enumerate(self._buffer):
+                if buffered.event in LOW_PRIORITY_EVENTS:
+                    del self._buffer[i]
+                    self.dropped += 1
+                    self._append(item)
+                    return
+            self._writable.clear()
+            if not self.stall_timeout:
+                await self._writable.wait()
+                continue
+            try:
+                await asyncio.wait_for(self._writable.wait(), self.stall_timeout)
+            except asyncio.TimeoutError:
+                self.stalled = True
+                return
+
+    async def get(self) -> Optional[StreamItem]:
+        """Next item, or None once the run has finished and the buffer is drained (or closed)."""
+        while not self._buffer:
+            if self._finished or self.closed:
+                return None
+            self._readable.clear()
+            await self._readable.wait()
+        if self.closed:
+            return None
+        self.delivered += 1
+        item = self._buffer.popleft()
+        self._writable.set()
+        return item
+
+    def finish(self) -> None:
+        """No more events will be produced; readers drain what is buffered."""
+        self._finished = True
+        self._readable.set()
+
+    def close(self) -> None:
+        """The consumer went away; unblock both sides."""
+        self.closed = True
+        self._readable.set()
+        self._writable.set()
+
+
+class ResearchRun:
+    """One supervisor run executing in its own task, fanned out to any number of
+    subscribers. Events are numbered and kept for replay to late or reconnecting
+    subscribers (low-priority ones only while the history is under its cap)."""
+
+    def __init__(
+        self,
+        run_id: str,
+        query: str,
+        buffer_events: int = 64,
+        history_max_events: int = 2000,
+        stall_timeout: float = 0.0,
+        on_orphaned: Optional[Callable[[ResearchRun], None]] = None,
+        on_finished: Optional[Callable[[ResearchRun], None]] = None,
+    ) -> None:
+        self.run_id = run_id
+        self.query = query
+        self.cancel_event = asyncio.Event()
+        self.buffer_events = buffer_events
+        self.history_max_events = history_max_events
+        self.stall_timeout = stall_timeout
+        self.history: list[StreamItem] = []
+        self.subscribers: set[Subscriber] = set()
+        self.seq = 0
+        self.started_at = time.monotonic()
+        self.finished_at: Optional[float] = None
+        self.orphaned_at: Optional[float] = None
+        self.dropped = 0
+        self.stalled = 0
+        self._task: Optional[asyncio.Task] = None
+        self._on_orphaned = on_orphaned
+        self._on_finished = on_finished
+
+    @property
+    def finished(self) -> bool:
+        return self.finished_at is not None
+
+    def start(self) -> None:
+        self._task = asyncio.get_running_loop().create_task(self._produce(), name=f"research-{self.run_id}")
+
+    async def _produce(self) -> None:
+        try:
+            supervisor = Supervisor()
+            async for event in supervisor.run(self.query, cancel_event=self.cancel_event, run_id=self.run_id):
+                await self._publish(event)
+        except asyncio.CancelledError:
+            await self._publish(ErrorEvent.create("Cancelled"))
+        except Exception as e:
+            logger.error("Research run %s failed: %s", self.run_id, e, exc_info=True)
+            await self._publish(ErrorEvent.create(str(e)))
+        finally:
+            self.finished_at = time.monotonic()
+            for sub in self.subscribers:
+                sub.finish()
+            if self._on_finished is not None:
+                self._on_finished(self)
+
+    async def _publish(self, event: SSEEvent) -> None:
+        self.seq += 1
+        item = (self.seq, event)
+        if event.event not in LOW_PRIORITY_EVENTS or len(self.history) < self.history_max_events:
+            self.history.append(item)
+        for sub in list(self.subscribers):
+            await sub.put(item)
+            if sub.stalled and sub in self.subscribers:
+                # Connected but not reading: drop it rather than hold up the pipeline
+                # (and every other subscriber); it can resume from its last seq
+                logger.warning(
+                    "Run %s: subscriber stalled for %.0fs, disconnecting it", self.run_id, self.stall_timeout
+                )
+                self.stalled += 1
+                self.unsubscribe(sub)
+
+    def subscribe(self, after: int = 0) -> tuple[list[StreamItem], Subscriber]:
+        """Attach a consumer; returns history after ``after`` to replay first.
+
+        Runs without awaiting, so no event can fall between the replay and the live feed.
+        """
+        sub = Subscriber(self.buffer_events, self.stall_timeout)
+        if self.finished:
+            sub.finish()
+        self.subscribers.add(sub)
+        self.orphaned_at = None
+        return [item for item in self.history if item[0] > after], sub
+
+    def unsubscribe(self, sub: Subscriber) -> None:
+        sub.close()
+        if sub not in self.subscribers:
+            return
+        self.subscribers.discard(sub)
+        self.dropped += sub.dropped
+        if not self.subscribers and not self.finished:
+            self.orphaned_at = time.monotonic()
+            if self._on_orphaned is not None:
+                self._on_orphaned(self)
+
+    def stop(self) -> None:
+        """Ask the pipeline to stop at its next checkpoint."""
+        self.cancel_event.set()
+
+    def cancel(self) -> None:
+        """Stop now, interrupting in-flight LLM and scrape calls."""
+        self.cancel_event.set()
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+
+    def snapshot(self) -> dict:
+        return {
+            "run_id": self.run_id,
+            "state": "finished" if self.finished else "detached" if self.orphaned_at else "running",
+            "events": self.seq,
+            "subscribers": len(self.subscribers),
+            "dropped_events": self.dropped + sum(s.dropped for s in self.subscribers),
+            "stalled_subscribers": self.stalled,
+            "age_seconds": round(time.monotonic() - self.started_at, 1),
+        }
+
+
+class RunManager:
+    """Owns research runs independently of the HTTP streams reading them.
+
+    When the last subscriber of a running run disconnects, the run is either cancelled
+    after a grace period (so a quick reconnect can resume it) or detached and left to
+    finish. Finished runs stay available for replay for ``retention_seconds``.
+    """
+
+    def __init__(
+        self,
+        orphan_policy: OrphanPolicy = "cancel",
+        orphan_grace_seconds: float = 5.0,
+        retention_seconds: float = 300.0,
+        buffer_events: int = 64,
+        history_max_events: int = 2000,
+        stall_timeout: float = 0.0,
+    ) -> None:
+        self.orphan_policy = orphan_policy
+        self.orphan_grace_seconds = orphan_grace_seconds
+        self.retention_seconds = retention_seconds
+        self.buffer_events = buffer_events
+        self.history_max_events = history_max_events
+        self.stall_timeout = stall_timeout
+        self.runs: dict[str, ResearchRun] = {}
+        self.orphans_cancelled = 0
+
+    def start(self, run_id: str, query: str) -> ResearchRun:
+        """Start a run under a fresh, server-generated ``run_id``."""
+        if run_id in self.runs:
+            raise ValueError(f"Run {run_id} already exists")
+        run = ResearchRun(
+            run_id,
+            query,
+            buffer_events=self.buffer_events,
+            history_max_events=self.history_max_events,
+            stall_timeout=self.stall_timeout,
+            on_orphaned=self._orphaned,
+            on_finished=self._finished,
+        )
+        self.runs[run_id] = run
+        run.start()
+        return run
+
+    def get(self, run_id: str) -> Optional[ResearchRun]:
+        return self.runs.get(run_id)
+
+    def _orphaned(self, run: ResearchRun) -> None:
+        if self.orphan_policy == "detach":
+            logger.info("Run %s lost its last subscriber, continuing detached", run.run_id)
+            return
+        orphaned_at = run.orphaned_at
+        logger.info(
+            "Run %s lost its last subscriber, cancelling in %.0fs", run.run_id, self.orphan_grace_seconds
+        )
+
+        def cancel_if_still_orphaned() -> None:
+            # A resubscribe resets orphaned_at; a later orphaning schedules its own check
+            if run.orphaned_at is not None and run.orphaned_at == orphaned_at and not run.finished:
+                logger.info("Cancelling orphaned run %s", run.run_id)
+                self.orphans_cancelled += 1
+                run.cancel()
+
+        asyncio.get_running_loop().call_later(self.orphan_grace_seconds, cancel_if_still_orphaned)
+
+    def _finished(self, run: ResearchRun) -> None:
+        asyncio.get_running_loop().call_later(self.retention_seconds, self._evict, run)
+
+    def _evict(self, run: ResearchRun) -> None:
+        if self.runs.get(run.run_id) is run:
+            del self.runs[run.run_id]
+
+    def cancel_all(self) -> None:
+        for run in self.runs.values():
+            run.cancel()
+
+    def stats(self) -> dict:
+        snapshots = [r.snapshot() for r in self.runs.values()]
+        return {
+            "running": sum(s["state"] == "running" for s in snapshots),
+            "detached": sum(s["state"] == "detached" for s in snapshots),
+            "finished": sum(s["state"] == "finished" for s in snapshots),
+            "subscribers": sum(s["subscribers"] for s in snapshots),
+            "dropped_events": sum(s["dropped_events"] for s in snapshots),
+            "stalled_subscribers": sum(s["stalled_subscribers"] for s in snapshots),
+            "orphans_cancelled": self.orphans_cancelled,
+        }
+
+
+_manager: Optional[RunManager] = None
+
+
+def get_run_manager() -> RunManager:
+    global _manager
+    if _manager is None:
+        settings = get_settings()
+        _manager = RunManager(
+            orphan_policy=settings.orphaned_run_policy,
+            orphan_grace_seconds=settings.orphaned_run_grace_seconds,
+            retention_seconds=settings.finished_run_retention_seconds,
+            buffer_events=settings.stream_buffer_max_events,
+            history_max_events=settings.run_history_max_events,
+            stall_timeout=settings.stream_stall_timeout_seconds,
+        )
+    return _manager
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import json
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+from ..models.events import SSEEvent
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+
+def _json_default(obj: Any) -> Any:
+    if isinstance(obj, datetime):
+        # Same shape as orjson's OPT_UTC_Z and pydantic's JSON mode
+        text = obj.astimezone(timezone.utc).isoformat() if obj.tzinfo else obj.isoformat()
+        return text.replace("+00:00", "Z")
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump(mode="json")
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+if orjson is not None:
+    def dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj, default=_json_default, option=orjson.OPT_UTC_Z)
+else:
+    def dumps(obj: Any) -> bytes:
+        return json.dumps(obj, default=_json_default, separators=(",", ":")).encode("utf-8")
+
+
+def encode_event(event: SSEEvent) -> bytes:
+    """JSON body of ``event`` without a run_id, encoded once per event instance.
+
+    Events are immutable once emitted, so the bytes are cached on the event and reused
+    when the same event (e.g. a large report) is sent to another subscriber or replayed.
+    """
+    cached = event._encoded
+    if cached is None:
+        cached = dumps({"event": event.event, "data": event.data, "timestamp": event.timestamp})
+        event._encoded = cached
+    return cached
+
+
+class EventSerializer:
+    """Encodes one run's events, splicing in a pre-encoded ``run_id`` field."""
+
+    def __init__(self, run_id: str) -> None:
+        self.run_id = run_id
+        self._run_id_field = b',"run_id":' + dumps(run_id) + b"}"
+
+    def encode(self, event: SSEEvent, seq: Optional[int] = None) -> bytes:
+        """The event as a single JSON object with ``run_id`` (and ``seq`` if given)."""
+        body = encode_event(event)[:-1]
+        if seq is not None:
+            body += b',"seq":%d' % seq
+        return body + self._run_id_field
+
+    def sse(self, event: SSEEvent) -> bytes:
+        return b"data: " + self.encode(event) + b"\n\n"
@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import asyncio
+import zlib
+from dataclasses import dataclass
+from typing import AsyncIterator, Literal, Mapping, Optional
+
+from ..models.events import SSEEvent
+from ..logging_config import get_logger
+from .serializer import EventSerializer
+
+logger = get_logger("streaming.transport")
+
+StreamFormat = Literal["sse", "ndjson"]
+StreamEncoding = Literal["gzip", "deflate"]
+StreamItem = tuple[Optional[int], SSEEvent]
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+COALESCE_HEADER = "x-event-coalesce-ms"
+
+# Sent as soon as they are produced, ending any coalescing window
+_FLUSH_EVENTS = frozenset({"error", "done"})
+
+
+def _accepts(header: str, token: str) -> bool:
+    """True if a comma-separated Accept/Accept-Encoding header lists ``token`` with q > 0."""
+    for part in header.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        if name.strip() == token:
+            q = params.strip()
+            return not (q.startswith("q=") and q[2:].strip() in ("0", "0.0", "0.00", "0.000"))
+    return False
+
+
+@dataclass(frozen=True)
+class TransportOptions:
+    """How one stream is framed, compressed and batched, negotiated from request headers.
+
+    - ``Accept: application/x-ndjson`` selects newline-delimited JSON instead of SSE.
+    - ``Accept-Encoding: gzip`` (preferred) or ``deflate`` compresses the stream, with a
+      sync flush after every write so each frame can be decoded as it arrives.
+    - ``X-Event-Coalesce-Ms: <n>`` batches events produced within n ms into one write.
+    """
+
+    format: StreamFormat = "sse"
+    encoding: Optional[StreamEncoding] = None
+    coalesce_ms: int = 0
+
+    @classmethod
+    def from_headers(
+        cls,
+        headers: Mapping[str, str],
+        compression: bool = True,
+        default_coalesce_ms: int = 0,
+        max_coalesce_ms: int = 250,
+    ) -> TransportOptions:
+        fmt: StreamFormat = "ndjson" if _accepts(headers.get("accept", ""), NDJSON_MEDIA_TYPE) else "sse"
+
+        encoding: Optional[StreamEncoding] = None
+        if compression:
+            accept_encoding = headers.get("accept-encoding", "")
+            if _accepts(accept_encoding, "gzip"):
+                encoding = "gzip"
+            elif _accepts(accept_encoding, "deflate"):
+                encoding = "deflate"
+
+        coalesce_ms = default_coalesce_ms
+        requested = headers.get(COALESCE_HEADER)
+        if requested is not None:
+            try:
+                coalesce_ms = int(requested)
+            except ValueError:
+                pass
+        coalesce_ms = max(0, min(coalesce_ms, max_coalesce_ms))
+
+        return cls(format=fmt, encoding=encoding, coalesce_ms=coalesce_ms)
+
+    @property
+    def media_type(self) -> str:
+        return NDJSON_MEDIA_TYPE if self.format == "ndjson" else "text/event-stream"
+
+    def response_headers(self) -> dict[str, str]:
+        headers = {"Vary": "Accept, Accept-Encoding"}
+        if self.encoding:
+            headers["Content-Encoding"] = self.encoding
+        return headers
+
+
+@dataclass
+class StreamStats:
+    events: int = 0
+    writes: int = 0
+    raw_bytes: int = 0
+    sent_bytes: int = 0
+
+    def to_dict(self) -> dict:
+        return {
+            "events": self.events,
+            "writes": self.writes,
+            "raw_bytes": self.raw_bytes,
+            "sent_bytes": self.sent_bytes,
+        }
+
+
+class EventStream:
+    """Turns a run's events into response body chunks according to ``options``."""
+
+    def __init__(self, serializer: EventSerializer, options: TransportOptions, compression_level: int = 6) -> None:
+        self.serializer = serializer
+        self.options = options
+        self.stats = StreamStats()
+        self._compressor = None
+        if options.encoding is not None:
+            wbits = 16 + zlib.MAX_WBITS if options.encoding == "gzip" else zlib.MAX_WBITS
+            self._compressor = zlib.compressobj(compression_level, zlib.DEFLATED, wbits)
+
+    def frame(self, seq: Optional[int], event: SSEEvent) -> bytes:
+        body = self.serializer.encode(event, seq)
+        if self.options.format == "ndjson":
+            return body + b"\n"
+        if seq is not None:
+            # Lets EventSource reconnect with Last-Event-ID
+            return b"id: %d\ndata: " % seq + body + b"\n\n"
+        return b"data: " + body + b"\n\n"
+
+    def _write(self, data: bytes) -> bytes:
+        self.stats.writes += 1
+        self.stats.raw_bytes += len(data)
+        if self._compressor is not None:
+            data = self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+        self.stats.sent_bytes += len(data)
+        return data
+
+    async def _batches(self, events: AsyncIterator[StreamItem]) -> AsyncIterator[list[StreamItem]]:
+        """Group events that arrive within the coalescing window of the first one."""
+        if not self.options.coalesce_ms:
+            async for item in events:
+                yield [item]
+            return
+
+        loop = asyncio.get_running_loop()
+        window = self.options.coalesce_ms / 1000
+        it = events.__aiter__()
+        pending: Optional[asyncio.Future] = None
+        try:
+            while True:
+                if pending is None:
+                    pending = asyncio.ensure_future(it.__anext__())
+                try:
+                    first = await pending
+                except StopAsyncIteration:
+                    return
+                pending = None
+
+                batch = [first]
+                deadline = loop.time() + window
+                while batch[-1][1].event not in _FLUSH_EVENTS:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    pending = asyncio.ensure_future(it.__anext__())
+                    done, _ = await asyncio.wait({pending}, timeout=remaining)
+                    if not done:
+                        # Window closed; the in-flight read carries over to the next batch
+                        break
+                    pending = None
+                    try:
+                        batch.append(done.pop().result())
+                    except StopAsyncIteration:
+                        yield batch
+                        return
+                yield batch
+        finally:
+            if pending is not None:
+                pending.cancel()
+
+    async def encode(self, events: AsyncIterator[StreamItem]) -> AsyncIterator[bytes]:
+        """Encode (seq, event) pairs; ``seq`` may be None for unnumbered events."""
+        async for batch in self._batches(events):
+            self.stats.events += len(batch)
+            yield self._write(b"".join(self.frame(seq, e) for seq, e in batch))
+        if self._compressor is not None:
+            tail = self._compressor.flush(zlib.Z_FINISH)
+            self.stats.sent_bytes += len(tail)
+            yield tail
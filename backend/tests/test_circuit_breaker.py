@@ -0,0 +1,50 @@
+import asyncio
+import time
+
+import pytest
+
+from backend.resilience.circuit_breaker import CircuitBreaker, CircuitOpenError, CircuitState
+
+
+def _opened(name: str, **kwargs) -> CircuitBreaker:
+    breaker = CircuitBreaker(name, failure_threshold=2, recovery_timeout=0.05, **kwargs)
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CircuitState.OPEN
+    time.sleep(0.06)
+    return breaker
+
+
+def test_half_open_admits_only_the_probe_quota():
+    breaker = _opened("probe-test", half_open_max_calls=1)
+
+    async def scenario():
+        release = asyncio.Event()
+
+        async def slow_probe():
+            await release.wait()
+            return "ok"
+
+        probe = asyncio.create_task(breaker.call(slow_probe))
+        await asyncio.sleep(0)
+        # The probe holds the only half-open slot; everyone else is turned away
+        with pytest.raises(CircuitOpenError):
+            await breaker.call(slow_probe)
+        release.set()
+        assert await probe == "ok"
+
+    asyncio.run(asyncio.wait_for(scenario(), 5))
+    assert breaker.state == CircuitState.CLOSED
+    assert breaker.total_rejected == 1
+
+
+def test_failed_probe_reopens_the_circuit():
+    breaker = _opened("reopen-test")
+
+    async def failing():
+        raise RuntimeError("still down")
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(breaker.call(failing))
+    assert breaker.state == CircuitState.OPEN
+    assert breaker.times_opened == 2
@@ -0,0 +1,31 @@
+from backend.observability.collectors import cascade_metrics, hedge_metrics
+from backend.providers import hedging, registry
+
+
+def _samples(families) -> dict[tuple, float]:
+    return {(family.name, labels): value for family in families for labels, value in family.samples}
+
+
+def test_cascade_metrics_report_calls_and_escalations_per_agent(monkeypatch):
+    monkeypatch.setattr(registry, "_cascade_stats", {
+        "critic": registry.CascadeStats(calls=10, escalations=3, reasons={"low_score": 2, "parse_failure": 1}),
+    })
+
+    samples = _samples(cascade_metrics())
+
+    assert samples[("llm_cascade_calls_total", ("critic",))] == 10
+    assert samples[("llm_cascade_escalations_total", ("critic", "low_score"))] == 2
+    assert samples[("llm_cascade_escalations_total", ("critic", "parse_failure"))] == 1
+
+
+def test_hedge_metrics_report_issued_won_and_denied(monkeypatch):
+    monkeypatch.setattr(hedging, "_hedge_stats", hedging.HedgeStats(calls=50, hedges=4, backup_wins=3, budget_denied=2))
+    monkeypatch.setattr(hedging, "_hedge_budget", hedging.RatioBudget(ratio=0.1, initial_balance=1.5))
+
+    samples = _samples(hedge_metrics())
+
+    assert samples[("llm_hedge_calls_total", ())] == 50
+    assert samples[("llm_hedges_total", ("issued",))] == 4
+    assert samples[("llm_hedges_total", ("backup_won",))] == 3
+    assert samples[("llm_hedges_total", ("budget_denied",))] == 2
+    assert samples[("llm_hedge_budget_balance", ())] == 1.5
@@ -0,0 +1,111 @@
+import asyncio
+import importlib
+
+import httpx
+import pytest
+
+from backend.resilience.circuit_breaker import CircuitState
+from backend.tools.content_extractor import ContentExtractor
+from backend.tools.fact_cache import content_hash
+from backend.tools.firecrawl_client import FirecrawlClient
+from backend.tools.page_spill import PageSpill
+
+# The package re-exports functions under the same names as these modules
+circuit_breaker = importlib.import_module("backend.resilience.circuit_breaker")
+retry = importlib.import_module("backend.resilience.retry")
+
+
+@pytest.fixture(autouse=True)
+def fresh_breakers(monkeypatch):
+    monkeypatch.setattr(circuit_breaker, "_breakers", {})
+    monkeypatch.setattr(retry, "backoff_delay", lambda *args, **kwargs: 0.0)
+
+
+def _client(handler) -> FirecrawlClient:
+    client = FirecrawlClient("key", base_url="http://firecrawl.test/v1")
+    client._client = lambda: httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return client
+
+
+def _page(status_code: int) -> httpx.Response:
+    return httpx.Response(
+        200, json={"data": {"markdown": "Page text", "metadata": {"title": "T", "statusCode": status_code}}}
+    )
+
+
+def _host_state(host: str):
+    breaker = circuit_breaker._breakers.get(f"firecrawl_scrape:{host}")
+    return breaker.state if breaker else None
+
+
+def test_target_failures_only_open_that_hosts_breaker():
+    def handler(request):
+        return _page(503 if b"bad.example" in request.content else 200)
+
+    client = _client(handler)
+
+    async def scenario():
+        for i in range(6):
+            assert await client._safe_scrape(f"https://bad.example/{i}") is None
+        return await client._safe_scrape("https://good.example/page")
+
+    page = asyncio.run(asyncio.wait_for(scenario(), 10))
+
+    assert page is not None and page.content == "Page text"
+    assert _host_state("bad.example") == CircuitState.OPEN
+    assert _host_state("good.example") == CircuitState.CLOSED
+
+
+@pytest.mark.parametrize("status", [429, 503])
+def test_firecrawl_errors_do_not_open_host_breakers(status):
+    client = _client(lambda request: httpx.Response(status, json={}))
+
+    async def scenario():
+        for i in range(8):
+            assert await client._safe_scrape(f"https://site{i % 2}.example/{i}") is None
+
+    asyncio.run(asyncio.wait_for(scenario(), 10))
+
+    assert _host_state("site0.example") == CircuitState.CLOSED
+    assert _host_state("site1.example") == CircuitState.CLOSED
+    vendor = circuit_breaker._breakers["firecrawl_api"]
+    assert vendor.state == (CircuitState.OPEN if status == 503 else CircuitState.CLOSED)
+
+
+def test_large_pages_are_spilled_with_the_full_body_hash():
+    body = "Intro paragraph. " * 200 + "The turbine efficiency reached 42 percent. " * 50
+    spill = PageSpill("test")
+    client = FirecrawlClient(
+        "key", base_url="http://firecrawl.test/v1", spill=spill, spill_threshold=1000, preview_chars=100
+    )
+
+    async def scenario():
+        content = await client._make_content("https://a.example", "A", body, "firecrawl_scrape")
+        text = await ContentExtractor(spill=spill, cache=None)._page_text(content, "turbine efficiency", 1000)
+        return content, text
+
+    try:
+        content, text = asyncio.run(asyncio.wait_for(scenario(), 5))
+    finally:
+        spill.close()
+
+    assert content.spill_ref is not None and len(content.content) == 100
+    assert content.content_hash == content_hash(body)
+    assert "turbine efficiency" in text
+
+
+def test_batch_path_is_skipped_when_every_host_breaker_is_open():
+    requests = []
+    client = _client(lambda request: requests.append(request.url.path) or httpx.Response(500, json={}))
+    client.batch_threshold = 2
+    urls = ["https://down.example/a", "https://down.example/b"]
+    host = circuit_breaker.get_breaker("firecrawl_scrape:down.example", failure_threshold=1)
+    host.record_failure()
+
+    async def scenario():
+        return [page async for page in client.scrape_stream(urls)]
+
+    assert asyncio.run(asyncio.wait_for(scenario(), 5)) == []
+    assert requests == []
+    batch = circuit_breaker._breakers.get("firecrawl_batch")
+    assert batch is None or batch.total_failures == 0
@@ -0,0 +1,21 @@
+import logging
+import queue
+
+from backend.logging_config import NonBlockingQueueHandler
+
+
+def test_queued_records_capture_arguments_at_call_time():
+    handler = NonBlockingQueueHandler(queue.Queue())
+    logger = logging.getLogger("backend.tests.logging_config")
+    logger.addHandler(handler)
+    logger.propagate = False
+    try:
+        state = {"phase": "searching"}
+        logger.warning("Run state: %s", state)
+        state["phase"] = "done"
+    finally:
+        logger.removeHandler(handler)
+
+    record = handler.queue.get_nowait()
+    assert record.getMessage() == "Run state: {'phase': 'searching'}"
+    assert record.args is None
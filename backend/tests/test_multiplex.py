@@ -0,0 +1,74 @@
+import asyncio
+import json
+
+import pytest
+from fastapi import WebSocketDisconnect
+
+import backend.streaming.runs as runs
+from backend.models.events import DoneEvent, StatusEvent
+from backend.streaming.multiplex import RunMultiplexer
+from backend.streaming.runs import RunManager
+
+
+class FakeSupervisor:
+    async def run(self, query, cancel_event=None, run_id=""):
+        yield StatusEvent.create(phase="planning", progress=0.0)
+        await asyncio.sleep(0.05)
+        yield DoneEvent()
+
+
+class FakeWebSocket:
+    def __init__(self) -> None:
+        self.incoming: asyncio.Queue = asyncio.Queue()
+        self.sent: list[dict] = []
+
+    async def receive_text(self) -> str:
+        text = await self.incoming.get()
+        if text is None:
+            raise WebSocketDisconnect()
+        return text
+
+    async def send_text(self, text: str) -> None:
+        self.sent.append(json.loads(text))
+
+    def replies(self, type: str) -> list[dict]:
+        return [m for m in self.sent if m.get("type") == type]
+
+
+@pytest.fixture(autouse=True)
+def fake_supervisor(monkeypatch):
+    monkeypatch.setattr(runs, "Supervisor", FakeSupervisor)
+
+
+def test_start_ignores_client_run_id():
+    async def scenario():
+        manager = RunManager(orphan_policy="detach")
+        victim = manager.start("victim-run", "original query")
+
+        ws = FakeWebSocket()
+        serving = asyncio.create_task(RunMultiplexer(ws, manager).serve())
+        await ws.incoming.put(json.dumps({"type": "start", "run_id": "victim-run", "query": "hijack"}))
+        await asyncio.sleep(0.01)
+
+        [started] = ws.replies("started")
+        assert started["ref"] == "victim-run"
+        assert started["run_id"] != "victim-run"
+        assert manager.get("victim-run") is victim
+        assert manager.get(started["run_id"]).query == "hijack"
+
+        await ws.incoming.put(None)
+        await serving
+        manager.cancel_all()
+
+    asyncio.run(asyncio.wait_for(scenario(), 5))
+
+
+def test_manager_rejects_duplicate_run_id():
+    async def scenario():
+        manager = RunManager()
+        manager.start("run-1", "q")
+        with pytest.raises(ValueError):
+            manager.start("run-1", "q")
+        manager.cancel_all()
+
+    asyncio.run(asyncio.wait_for(scenario(), 5))
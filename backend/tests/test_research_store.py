@@ -0,0 +1,43 @@
+import random
+
+from backend.memory.research_store import ResearchStore
+from backend.models.research import ExtractedContent
+
+
+def _content(url: str, facts: list[str], credibility: float = 0.5) -> ExtractedContent:
+    return ExtractedContent(url=url, title=url, content="body", facts=facts, credibility_score=credibility)
+
+
+def test_deltas_match_a_full_scan():
+    rng = random.Random(7)
+    store = ResearchStore()
+    urls = [f"https://example.com/{i}" for i in range(12)]
+    facts = [f"Fact number {i} about the topic" for i in range(30)]
+
+    for _ in range(25):
+        store.add_extracted_content([
+            _content(rng.choice(urls), rng.sample(facts, rng.randint(0, 4)), rng.choice([0.3, 0.5, 0.8]))
+            for _ in range(rng.randint(1, 4))
+        ])
+
+    for since in range(store.version + 1):
+        delta = store.changes_since(since)
+        assert [s.sid for s in delta.sources] == [s.sid for s in store.sources if s.version > since]
+        assert [f.fid for f in delta.facts] == [f.fid for f in store._facts if f.version > since]
+        assert [c.url for c in store.get_citations(since)] == [s.url for s in delta.sources]
+    assert store.fact_count == len(store.all_facts)
+
+
+def test_fact_count_tracks_orphaned_facts():
+    store = ResearchStore()
+    store.add_extracted_content([_content("https://a.com", ["Shared fact text", "Only on a"])])
+    store.add_extracted_content([_content("https://b.com", ["Shared fact text"])])
+    assert store.fact_count == 2
+
+    store.add_extracted_content([_content("https://a.com", ["Replacement fact on a"])])
+
+    assert store.fact_count == 2
+    assert sorted(store.all_facts) == ["Replacement fact on a", "Shared fact text"]
+    delta = store.changes_since(2)
+    assert [s.url for s in delta.sources] == ["https://a.com"]
+    assert sorted(f.text for f in delta.facts) == ["Only on a", "Replacement fact on a", "Shared fact text"]
@@ -0,0 +1,33 @@
+import asyncio
+
+import backend.providers.resilient as resilient
+from backend.providers.base import LLMProvider, LLMRateLimitError
+from backend.providers.resilient import ResilientProvider, get_retry_budget
+
+
+class FlakyProvider(LLMProvider):
+    name = "flaky"
+
+    def __init__(self, failures: int) -> None:
+        self.failures = failures
+        self.calls = 0
+
+    async def complete(self, messages, model, temperature=0.3, max_tokens=2048):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise LLMRateLimitError("429", retry_after=0)
+        return "ok"
+
+    async def complete_structured(self, messages, model, response_model, temperature=0.3, max_tokens=2048):
+        raise NotImplementedError
+
+
+def test_first_transient_error_after_startup_is_retried(monkeypatch):
+    monkeypatch.setattr(resilient, "_retry_budget", None)
+    provider = FlakyProvider(failures=1)
+    wrapped = ResilientProvider(provider, get_retry_budget(0.1), base_delay=0.0, max_delay=0.0)
+
+    result = asyncio.run(asyncio.wait_for(wrapped.complete([], "retry-test-model"), 5))
+
+    assert result == "ok"
+    assert provider.calls == 2
@@ -0,0 +1,30 @@
+import asyncio
+
+from backend.models.events import StatusEvent
+from backend.streaming.runs import ResearchRun
+
+
+def test_stalled_subscriber_is_dropped_without_blocking_others():
+    async def scenario():
+        run = ResearchRun("run-1", "q", buffer_events=2, stall_timeout=0.05)
+        _, stalled = run.subscribe()
+        _, healthy = run.subscribe()
+        received = []
+
+        async def read():
+            while (item := await healthy.get()) is not None:
+                received.append(item[0])
+
+        reader = asyncio.create_task(read())
+        # Status events are high priority, so the unread buffer cannot shed them
+        for progress in range(5):
+            await run._publish(StatusEvent.create(phase="searching", progress=progress / 10))
+        healthy.finish()
+        await reader
+
+        assert stalled.stalled and stalled.closed
+        assert stalled not in run.subscribers
+        assert received == [1, 2, 3, 4, 5]
+        assert run.snapshot()["stalled_subscribers"] == 1
+
+    asyncio.run(asyncio.wait_for(scenario(), 5))
@@ -0,0 +1,55 @@
+import asyncio
+
+from backend.tools.scrape_scheduler import ScrapeScheduler
+
+
+def test_cancelled_waiters_are_not_granted_on_release():
+    async def scenario():
+        scheduler = ScrapeScheduler(max_concurrent=1, max_per_host=1, max_per_run=1)
+
+        async def waiter():
+            async with scheduler.slot("run", "example.com"):
+                pass
+
+        holding = scheduler.slot("run", "example.com")
+        await holding.__aenter__()
+        waiting = [asyncio.create_task(waiter()) for _ in range(3)]
+        await asyncio.sleep(0)
+        assert scheduler.stats()["queued"] == 3
+
+        # Cancel the queued waiters and free the slot before they get to clean up
+        for task in waiting:
+            task.cancel()
+        await holding.__aexit__(None, None, None)
+        results = await asyncio.gather(*waiting, return_exceptions=True)
+
+        assert all(isinstance(r, asyncio.CancelledError) for r in results)
+        assert scheduler.stats()["active"] == 0
+        assert scheduler.stats()["queued"] == 0
+        async with scheduler.slot("run", "example.com") as wait:
+            assert wait < 0.1
+
+    asyncio.run(asyncio.wait_for(scenario(), 5))
+
+
+def test_release_hands_slot_to_next_live_waiter():
+    async def scenario():
+        scheduler = ScrapeScheduler(max_concurrent=1, max_per_host=1, max_per_run=5)
+        served: list[int] = []
+
+        async def waiter(i: int):
+            async with scheduler.slot("run"):
+                served.append(i)
+
+        holding = scheduler.slot("run")
+        await holding.__aenter__()
+        waiting = [asyncio.create_task(waiter(i)) for i in range(3)]
+        await asyncio.sleep(0)
+        waiting[0].cancel()
+        await holding.__aexit__(None, None, None)
+        await asyncio.gather(*waiting, return_exceptions=True)
+
+        assert served == [1, 2]
+        assert scheduler.stats()["active"] == 0
+
+    asyncio.run(asyncio.wait_for(scenario(), 5))
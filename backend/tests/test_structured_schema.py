@@ -0,0 +1,32 @@
+from pydantic import BaseModel, Field
+
+from backend.models.research import ReportDraft
+from backend.providers.base import compiled_schema
+
+
+class Setting(BaseModel):
+    default: str = "on"
+    values: list[str] = Field(default_factory=list)
+
+
+class Config(BaseModel):
+    name: str
+    setting: Setting = Field(default_factory=Setting)
+
+
+def test_strict_schema_keeps_properties_named_default():
+    schema = compiled_schema(Config, strict=True)
+
+    setting = schema["$defs"]["Setting"]
+    assert "default" in setting["properties"]
+    assert "default" not in setting["properties"]["default"]
+    assert setting["required"] == ["default", "values"]
+    assert setting["additionalProperties"] is False
+    assert "default" not in schema["properties"]["setting"]
+
+
+def test_report_draft_schema_has_no_citations():
+    schema = compiled_schema(ReportDraft, strict=True)
+
+    assert "citations" not in schema["properties"]
+    assert "citations" not in schema["required"]
@@ -1,122 +1,180 @@
 from __future__ import annotations
 
-import re
+import asyncio
 from urllib.parse import urlparse
 from typing import Optional
 
+from ..config import get_settings
 from ..models.research import ExtractedContent
+from ..models.agents import ExtractedFacts
 from ..providers.base import LLMProvider
+from ..providers.usage import current_run_usage, run_budget_state
+from .domain_authority import get_domain_authority
+from .embeddings import corroboration_clusters, get_embedder
+from .fact_cache import FactCache, content_hash, get_fact_cache
+from .page_spill import PageSpill
+from .text_processing import TextProcessor, get_text_processor
 from ..logging_config import get_logger
+from ..observability.tracing import span
 
 logger = get_logger("tools.content_extractor")
 
-# Domain authority scores for credibility heuristics
-DOMAIN_AUTHORITY = {
-    ".edu": 0.9,
-    ".gov": 0.9,
-    ".org": 0.7,
-    "nature.com": 0.95,
-    "science.org": 0.95,
-    "arxiv.org": 0.85,
-    "ieee.org": 0.85,
-    "acm.org": 0.85,
-    "reuters.com": 0.85,
-    "bbc.com": 0.8,
-    "bbc.co.uk": 0.8,
-    "nytimes.com": 0.8,
-    "washingtonpost.com": 0.8,
-    "wikipedia.org": 0.7,
-}
+EXTRACTION_SYSTEM_PROMPT = (
+    "You are a research analyst. Extract key facts from the provided text that are relevant "
+    "to the research query. Return JSON with a \"facts\" array of strings, each being a concise "
+    "factual statement."
+)
+
+# Upper bound on page text scanned by the heuristic extractor
+HEURISTIC_MAX_CHARS = 50_000
+# Model component of the fact cache key for heuristic results
+HEURISTIC_CACHE_MODEL = "heuristic"
+# Under a run budget, pages go to the LLM in waves of this many with the budget checked
+# before each call, so calls in flight can overshoot a limit by at most one wave
+BUDGETED_EXTRACTION_WAVE = 4
 
 
 class ContentExtractor:
-    def __init__(self, provider: Optional[LLMProvider] = None, model: str = "") -> None:
+    def __init__(
+        self,
+        provider: Optional[LLMProvider] = None,
+        model: str = "",
+        spill: Optional[PageSpill] = None,
+        text_processor: Optional[TextProcessor] = None,
+        cache: Optional[FactCache] = None,
+    ) -> None:
         self.provider = provider
         self.model = model
+        self.spill = spill
+        self.text_processor = text_processor or get_text_processor()
+        self.cache = cache if cache is not None else get_fact_cache()
+
+    async def _page_text(self, content: ExtractedContent, query: str, max_chars: int) -> str:
+        """Page text for processing; spilled pages contribute their best-matching chunks,
+        selected in a worker thread since that reads and scores the whole body."""
+        if content.spill_ref is not None and self.spill is not None:
+            return await asyncio.to_thread(
+                self.spill.select_chunks, content.spill_ref, query, max_chars
+            )
+        return content.content[:max_chars]
+
+    def _content_hash(self, content: ExtractedContent) -> str:
+        return content.content_hash or content_hash(content.content)
 
     async def extract_facts(
         self, content: ExtractedContent, query: str
     ) -> list[str]:
         """Extract key facts from content using LLM or fallback to heuristics."""
-        if self.provider and self.model:
-            return await self._llm_extract_facts(content, query)
-        return self._heuristic_extract_facts(content.content, query)
+        return (await self.extract_facts_many([content], query))[0]
+
+    async def extract_facts_many(
+        self, contents: list[ExtractedContent], query: str
+    ) -> list[list[str]]:
+        """Extract facts for several sources.
+
+        Cached results are reused; only the remaining pages go to the LLM, and pages the
+        LLM could not handle are extracted heuristically in one batch.
+        """
+        results: list[Optional[list[str]]] = [None] * len(contents)
+        hashes = [self._content_hash(c) for c in contents] if self.cache else []
+
+        with span("extract_facts", pages=len(contents)) as s:
+            cache_hits = llm_pages = 0
+            use_llm = bool(self.provider and self.model)
+            if use_llm:
+                pending = await self._from_cache(contents, hashes, query, self.model, results)
+                cache_hits += len(contents) - len(pending)
+                run_usage = current_run_usage()
+                wave = BUDGETED_EXTRACTION_WAVE if run_usage is not None and run_usage.budget.enabled else len(pending)
+                for start in range(0, len(pending), max(wave, 1)):
+                    batch = pending[start:start + wave]
+                    extracted = await asyncio.gather(*[self._llm_extract_facts(contents[i], query) for i in batch])
+                    llm_pages += sum(facts is not None for facts in extracted)
+                    await self._store(batch, extracted, hashes, query, self.model, results)
+
+            remaining = sum(r is None for r in results)
+            pending = await self._from_cache(contents, hashes, query, HEURISTIC_CACHE_MODEL, results)
+            cache_hits += remaining - len(pending)
+            if pending:
+                texts = await asyncio.gather(
+                    *[self._page_text(contents[i], query, HEURISTIC_MAX_CHARS) for i in pending]
+                )
+                extracted = await self.text_processor.heuristic_facts_many(texts, query)
+                await self._store(pending, extracted, hashes, query, HEURISTIC_CACHE_MODEL, results)
+            s.set(cache_hits=cache_hits, llm_pages=llm_pages, heuristic_pages=len(pending))
+
+        return [r or [] for r in results]
+
+    async def _from_cache(
+        self,
+        contents: list[ExtractedContent],
+        hashes: list[str],
+        query: str,
+        model: str,
+        results: list[Optional[list[str]]],
+    ) -> list[int]:
+        """Fill ``results`` from the cache; returns the indices still to extract."""
+        pending = [i for i, r in enumerate(results) if r is None]
+        if not self.cache:
+            return pending
+        cached = await asyncio.gather(*[self.cache.get(FactCache.key(hashes[i], query, model)) for i in pending])
+        for i, facts in zip(pending, cached):
+            if facts is not None:
+                results[i] = facts
+        hits = sum(facts is not None for facts in cached)
+        if hits:
+            logger.info("Fact cache: %d/%d pages already extracted (%s)", hits, len(pending), model)
+        return [i for i, facts in zip(pending, cached) if facts is None]
+
+    async def _store(
+        self,
+        indices: list[int],
+        extracted: list[Optional[list[str]]],
+        hashes: list[str],
+        query: str,
+        model: str,
+        results: list[Optional[list[str]]],
+    ) -> None:
+        for i, facts in zip(indices, extracted):
+            if facts is None:
+                continue
+            results[i] = facts
+            if self.cache:
+                await self.cache.put(FactCache.key(hashes[i], query, model), facts)
 
     async def _llm_extract_facts(
         self, content: ExtractedContent, query: str
-    ) -> list[str]:
-        """Use LLM to extract relevant facts."""
-        text = content.content[:4000]  # Limit context size
-        system = "You are a research analyst. Extract key facts from the provided text that are relevant to the research query. Return a JSON array of strings, each being a concise factual statement."
-        user = f"Research query: {query}\n\nSource ({content.url}):\n{text}\n\nExtract 3-8 key relevant facts as a JSON array of strings."
+    ) -> Optional[list[str]]:
+        """Use LLM to extract relevant facts; None if the call failed or the run is
+        past its soft budget (the page is then extracted heuristically)."""
+        if run_budget_state() != "ok":
+            return None
+        text = await self._page_text(content, query, 4000)  # Limit context size
+        user = f"Research query: {query}\n\nSource ({content.url}):\n{text}\n\nExtract 3-8 key relevant facts."
 
         try:
-            raw = await self.provider.complete(
+            result = await self.provider.complete_structured(
                 messages=[
-                    {"role": "system", "content": system},
+                    {"role": "system", "content": EXTRACTION_SYSTEM_PROMPT},
                     {"role": "user", "content": user},
                 ],
                 model=self.model,
+                response_model=ExtractedFacts,
                 temperature=0.1,
                 max_tokens=1024,
             )
-            # Parse JSON array from response
-            raw = raw.strip()
-            if raw.startswith("```"):
-                lines = raw.split("\n")[1:]
-                if lines and lines[-1].strip() == "```":
-                    lines = lines[:-1]
-                raw = "\n".join(lines)
-
-            import json
-            facts = json.loads(raw)
-            if isinstance(facts, list):
-                return [str(f) for f in facts if isinstance(f, str) and len(f) > 10]
+            return [f for f in result.facts if len(f) > 10]
         except Exception as e:
-            logger.warning(f"LLM fact extraction failed: {e}, falling back to heuristic")
-
-        return self._heuristic_extract_facts(content.content, query)
-
-    def _heuristic_extract_facts(self, text: str, query: str) -> list[str]:
-        """Fallback: extract facts using sentence splitting and keyword matching."""
-        # Clean markdown artifacts
-        clean = re.sub(r'#+\s', '', text)
-        clean = re.sub(r'\[([^\]]+)\]\([^)]+\)', r'\1', clean)
-        clean = re.sub(r'[*_`~]', '', clean)
-        clean = re.sub(r'\n{2,}', '\n', clean)
-
-        # Split into sentences
-        sentences = re.split(r'(?<=[.!?])\s+', clean)
-        query_terms = set(query.lower().split())
-
-        facts = []
-        for s in sentences:
-            s = s.strip()
-            if len(s) < 30 or len(s) > 500:
-                continue
-            # Score by query term overlap
-            words = set(s.lower().split())
-            overlap = len(query_terms & words)
-            if overlap > 0 or len(facts) < 3:
-                facts.append(s)
-            if len(facts) >= 8:
-                break
-
-        return facts
+            logger.warning("LLM fact extraction failed: %s, falling back to heuristic", e)
+            return None
 
     def score_credibility(self, url: str) -> float:
         """Score source credibility based on domain authority."""
         try:
             parsed = urlparse(url)
-            domain = parsed.netloc.lower().lstrip("www.")
-
-            # Check exact domain matches
-            for known_domain, score in DOMAIN_AUTHORITY.items():
-                if known_domain.startswith("."):
-                    if domain.endswith(known_domain):
-                        return score
-                elif known_domain in domain:
-                    return score
+            score = get_domain_authority().score(parsed.hostname or "")
+            if score is not None:
+                return score
 
             # HTTPS gives slight boost
             base = 0.5
@@ -130,33 +188,29 @@ class ContentExtractor:
     async def cross_reference(
         self, facts_by_source: dict[str, list[str]]
     ) -> dict[str, list[str]]:
-        """Identify facts that appear across multiple sources."""
-        corroborated = []
-        single_source = []
-
-        all_facts = []
-        for url, facts in facts_by_source.items():
-            for f in facts:
-                all_facts.append((url, f))
-
-        # Simple overlap detection using keyword matching
-        for i, (url1, fact1) in enumerate(all_facts):
-            words1 = set(fact1.lower().split())
-            found_corroboration = False
-            for j, (url2, fact2) in enumerate(all_facts):
-                if i == j or url1 == url2:
-                    continue
-                words2 = set(fact2.lower().split())
-                overlap = len(words1 & words2)
-                if overlap >= 3 and overlap / min(len(words1), len(words2)) > 0.3:
-                    if fact1 not in corroborated:
-                        corroborated.append(fact1)
-                    found_corroboration = True
-                    break
-            if not found_corroboration and fact1 not in single_source:
-                single_source.append(fact1)
+        """Identify facts that appear across multiple sources.
+
+        Facts are embedded and clustered by cosine similarity; a fact is corroborated
+        when its cluster spans more than one source, so paraphrases count as agreement.
+        """
+        all_facts = [(url, f) for url, facts in facts_by_source.items() for f in facts]
+        if not all_facts:
+            return {"corroborated": [], "single_source": []}
+
+        embedder = get_embedder()
+        threshold = get_settings().corroboration_threshold or embedder.backend.similarity_threshold
+        vectors = await asyncio.to_thread(embedder.embed, [f for _, f in all_facts])
+        clusters = corroboration_clusters(vectors, [url for url, _ in all_facts], threshold)
+
+        # Largest clusters first, one representative each before the paraphrases,
+        # so the head of the list covers as many distinct claims as possible
+        multi = sorted((c for c in clusters if len(c) > 1), key=len, reverse=True)
+        corroborated: dict[str, None] = {}
+        for i in [c[0] for c in multi] + [i for c in multi for i in c[1:]]:
+            corroborated.setdefault(all_facts[i][1])
+        single_source = dict.fromkeys(all_facts[c[0]][1] for c in clusters if len(c) == 1)
 
         return {
-            "corroborated": corroborated,
-            "single_source": single_source,
+            "corroborated": list(corroborated),
+            "single_source": [f for f in single_source if f not in corroborated],
         }
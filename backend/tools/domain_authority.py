@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable, Optional
+
+from ..config import get_settings
+from ..logging_config import get_logger
+
+logger = get_logger("tools.domain_authority")
+
+DATA_DIR = Path(__file__).parent / "data"
+DEFAULT_AUTHORITY_PATH = DATA_DIR / "domain_authority.csv"
+DEFAULT_PUBLIC_SUFFIX_PATH = DATA_DIR / "public_suffixes.txt"
+
+
+class _Node:
+    __slots__ = ("children", "domain_score", "suffix_score", "public")
+
+    def __init__(self) -> None:
+        self.children: dict[str, _Node] = {}
+        self.domain_score: Optional[float] = None  # "nature.com": itself and subdomains
+        self.suffix_score: Optional[float] = None  # ".edu": anything strictly below
+        self.public = False
+
+
+class DomainAuthorityIndex:
+    """Authority scores keyed on reversed host labels (``com`` -> ``nature`` -> ...).
+
+    A lookup walks one trie node per label, so its cost depends on the host, not on
+    the table size. Public suffixes are marked in the same trie: a plain domain entry
+    never covers hosts registered under it when it is itself a public suffix, so
+    ``github.io`` does not lend its score to ``someone.github.io``. The most specific
+    matching entry wins.
+    """
+
+    def __init__(self, cache_size: int = 8192) -> None:
+        self._root = _Node()
+        self.entries = 0
+        self.score_host = lru_cache(maxsize=cache_size)(self._score_host)
+
+    def _node(self, labels: Iterable[str]) -> _Node:
+        node = self._root
+        for label in labels:
+            node = node.children.setdefault(label, _Node())
+        return node
+
+    def add(self, domain: str, score: float) -> None:
+        domain = domain.strip().lower().rstrip(".")
+        if domain.startswith("."):
+            self._node(reversed(domain[1:].split("."))).suffix_score = score
+        else:
+            self._node(reversed(domain.split("."))).domain_score = score
+        self.entries += 1
+        self.score_host.cache_clear()
+
+    def add_public_suffix(self, suffix: str) -> None:
+        self._node(reversed(suffix.strip().lower().split("."))).public = True
+        self.score_host.cache_clear()
+
+    def _score_host(self, host: str) -> Optional[float]:
+        labels = host.split(".")
+        n = len(labels)
+        node = self._root
+        # Every TLD is a public suffix; deeper ones come from the suffix list
+        public_depth = 1
+        matches: list[tuple[int, float, bool]] = []  # (depth, score, is_domain_rule)
+        for depth, label in enumerate(reversed(labels), start=1):
+            node = node.children.get(label)
+            if node is None:
+                break
+            if node.public:
+                public_depth = depth
+            if node.suffix_score is not None and depth < n:
+                matches.append((depth, node.suffix_score, False))
+            if node.domain_score is not None:
+                matches.append((depth, node.domain_score, True))
+
+        for depth, score, is_domain in reversed(matches):
+            if not is_domain or depth > public_depth or depth == n:
+                return score
+        return None
+
+    def score(self, host: str) -> Optional[float]:
+        """Authority score for ``host`` (case and trailing dot insensitive), or None."""
+        host = host.strip().lower().rstrip(".")
+        if not host:
+            return None
+        return self.score_host(host)
+
+
+def _read_lines(path: Path, comment: str) -> Iterable[str]:
+    with path.open(encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith(comment):
+                yield line
+
+
+def load_domain_authority(
+    authority_path: Optional[Path] = None,
+    public_suffix_path: Optional[Path] = None,
+) -> DomainAuthorityIndex:
+    """Build an index from a ``domain,score`` CSV and a public_suffix_list.dat-style file."""
+    index = DomainAuthorityIndex()
+
+    for line in _read_lines(public_suffix_path or DEFAULT_PUBLIC_SUFFIX_PATH, "//"):
+        # Wildcard and exception rules are approximated by their plain suffix
+        index.add_public_suffix(line.split()[0].lstrip("!*."))
+
+    for line in _read_lines(authority_path or DEFAULT_AUTHORITY_PATH, "#"):
+        domain, _, score = line.partition(",")
+        try:
+            index.add(domain, float(score))
+        except ValueError:
+            logger.warning("Skipping malformed domain authority entry: %r", line)
+
+    logger.info("Loaded %d domain authority entries", index.entries)
+    return index
+
+
+_index: Optional[DomainAuthorityIndex] = None
+
+
+def get_domain_authority() -> DomainAuthorityIndex:
+    global _index
+    if _index is None:
+        settings = get_settings()
+        _index = load_domain_authority(
+            Path(settings.domain_authority_path) if settings.domain_authority_path else None,
+            Path(settings.public_suffix_path) if settings.public_suffix_path else None,
+        )
+    return _index
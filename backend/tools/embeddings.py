@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+from abc import ABC, abstractmethod
+import zlib
+from collections import OrderedDict
+from typing import Any, Optional, Sequence
+
+import numpy as np
+
+from ..config import get_settings
+from ..logging_config import get_logger
+from .ranking import tokenize
+
+logger = get_logger("tools.embeddings")
+
+
+class EmbeddingBackend(ABC):
+    """Turns a batch of texts into an (n, dim) float32 matrix of L2-normalised rows."""
+
+    name: str = "base"
+    dim: int = 0
+    # Cosine similarity at which two facts count as the same claim
+    similarity_threshold: float = 0.7
+
+    @abstractmethod
+    def encode(self, texts: Sequence[str]) -> np.ndarray:
+        ...
+
+
+class HashingEmbedder(EmbeddingBackend):
+    """Signed feature hashing of stemmed unigrams and bigrams.
+
+    No model and no vocabulary: stable across processes and restarts, and fast enough
+    to run inline. Catches inflectional and word-order paraphrases, not synonyms.
+    """
+
+    name = "hashing"
+    similarity_threshold = 0.35
+
+    def __init__(self, dim: int = 512) -> None:
+        self.dim = dim
+
+    def _features(self, text: str) -> np.ndarray:
+        tokens = tokenize(text)
+        grams = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        return np.fromiter((zlib.crc32(g.encode()) for g in grams), dtype=np.uint32, count=len(grams))
+
+    def encode(self, texts: Sequence[str]) -> np.ndarray:
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            hashes = self._features(text)
+            if not len(hashes):
+                continue
+            signs = np.where(hashes & 0x10000, 1.0, -1.0).astype(np.float32)
+            np.add.at(out[row], hashes % self.dim, signs)
+        # Sublinear term weighting, then unit length so dot product == cosine
+        np.copyto(out, np.sign(out) * np.log1p(np.abs(out)))
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        return out / np.maximum(norms, 1e-12)
+
+
+class SentenceTransformerEmbedder(EmbeddingBackend):
+    """Small local sentence-transformers model on CPU (optional dependency)."""
+
+    name = "sentence-transformers"
+
+    def __init__(self, model_name: str, batch_size: int = 64) -> None:
+        from sentence_transformers import SentenceTransformer
+
+        self._model = SentenceTransformer(model_name, device="cpu")
+        self.name = f"sentence-transformers:{model_name}"
+        self.dim = self._model.get_sentence_embedding_dimension()
+        self.batch_size = batch_size
+
+    def encode(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = self._model.encode(
+            list(texts),
+            batch_size=self.batch_size,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            show_progress_bar=False,
+        )
+        return vectors.astype(np.float32, copy=False)
+
+
+class Embedder:
+    """Batched embedding with an LRU cache keyed by content hash.
+
+    Thread-safe so model-backed encoding can run in a worker thread.
+    """
+
+    def __init__(self, backend: EmbeddingBackend, cache_size: int = 50_000, batch_size: int = 256) -> None:
+        self.backend = backend
+        self.cache_size = cache_size
+        self.batch_size = batch_size
+        self._cache: OrderedDict[bytes, np.ndarray] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def dim(self) -> int:
+        return self.backend.dim
+
+    @staticmethod
+    def _key(text: str) -> bytes:
+        return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        keys = [self._key(t) for t in texts]
+        out = np.empty((len(texts), self.dim), dtype=np.float32)
+        missing: dict[bytes, list[int]] = {}
+        with self._lock:
+            for i, key in enumerate(keys):
+                vector = self._cache.get(key)
+                if vector is None:
+                    missing.setdefault(key, []).append(i)
+                else:
+                    self._cache.move_to_end(key)
+                    out[i] = vector
+            self.hits += len(texts) - sum(len(rows) for rows in missing.values())
+            self.misses += len(missing)
+
+        if missing:
+            todo = list(missing)
+            for start in range(0, len(todo), self.batch_size):
+                batch = todo[start:start + self.batch_size]
+                vectors = self.backend.encode([texts[missing[k][0]] for k in batch])
+                with self._lock:
+                    for key, vector in zip(batch, vectors):
+                        for i in missing[key]:
+                            out[i] = vector
+                        self._cache[key] = vector
+                    while len(self._cache) > self.cache_size:
+                        self._cache.popitem(last=False)
+        return out
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.backend.name,
+            "dim": self.dim,
+            "cached": len(self._cache),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+class VectorIndex:
+    """Append-only in-memory vector index for one research run (exact cosine search)."""
+
+    def __init__(self, embedder: Embedder, capacity: int = 256) -> None:
+        self.embedder = embedder
+        self._vectors = np.zeros((capacity, embedder.dim), dtype=np.float32)
+        self._payloads: list[Any] = []
+
+    def __len__(self) -> int:
+        return len(self._payloads)
+
+    def add(self, texts: Sequence[str], payloads: Optional[Sequence[Any]] = None) -> None:
+        if not texts:
+            return
+        vectors = self.embedder.embed(texts)
+        n, needed = len(self), len(self) + len(texts)
+        if needed > len(self._vectors):
+            grown = np.zeros((max(needed, 2 * len(self._vectors)), self.embedder.dim), dtype=np.float32)
+            grown[:n] = self._vectors[:n]
+            self._vectors = grown
+        self._vectors[n:needed] = vectors
+        self._payloads.extend(payloads if payloads is not None else texts)
+
+    def search(self, query: str, k: int = 5, min_score: float = 0.0) -> list[tuple[Any, float]]:
+        """Top-``k`` payloads by cosine similarity to ``query``."""
+        if not self._payloads:
+            return []
+        scores = self._vectors[:len(self)] @ self.embedder.embed([query])[0]
+        top = np.argsort(-scores, kind="stable")[:k]
+        return [(self._payloads[i], float(scores[i])) for i in top if scores[i] >= min_score]
+
+
+def corroboration_clusters(
+    vectors: np.ndarray, sources: Sequence[str], threshold: float
+) -> list[list[int]]:
+    """Group rows whose cosine similarity to a row from a *different* source reaches
+    ``threshold`` (single link). Returns clusters as row-index lists; rows with no
+    cross-source match come back as singletons."""
+    n = len(sources)
+    if n == 0:
+        return []
+    source_ids = np.unique(np.asarray(sources), return_inverse=True)[1]
+    similar = (vectors @ vectors.T) >= threshold
+    similar &= source_ids[:, None] != source_ids[None, :]
+
+    parent = list(range(n))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i, j in np.argwhere(np.triu(similar, k=1)):
+        ri, rj = find(int(i)), find(int(j))
+        if ri != rj:
+            parent[max(ri, rj)] = min(ri, rj)
+
+    clusters: dict[int, list[int]] = {}
+    for i in range(n):
+        clusters.setdefault(find(i), []).append(i)
+    return list(clusters.values())
+
+
+def _make_backend() -> EmbeddingBackend:
+    settings = get_settings()
+    if settings.embedding_backend == "sentence-transformers":
+        try:
+            return SentenceTransformerEmbedder(settings.embedding_model)
+        except ImportError:
+            logger.warning("sentence-transformers is not installed, using hashing embeddings")
+        except Exception as e:
+            logger.warning("Could not load embedding model %r: %s", settings.embedding_model, e)
+    return HashingEmbedder(dim=settings.embedding_dim)
+
+
+_embedder: Optional[Embedder] = None
+
+
+def get_embedder() -> Embedder:
+    global _embedder
+    if _embedder is None:
+        _embedder = Embedder(_make_backend(), cache_size=get_settings().embedding_cache_size)
+        logger.info("Embedding backend: %s (%d dims)", _embedder.backend.name, _embedder.dim)
+    return _embedder
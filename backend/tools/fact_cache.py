@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+from ..config import get_settings
+from ..logging_config import get_logger
+from .ranking import tokenize
+
+logger = get_logger("tools.fact_cache")
+
+
+def content_hash(text: str | bytes) -> str:
+    data = text.encode("utf-8") if isinstance(text, str) else text
+    return hashlib.blake2b(data, digest_size=20).hexdigest()
+
+
+def query_class(query: str) -> str:
+    """Order-, case-, stopword- and inflection-insensitive form of a query, so
+    near-identical phrasings share cache entries."""
+    return " ".join(sorted(set(tokenize(query))))
+
+
+@dataclass
+class FactCacheStats:
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    stores: int = 0
+
+    def to_dict(self) -> dict:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "hit_ratio": round((self.memory_hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+        }
+
+
+class FactCache:
+    """Extracted facts keyed by (page content hash, query class, model).
+
+    An in-memory LRU sits in front of an optional SQLite file; both honour the TTL.
+    Disk access runs in a worker thread.
+    """
+
+    # Expired disk rows are purged every this many stores
+    PURGE_EVERY = 256
+
+    def __init__(self, max_entries: int = 2048, ttl_seconds: float = 86400.0, path: str = "") -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl_seconds
+        self._memory: OrderedDict[str, tuple[float, list[str]]] = OrderedDict()
+        self._stats = FactCacheStats()
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS facts (key TEXT PRIMARY KEY, facts TEXT NOT NULL, expires REAL NOT NULL)"
+            )
+            self._db.commit()
+            logger.info("Fact cache disk tier at %s", path)
+
+    @staticmethod
+    def key(page_hash: str, query: str, model: str) -> str:
+        return f"{model}|{query_class(query)}|{page_hash}"
+
+    def _remember(self, key: str, expires: float, facts: list[str]) -> None:
+        self._memory[key] = (expires, facts)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _disk_get(self, key: str) -> Optional[tuple[float, list[str]]]:
+        with self._db_lock:
+            row = self._db.execute("SELECT expires, facts FROM facts WHERE key = ?", (key,)).fetchone()
+        if row is None or row[0] < time.time():
+            return None
+        return row[0], json.loads(row[1])
+
+    def _disk_put(self, key: str, expires: float, facts: list[str], purge: bool) -> None:
+        with self._db_lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO facts (key, facts, expires) VALUES (?, ?, ?)",
+                (key, json.dumps(facts), expires),
+            )
+            if purge:
+                self._db.execute("DELETE FROM facts WHERE expires < ?", (time.time(),))
+            self._db.commit()
+
+    async def get(self, key: str) -> Optional[list[str]]:
+        entry = self._memory.get(key)
+        if entry is not None:
+            if entry[0] >= time.time():
+                self._memory.move_to_end(key)
+                self._stats.memory_hits += 1
+                return list(entry[1])
+            del self._memory[key]
+
+        if self._db is not None:
+            try:
+                entry = await asyncio.to_thread(self._disk_get, key)
+            except sqlite3.Error as e:
+                logger.warning("Fact cache read failed: %s", e)
+                entry = None
+            if entry is not None:
+                self._remember(key, *entry)
+                self._stats.disk_hits += 1
+                return list(entry[1])
+
+        self._stats.misses += 1
+        return None
+
+    async def put(self, key: str, facts: list[str]) -> None:
+        expires = time.time() + self.ttl
+        self._remember(key, expires, list(facts))
+        self._stats.stores += 1
+        if self._db is not None:
+            purge = self._stats.stores % self.PURGE_EVERY == 0
+            try:
+                await asyncio.to_thread(self._disk_put, key, expires, list(facts), purge)
+            except sqlite3.Error as e:
+                logger.warning("Fact cache write failed: %s", e)
+
+    def stats(self) -> dict:
+        return {"entries": len(self._memory), "disk": self._db is not None, **self._stats.to_dict()}
+
+    def close(self) -> None:
+        if self._db is not None:
+            with self._db_lock:
+                self._db.close()
+            self._db = None
+
+
+_cache: Optional[FactCache] = None
+
+
+def get_fact_cache() -> Optional[FactCache]:
+    """Process-wide fact cache, or None when disabled."""
+    global _cache
+    settings = get_settings()
+    if not settings.fact_cache_enabled:
+        return None
+    if _cache is None:
+        _cache = FactCache(
+            max_entries=settings.fact_cache_max_entries,
+            ttl_seconds=settings.fact_cache_ttl_seconds,
+            path=settings.fact_cache_path,
+        )
+    return _cache
+
+
+def close_fact_cache() -> None:
+    global _cache
+    if _cache is not None:
+        _cache.close()
+        _cache = None
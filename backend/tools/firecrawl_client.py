@@ -1,50 +1,323 @@
 from __future__ import annotations
 
 import asyncio
-from typing import Optional
+import json
+import math
+import re
+import time
+from contextlib import aclosing
+from typing import AsyncIterator, Optional
+from urllib.parse import urlparse
 
 import httpx
 
+from ..config import Settings
 from ..models.research import SearchResult, ExtractedContent
-from ..resilience import retry, circuit_breaker
+from ..resilience import retry, circuit_breaker, get_breaker, RatioBudget, get_latency_tracker
+from ..resilience.circuit_breaker import CircuitOpenError, CircuitState
+from .fact_cache import content_hash
+from .page_spill import PageSpill
+from .scrape_scheduler import get_scrape_scheduler
 from ..logging_config import get_logger
+from ..observability.metrics import FIRECRAWL_REQUEST_SECONDS
+from ..observability.tracing import span
 
 logger = get_logger("tools.firecrawl")
 
 FIRECRAWL_BASE_URL = "https://api.firecrawl.dev/v1"
 
 
+_scrape_hedge_budget: Optional[RatioBudget] = None
+
+
+def _get_scrape_hedge_budget(ratio: float) -> RatioBudget:
+    global _scrape_hedge_budget
+    if _scrape_hedge_budget is None:
+        _scrape_hedge_budget = RatioBudget(ratio=ratio)
+    return _scrape_hedge_budget
+
+
+class FirecrawlUnavailableError(httpx.HTTPError):
+    """Firecrawl itself failed or refused us (5xx, 401/402/429, transport error), as
+    opposed to the page being scraped. Keeps the original ``response`` so retries honour Retry-After."""
+
+    def __init__(self, message: str, response: Optional[httpx.Response] = None) -> None:
+        super().__init__(message)
+        self.response = response
+
+
+class TargetPageError(Exception):
+    """Firecrawl answered, but the target site failed to serve the page."""
+
+
+class PageTooLargeError(Exception):
+    """A response hit ``max_response_bytes``; ``prefix`` holds the bytes read up to the cap."""
+
+    def __init__(self, message: str, prefix: bytes = b"") -> None:
+        super().__init__(message)
+        self.prefix = prefix
+
+
+async def _read_capped(resp: httpx.Response, max_bytes: int) -> tuple[bytes, bool]:
+    """Read a streamed response body up to ``max_bytes``; returns (body, truncated).
+
+    Reading stops at the cap, so an oversized response never sits in memory whole.
+    """
+    body = bytearray()
+    async for chunk in resp.aiter_bytes():
+        if max_bytes and len(body) + len(chunk) > max_bytes:
+            body.extend(chunk[:max_bytes - len(body)])
+            return bytes(body), True
+        body.extend(chunk)
+    return bytes(body), False
+
+
+_MARKDOWN_KEY = re.compile(rb'"markdown"\s*:\s*"')
+# A JSON string body up to the first unescaped quote (or the end of the prefix)
+_JSON_STRING_BODY = re.compile(rb'(?:[^"\\]|\\.)*')
+
+
+def _salvage_markdown(prefix: bytes) -> Optional[str]:
+    """Decode the (possibly cut-off) ``markdown`` string from a truncated scrape response."""
+    match = _MARKDOWN_KEY.search(prefix)
+    if match is None:
+        return None
+    raw = _JSON_STRING_BODY.match(prefix, match.end()).group()
+    text = raw.decode("utf-8", errors="ignore")
+    # Drop a \uXXXX escape cut short by the cap
+    text = re.sub(r"\\u[0-9a-fA-F]{0,3}$", "", text)
+    try:
+        return json.loads(f'"{text}"')
+    except ValueError:
+        return None
+
+
+def _target_host(_self: FirecrawlClient, url: str, *args, **kwargs) -> str:
+    return (urlparse(url).hostname or "").lower()
+
+
+# Job ids, cancellations: responses that never carry page content
+_SMALL_RESPONSE_BYTES = 1_000_000
+
+# Per target host: fed only by page failures, never by Firecrawl's own errors (those
+# go to the firecrawl_api breaker) or by oversized pages
+_SCRAPE_BREAKER = {
+    "failure_threshold": 5,
+    "recovery_timeout": 60.0,
+    "failure_on": (TargetPageError, httpx.HTTPStatusError),
+    "ignore": (FirecrawlUnavailableError, PageTooLargeError),
+}
+# One breaker for the Firecrawl API itself, fed by every request: only 5xx answers and
+# transport errors (connect, timeout) count, so bad URLs or 4xx never trip it
+_VENDOR_BREAKER = {"failure_threshold": 5, "recovery_timeout": 30.0}
+
+
+def _is_vendor_failure(e: BaseException) -> bool:
+    if isinstance(e, httpx.HTTPStatusError):
+        return e.response.status_code >= 500
+    return isinstance(e, httpx.TransportError)
+
+
+def _is_vendor_refusal(e: BaseException) -> bool:
+    # Rate limited, bad key or out of credits: about our account, not the page
+    return isinstance(e, httpx.HTTPStatusError) and e.response.status_code in (401, 402, 429)
+
+
+def _host_breaker(url: str):
+    host = _target_host(None, url)
+    if not host:
+        return None
+    return get_breaker(
+        f"firecrawl_scrape:{host}",
+        failure_threshold=_SCRAPE_BREAKER["failure_threshold"],
+        recovery_timeout=_SCRAPE_BREAKER["recovery_timeout"],
+    )
+
+
+def _host_breaker_open(url: str) -> bool:
+    breaker = _host_breaker(url)
+    return breaker is not None and breaker.state == CircuitState.OPEN
+
+
+def _record_host_outcome(url: str, failed: bool) -> None:
+    """Feed a batch job's per-page result into the same per-host breaker per-URL scrapes use."""
+    breaker = _host_breaker(url)
+    if breaker is None:
+        return
+    if failed:
+        breaker.record_failure()
+    else:
+        breaker.record_success()
+
+
 class FirecrawlClient:
-    def __init__(self, api_key: str, max_concurrent: int = 5) -> None:
+    def __init__(
+        self,
+        api_key: str,
+        run_id: str = "",
+        quorum: float = 1.0,
+        soft_deadline: float = 0.0,
+        hedge: bool = False,
+        hedge_percentile: float = 0.9,
+        hedge_initial_delay: float = 10.0,
+        hedge_budget_ratio: float = 0.1,
+        base_url: str = FIRECRAWL_BASE_URL,
+        batch_threshold: int = 0,
+        batch_poll_interval: float = 2.0,
+        batch_timeout: float = 120.0,
+        max_page_chars: int = 0,
+        max_response_bytes: int = 0,
+        spill: Optional[PageSpill] = None,
+        spill_threshold: int = 0,
+        preview_chars: int = 4000,
+    ) -> None:
         self._api_key = api_key
-        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self.run_id = run_id
+        self.base_url = base_url.rstrip("/")
+        self.batch_threshold = batch_threshold
+        self.batch_poll_interval = batch_poll_interval
+        self.batch_timeout = batch_timeout
+        self.max_page_chars = max_page_chars
+        self.max_response_bytes = max_response_bytes
+        self.spill = spill
+        self.spill_threshold = spill_threshold
+        self.preview_chars = preview_chars
+        self._scheduler = get_scrape_scheduler()
+        self._latency = get_latency_tracker("firecrawl_scrape")
+        self.quorum = quorum
+        self.soft_deadline = soft_deadline
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self.hedge_initial_delay = hedge_initial_delay
+        self._hedge_budget = _get_scrape_hedge_budget(hedge_budget_ratio)
         self._headers = {
             "Authorization": f"Bearer {api_key}",
             "Content-Type": "application/json",
         }
 
+    @classmethod
+    def from_settings(
+        cls, settings: Settings, run_id: str = "", spill: Optional[PageSpill] = None
+    ) -> FirecrawlClient:
+        return cls(
+            api_key=settings.firecrawl_api_key,
+            run_id=run_id,
+            quorum=settings.scrape_quorum,
+            soft_deadline=settings.scrape_soft_deadline_seconds,
+            hedge=settings.scrape_hedge_enabled,
+            hedge_percentile=settings.scrape_hedge_percentile,
+            hedge_budget_ratio=settings.scrape_hedge_budget_ratio,
+            base_url=settings.firecrawl_base_url,
+            batch_threshold=settings.firecrawl_batch_threshold,
+            batch_poll_interval=settings.firecrawl_batch_poll_interval,
+            batch_timeout=settings.firecrawl_batch_timeout_seconds,
+            max_page_chars=settings.max_page_chars,
+            max_response_bytes=settings.max_response_bytes,
+            spill=spill,
+            spill_threshold=settings.page_spill_threshold_chars,
+            preview_chars=settings.page_preview_chars,
+        )
+
     def _client(self) -> httpx.AsyncClient:
         return httpx.AsyncClient(
             headers=self._headers,
             timeout=httpx.Timeout(30.0, connect=10.0),
         )
 
+    async def _request_json(
+        self,
+        client: httpx.AsyncClient,
+        method: str,
+        url: str,
+        endpoint: str,
+        max_bytes: int,
+        **kwargs,
+    ) -> dict:
+        vendor = get_breaker("firecrawl_api", **_VENDOR_BREAKER)
+        probe = vendor.try_acquire()
+        start = time.monotonic()
+        outcome = "error"
+        try:
+            async with client.stream(method, url, **kwargs) as resp:
+                resp.raise_for_status()
+                body, truncated = await _read_capped(resp, max_bytes)
+            outcome = "truncated" if truncated else "ok"
+        except asyncio.CancelledError:
+            vendor.release(probe)
+            raise
+        except Exception as e:
+            if _is_vendor_failure(e):
+                vendor.record_failure(probe)
+            else:
+                vendor.record_success(probe)
+            if _is_vendor_failure(e) or _is_vendor_refusal(e):
+                raise FirecrawlUnavailableError(str(e), getattr(e, "response", None)) from e
+            raise
+        else:
+            vendor.record_success(probe)
+        finally:
+            FIRECRAWL_REQUEST_SECONDS.observe(time.monotonic() - start, endpoint, outcome)
+        if truncated:
+            raise PageTooLargeError(f"{endpoint} response exceeds cap of {max_bytes} bytes", body)
+        return json.loads(body) if body else {}
+
+    async def _post_json(self, client: httpx.AsyncClient, path: str, payload: dict, max_bytes: int) -> dict:
+        return await self._request_json(
+            client, "POST", f"{self.base_url}{path}", path.strip("/"), max_bytes, json=payload
+        )
+
+    def _bound_markdown(self, markdown: str) -> str:
+        if self.max_page_chars and len(markdown) > self.max_page_chars:
+            return markdown[:self.max_page_chars]
+        return markdown
+
+    def _spill_page(self, markdown: str) -> tuple[str, tuple[int, int]]:
+        data = markdown.encode("utf-8")
+        return content_hash(data), self.spill.write(data)
+
+    async def _make_content(self, url: str, title: str, markdown: str, method: str) -> ExtractedContent:
+        """Build an ExtractedContent with the page capped and, if large, spilled to disk."""
+        markdown = self._bound_markdown(markdown)
+        spill_ref = None
+        if self.spill is not None and self.spill_threshold and len(markdown) > self.spill_threshold:
+            # Encoding, hashing and writing a multi-MB page would stall the loop
+            digest, spill_ref = await asyncio.to_thread(self._spill_page, markdown)
+            markdown = markdown[:self.preview_chars]
+        else:
+            digest = content_hash(markdown)
+        return ExtractedContent(
+            url=url,
+            title=title,
+            content=markdown,
+            extraction_method=method,
+            spill_ref=spill_ref,
+            content_hash=digest,
+        )
+
     @retry(max_attempts=3, base_delay=1.0, retry_on=(httpx.HTTPError, httpx.TimeoutException))
-    @circuit_breaker(name="firecrawl_search", failure_threshold=5, recovery_timeout=60.0)
+    @circuit_breaker(name="firecrawl_search", failure_threshold=5, recovery_timeout=60.0, ignore=(PageTooLargeError,))
     async def search(self, query: str, num_results: int = 5) -> list[SearchResult]:
         """Search the web via Firecrawl and return results."""
-        logger.info(f"Searching for: {query!r} (limit={num_results})")
-        async with self._client() as client:
-            resp = await client.post(
-                f"{FIRECRAWL_BASE_URL}/search",
-                json={
+        async with span("firecrawl.search", query=query[:200], limit=num_results) as s, \
+                self._scheduler.slot(self.run_id) as wait:
+            s.set(queued_ms=round(wait * 1000, 1))
+            logger.info("Searching for: %r (limit=%d, queued %.2fs)", query, num_results, wait)
+            async with self._client() as client:
+                payload = {
                     "query": query,
                     "limit": num_results,
                     "scrapeOptions": {"formats": ["markdown"]},
-                },
-            )
-            resp.raise_for_status()
-            data = resp.json()
+                }
+                try:
+                    data = await self._post_json(
+                        client, "/search", payload, self.max_response_bytes * max(num_results, 1)
+                    )
+                except PageTooLargeError:
+                    # Some result page is huge: take the result list alone and let the
+                    # per-URL scrapes fetch (and truncate) the pages
+                    logger.warning("Search response over the size cap, retrying without page content")
+                    del payload["scrapeOptions"]
+                    data = await self._post_json(client, "/search", payload, _SMALL_RESPONSE_BYTES)
 
         results = []
         for item in data.get("data", []):
@@ -52,71 +325,300 @@ class FirecrawlClient:
                 url=item.get("url", ""),
                 title=item.get("metadata", {}).get("title", item.get("url", "")),
                 snippet=item.get("metadata", {}).get("description", ""),
-                raw_content=item.get("markdown", ""),
+                raw_content=self._bound_markdown(item.get("markdown", "")),
             ))
-        logger.info(f"Search returned {len(results)} results")
+        logger.info("Search returned %d results", len(results))
         return results[:num_results]
 
     @retry(max_attempts=2, base_delay=1.0, retry_on=(httpx.HTTPError, httpx.TimeoutException))
-    @circuit_breaker(name="firecrawl_scrape", failure_threshold=5, recovery_timeout=60.0)
+    @circuit_breaker(name="firecrawl_scrape", scope=_target_host, **_SCRAPE_BREAKER)
     async def scrape(self, url: str) -> ExtractedContent:
         """Scrape a single URL and extract content as markdown."""
-        async with self._semaphore:
-            logger.info(f"Scraping: {url}")
+        async with span("firecrawl.scrape", url=url) as s, \
+                self._scheduler.slot(self.run_id, _target_host(self, url)) as wait:
+            s.set(queued_ms=round(wait * 1000, 1))
+            logger.info("Scraping: %s (queued %.2fs)", url, wait)
             async with self._client() as client:
-                resp = await client.post(
-                    f"{FIRECRAWL_BASE_URL}/scrape",
-                    json={
-                        "url": url,
-                        "formats": ["markdown"],
-                    },
-                )
-                resp.raise_for_status()
-                data = resp.json()
+                try:
+                    data = await self._post_json(
+                        client,
+                        "/scrape",
+                        {
+                            "url": url,
+                            "formats": ["markdown"],
+                        },
+                        self.max_response_bytes,
+                    )
+                except PageTooLargeError as e:
+                    markdown = _salvage_markdown(e.prefix)
+                    if not markdown:
+                        raise
+                    # Keep the page's leading text rather than losing the whole source
+                    logger.warning("Scrape of %s over %d bytes, keeping the first %d chars",
+                                   url, self.max_response_bytes, len(markdown))
+                    return await self._make_content(url, url, markdown, "firecrawl_scrape_truncated")
 
             page_data = data.get("data", {})
-            return ExtractedContent(
-                url=url,
-                title=page_data.get("metadata", {}).get("title", url),
-                content=page_data.get("markdown", ""),
-                extraction_method="firecrawl_scrape",
+            status_code = page_data.get("metadata", {}).get("statusCode") or 200
+            if status_code >= 500:
+                # Same rule as batch results: the site, not Firecrawl, failed this page
+                raise TargetPageError(f"{url} answered HTTP {status_code}")
+            return await self._make_content(
+                url,
+                page_data.get("metadata", {}).get("title", url),
+                page_data.get("markdown", ""),
+                "firecrawl_scrape",
             )
 
+    async def _safe_scrape(self, url: str) -> Optional[ExtractedContent]:
+        start = time.monotonic()
+        try:
+            result = await self.scrape(url)
+        except Exception as e:
+            logger.warning("Failed to scrape %s: %s", url, e)
+            return None
+        self._latency.record(time.monotonic() - start)
+        return result
+
     async def scrape_many(self, urls: list[str]) -> list[ExtractedContent]:
-        """Scrape multiple URLs in parallel with concurrency control."""
-        logger.info(f"Scraping {len(urls)} URLs in parallel")
+        """Scrape multiple URLs, returning successful pages in input order.
+
+        See ``scrape_stream`` for how the set is fetched.
+        """
+        urls = list(dict.fromkeys(urls))
+        logger.info("Scraping %d URLs", len(urls))
+        results = {c.url: c async for c in self.scrape_stream(urls)}
+        return [results[u] for u in urls if u in results]
+
+    async def scrape_stream(self, urls: list[str]) -> AsyncIterator[ExtractedContent]:
+        """Yield scraped pages as they complete.
+
+        URL sets of at least ``batch_threshold`` go through a single Firecrawl batch
+        scrape job; smaller sets (or a failed submission) use per-URL requests governed
+        by the shared scheduler. Either way, with a quorum below 1.0 or a soft deadline
+        the stream ends once the quorum of pages has arrived or the deadline passes;
+        per-URL requests also hedge stragglers. Closing the iterator early cancels any
+        outstanding work, including the remote batch job.
+        """
+        urls = list(dict.fromkeys(urls))
+        if self._use_batch(urls):
+            batch_urls = [u for u in urls if not _host_breaker_open(u)]
+            if not batch_urls:
+                # Every target host's breaker is open; per-URL scrapes fail fast on them
+                logger.warning("No URLs left to batch, every target host's breaker is open")
+            else:
+                try:
+                    job_id = await self._submit_batch(batch_urls)
+                except Exception as e:
+                    logger.warning("Batch scrape submission failed, using per-URL scrapes: %s", e)
+                else:
+                    async with aclosing(self._poll_batch(job_id, batch_urls)) as pages:
+                        async for content in pages:
+                            yield content
+                    return
+
+        async with aclosing(self._scrape_quorum(urls)) as pages:
+            async for content in pages:
+                yield content
+
+    def _needed(self, urls: list[str]) -> int:
+        return max(1, math.ceil(self.quorum * len(urls)))
+
+    async def _scrape_quorum(self, urls: list[str]) -> AsyncIterator[ExtractedContent]:
+        needed = self._needed(urls)
+        start = time.monotonic()
+        deadline = start + self.soft_deadline if self.soft_deadline else None
+        hedge_at = (
+            start + self._latency.hedge_delay(self.hedge_percentile, self.hedge_initial_delay, 1.0)
+            if self.hedge else None
+        )
+
+        tasks: dict[asyncio.Task, str] = {
+            asyncio.create_task(self._safe_scrape(u)): u for u in urls
+        }
+        if self.hedge:
+            for _ in urls:
+                self._hedge_budget.deposit()
+        done_urls: set[str] = set()
+        hedged: set[str] = set()
+        try:
+            while tasks and len(done_urls) < needed:
+                now = time.monotonic()
+                wake_points = [t for t in (deadline, hedge_at) if t is not None]
+                timeout = max(min(wake_points) - now, 0.0) if wake_points else None
+                done, _ = await asyncio.wait(
+                    tasks, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    url = tasks.pop(task, None)
+                    if url is None:
+                        # The other copy of a hedged request won and already removed it
+                        continue
+                    content = task.result()
+                    if content is not None and url not in done_urls:
+                        done_urls.add(url)
+                        # The other copy of a hedged request is no longer needed
+                        for other, other_url in list(tasks.items()):
+                            if other_url == url:
+                                other.cancel()
+                                del tasks[other]
+                        yield content
+
+                now = time.monotonic()
+                if deadline is not None and now >= deadline:
+                    logger.info(
+                        "Scrape soft deadline hit: %d/%d pages after %.1fs",
+                        len(done_urls), len(urls), now - start,
+                    )
+                    break
+                if hedge_at is not None and now >= hedge_at:
+                    hedge_at = None
+                    for url in {u for u in tasks.values() if u not in done_urls} - hedged:
+                        if not self._hedge_budget.try_withdraw():
+                            break
+                        hedged.add(url)
+                        logger.info("Hedging slow scrape: %s", url)
+                        tasks[asyncio.create_task(self._safe_scrape(url))] = url
+        finally:
+            for task in tasks:
+                task.cancel()
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _use_batch(self, urls: list[str]) -> bool:
+        return bool(self.batch_threshold) and len(urls) >= self.batch_threshold
+
+    @retry(max_attempts=2, base_delay=1.0, retry_on=(httpx.HTTPError, httpx.TimeoutException))
+    @circuit_breaker(name="firecrawl_batch", failure_threshold=3, recovery_timeout=60.0)
+    async def _submit_batch(self, urls: list[str]) -> str:
+        async with self._scheduler.slot(self.run_id) as wait:
+            logger.info("Submitting batch scrape of %d URLs (queued %.2fs)", len(urls), wait)
+            async with self._client() as client:
+                data = await self._post_json(
+                    client, "/batch/scrape", {"urls": urls, "formats": ["markdown"]}, _SMALL_RESPONSE_BYTES
+                )
+        job_id = data.get("id")
+        if not job_id:
+            raise httpx.HTTPError(f"Batch scrape response missing job id: {data}")
+        return job_id
+
+    async def _fetch_batch_status(
+        self, client: httpx.AsyncClient, job_id: str, skip: int, max_bytes: int
+    ) -> tuple[str, list[dict]]:
+        """Fetch a batch job's status and the results after the first ``skip``.
+
+        Firecrawl pages status results with ``?skip=N`` (its ``next`` links use the same
+        parameter), so each poll only downloads pages that finished since the last one.
+        """
+        url: Optional[str] = f"{self.base_url}/batch/scrape/{job_id}"
+        params: Optional[dict] = {"skip": skip} if skip else None
+        status = ""
+        items: list[dict] = []
+        while url:
+            async with self._scheduler.slot(self.run_id):
+                data = await self._request_json(
+                    client, "GET", url, "batch/scrape/status", max_bytes, params=params
+                )
+            status = status or data.get("status", "")
+            items.extend(data.get("data") or [])
+            url = data.get("next")
+            params = None
+        return status, items
 
-        async def _safe_scrape(url: str) -> Optional[ExtractedContent]:
+    async def _cancel_batch(self, client: httpx.AsyncClient, job_id: str) -> None:
+        try:
+            await self._request_json(
+                client, "DELETE", f"{self.base_url}/batch/scrape/{job_id}", "batch/scrape/cancel",
+                _SMALL_RESPONSE_BYTES,
+            )
+            logger.info("Cancelled batch scrape %s", job_id)
+        except (httpx.HTTPError, httpx.TimeoutException, CircuitOpenError, ValueError) as e:
+            logger.warning("Could not cancel batch scrape %s: %s", job_id, e)
+
+    async def _poll_batch(self, job_id: str, urls: list[str]) -> AsyncIterator[ExtractedContent]:
+        wanted = set(urls)
+        seen: set[str] = set()
+        succeeded = 0
+        needed = self._needed(urls)
+        start = time.monotonic()
+        deadline = start + self.batch_timeout
+        if self.soft_deadline:
+            deadline = min(deadline, start + self.soft_deadline)
+        max_bytes = self.max_response_bytes * len(urls)
+        consumed = 0
+        status = ""
+        async with self._client() as client:
             try:
-                return await self.scrape(url)
-            except Exception as e:
-                logger.warning(f"Failed to scrape {url}: {e}")
-                return None
+                while True:
+                    try:
+                        status, items = await self._fetch_batch_status(client, job_id, consumed, max_bytes)
+                    except (
+                        httpx.HTTPError, httpx.TimeoutException, PageTooLargeError, CircuitOpenError, ValueError
+                    ) as e:
+                        logger.warning("Batch scrape %s poll failed: %s", job_id, e)
+                        status, items = "", []
+                    consumed += len(items)
 
-        results = await asyncio.gather(*[_safe_scrape(u) for u in urls])
-        return [r for r in results if r is not None]
+                    for item in items:
+                        metadata = item.get("metadata") or {}
+                        url = metadata.get("sourceURL") or metadata.get("url") or ""
+                        if url not in wanted or url in seen:
+                            continue
+                        seen.add(url)
+                        status_code = metadata.get("statusCode") or 200
+                        markdown = item.get("markdown") or ""
+                        _record_host_outcome(url, failed=status_code >= 500)
+                        if not markdown or status_code >= 400:
+                            logger.warning("Batch scrape %s: no content for %s", job_id, url)
+                            continue
+                        succeeded += 1
+                        yield await self._make_content(
+                            url, metadata.get("title") or url, markdown, "firecrawl_batch"
+                        )
 
-    async def search_and_scrape(self, query: str, num_results: int = 5) -> list[ExtractedContent]:
-        """Combined search + scrape: search for query, then scrape each result."""
+                    if status in ("completed", "failed", "cancelled") or seen >= wanted:
+                        break
+                    if succeeded >= needed:
+                        logger.info("Batch scrape %s reached quorum: %d/%d pages", job_id, succeeded, len(wanted))
+                        break
+                    if time.monotonic() >= deadline:
+                        logger.warning(
+                            "Batch scrape %s timed out with %d/%d pages", job_id, len(seen), len(wanted)
+                        )
+                        break
+                    await asyncio.sleep(self.batch_poll_interval)
+            finally:
+                if status not in ("completed", "failed", "cancelled") and not seen >= wanted:
+                    # Stopped early (quorum, deadline or the caller went away): don't
+                    # leave Firecrawl working, and billing, for pages nobody reads
+                    await asyncio.shield(self._cancel_batch(client, job_id))
+        logger.info(
+            "Batch scrape %s finished (%s): %d/%d pages", job_id, status or "unknown", len(seen), len(wanted)
+        )
+
+    async def search_for_contents(
+        self, query: str, num_results: int = 5
+    ) -> tuple[list[ExtractedContent], list[str]]:
+        """Search, keeping results that came back with markdown; returns those pages
+        and the URLs that still need scraping."""
         search_results = await self.search(query, num_results)
 
-        # If search returned markdown content, use it directly
         contents = []
         urls_to_scrape = []
         for sr in search_results:
             if sr.raw_content and len(sr.raw_content) > 100:
-                contents.append(ExtractedContent(
-                    url=sr.url,
-                    title=sr.title,
-                    content=sr.raw_content,
-                    extraction_method="firecrawl_search",
+                contents.append(await self._make_content(
+                    sr.url, sr.title, sr.raw_content, "firecrawl_search"
                 ))
+                # Converted: don't keep a second copy of the page alive
+                sr.raw_content = None
             else:
                 urls_to_scrape.append(sr.url)
+        return contents, urls_to_scrape
 
-        # Scrape any results that didn't include content
+    async def search_and_scrape(self, query: str, num_results: int = 5) -> list[ExtractedContent]:
+        """Combined search + scrape: search for query, then scrape each result."""
+        contents, urls_to_scrape = await self.search_for_contents(query, num_results)
         if urls_to_scrape:
-            scraped = await self.scrape_many(urls_to_scrape)
-            contents.extend(scraped)
-
+            contents.extend(await self.scrape_many(urls_to_scrape))
         return contents
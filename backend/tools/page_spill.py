@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import mmap
+import re
+import tempfile
+import threading
+from typing import Optional
+
+from ..logging_config import get_logger
+
+logger = get_logger("tools.page_spill")
+
+_WORD = re.compile(r"\w+")
+
+
+class PageSpill:
+    """Per-run temp file for large page bodies, read back through a memory map.
+
+    Pages above the spill threshold keep only a short preview in ``ExtractedContent``;
+    the full body lives here and callers pull back the chunks they need, so a run's
+    resident memory no longer scales with page size. The file is anonymous and is
+    removed by the OS when closed. Writes and reads may come from worker threads, so
+    the file position and the mapping are guarded by a lock.
+    """
+
+    def __init__(self, run_id: str = "") -> None:
+        self._file = tempfile.TemporaryFile(prefix=f"research-{run_id}-", suffix=".spill")
+        self._size = 0
+        self._map: Optional[mmap.mmap] = None
+        self._lock = threading.Lock()
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def write(self, text: str | bytes) -> tuple[int, int]:
+        """Append ``text`` (or its UTF-8 bytes) and return its (offset, length) in bytes."""
+        data = text.encode("utf-8") if isinstance(text, str) else text
+        with self._lock:
+            self._file.seek(self._size)
+            self._file.write(data)
+            self._file.flush()
+            ref = (self._size, len(data))
+            self._size += len(data)
+            if self._map is not None:
+                self._map.close()
+                self._map = None
+        return ref
+
+    def _mapped(self) -> mmap.mmap:
+        if self._map is None:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._map
+
+    def read(self, ref: tuple[int, int], start: int = 0, end: Optional[int] = None) -> str:
+        """Read bytes [start, end) of a spilled page as text."""
+        offset, length = ref
+        end = length if end is None else min(end, length)
+        if start >= end:
+            return ""
+        with self._lock:
+            raw = self._mapped()[offset + start:offset + end]
+        return raw.decode("utf-8", errors="ignore")
+
+    def select_chunks(
+        self,
+        ref: tuple[int, int],
+        query: str,
+        max_chars: int = 4000,
+        chunk_chars: int = 1000,
+    ) -> str:
+        """Return the chunks of a spilled page that best match ``query``.
+
+        Chunks are scored by query-term hits straight from the mapping and the best
+        ones are returned in document order, up to ``max_chars``.
+        """
+        _, length = ref
+        terms = {t for t in _WORD.findall(query.lower()) if len(t) > 2}
+        scored: list[tuple[int, int]] = []
+        for start in range(0, length, chunk_chars):
+            chunk = self.read(ref, start, start + chunk_chars).lower()
+            hits = sum(chunk.count(t) for t in terms) if terms else 0
+            scored.append((hits, start))
+
+        budget = max(max_chars // chunk_chars, 1)
+        # First chunk usually holds the title/lede, so keep it on ties
+        best = sorted(scored, key=lambda item: (-item[0], item[1]))[:budget]
+        return "\n".join(
+            self.read(ref, start, start + chunk_chars) for _, start in sorted(best, key=lambda b: b[1])
+        )
+
+    def close(self) -> None:
+        with self._lock:
+            if self._map is not None:
+                self._map.close()
+                self._map = None
+            self._file.close()
+        logger.debug("Closed page spill (%d bytes)", self._size)
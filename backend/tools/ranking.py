@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been before
+being below between both but by can could did do does doing down during each few for from
+further had has have having he her here hers herself him himself his how i if in into is it
+its itself just me more most my myself no nor not now of off on once only or other our ours
+ourselves out over own same she should so some such than that the their theirs them
+themselves then there these they this those through to too under until up very was we were
+what when where which while who whom why will with would you your yours yourself yourselves
+""".split())
+
+# Longest first so "ations" wins over "s"
+_SUFFIXES = (
+    "ational", "ization", "fulness", "iveness", "ations", "ation", "ments", "ment",
+    "ness", "ings", "ing", "ies", "ied", "edly", "ed", "ly", "es", "s",
+)
+
+
+@lru_cache(maxsize=65536)
+def stem(token: str) -> str:
+    """Light suffix-stripping stemmer; only needs to map inflections to the same key."""
+    if len(token) <= 3:
+        return token
+    for suffix in _SUFFIXES:
+        if token.endswith(suffix) and len(token) - len(suffix) >= 3:
+            base = token[: -len(suffix)]
+            return base + "y" if suffix in ("ies", "ied") else base
+    return token
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase, split on non-alphanumerics, drop stopwords and single characters, stem."""
+    return [stem(t) for t in _TOKEN.findall(text.lower()) if len(t) > 1 and t not in STOPWORDS]
+
+
+@dataclass
+class SentenceFeatures:
+    """Candidate sentences of one source with their query-term frequencies.
+
+    ``tf`` has one row per sentence and one column per query term; only query terms are
+    counted, which is all BM25 needs besides the sentence lengths.
+    """
+
+    sentences: list[str]
+    tf: np.ndarray
+    lengths: np.ndarray
+
+
+class QueryModel:
+    """Tokenized query shared by every source of a run (and picklable for pool workers)."""
+
+    def __init__(self, query: str) -> None:
+        self.query = query
+        self.terms: tuple[str, ...] = tuple(dict.fromkeys(tokenize(query)))
+        self._index = {term: i for i, term in enumerate(self.terms)}
+
+    def featurize(self, sentences: list[str]) -> SentenceFeatures:
+        tf = np.zeros((len(sentences), len(self.terms)), dtype=np.float32)
+        lengths = np.zeros(len(sentences), dtype=np.float32)
+        index = self._index
+        for row, sentence in enumerate(sentences):
+            tokens = tokenize(sentence)
+            lengths[row] = len(tokens)
+            for token in tokens:
+                col = index.get(token)
+                if col is not None:
+                    tf[row, col] += 1
+        return SentenceFeatures(sentences, tf, lengths)
+
+
+@lru_cache(maxsize=256)
+def query_model(query: str) -> QueryModel:
+    return QueryModel(query)
+
+
+def bm25_scores(tf: np.ndarray, lengths: np.ndarray, k1: float = 1.5, b: float = 0.75) -> np.ndarray:
+    """BM25 score of every row of ``tf``, treating each row (sentence) as a document."""
+    n_docs = tf.shape[0]
+    if n_docs == 0 or tf.shape[1] == 0:
+        return np.zeros(n_docs, dtype=np.float32)
+    df = np.count_nonzero(tf, axis=0)
+    idf = np.log1p((n_docs - df + 0.5) / (df + 0.5))
+    avgdl = max(float(lengths.mean()), 1.0)
+    norm = k1 * (1.0 - b + b * lengths / avgdl)
+    return ((tf * (k1 + 1.0)) / (tf + norm[:, None]) * idf).sum(axis=1)
+
+
+def rank_sentences(
+    features: list[SentenceFeatures],
+    k: int = 8,
+    min_facts: int = 3,
+) -> list[list[str]]:
+    """Top-``k`` sentences per source by BM25 over the sentences of all sources at once.
+
+    IDF is computed across every source, so terms that appear everywhere count for
+    little. Sources with fewer than ``min_facts`` matching sentences are topped up with
+    their leading sentences. Picks are returned in document order.
+    """
+    if not features:
+        return []
+    tf = np.concatenate([f.tf for f in features])
+    lengths = np.concatenate([f.lengths for f in features])
+    scores = bm25_scores(tf, lengths)
+
+    results = []
+    offset = 0
+    for f in features:
+        n = len(f.sentences)
+        source_scores = scores[offset:offset + n]
+        offset += n
+        if n == 0:
+            results.append([])
+            continue
+
+        top = np.argsort(-source_scores, kind="stable")[:k]
+        picked = [int(i) for i in top if source_scores[i] > 0]
+        if len(picked) < min_facts:
+            chosen = set(picked)
+            picked += [i for i in range(n) if i not in chosen][: min(min_facts, k) - len(picked)]
+        results.append([f.sentences[i] for i in sorted(picked)])
+    return results
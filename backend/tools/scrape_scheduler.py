@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Optional
+
+from ..config import get_settings
+from ..logging_config import get_logger
+
+logger = get_logger("tools.scrape_scheduler")
+
+
+@dataclass(eq=False)
+class _Waiter:
+    run_id: str
+    host: Optional[str]
+    enqueued_at: float
+    future: asyncio.Future
+
+
+@dataclass
+class RunQueueStats:
+    requests: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "requests": self.requests,
+            "total_wait_seconds": round(self.total_wait, 3),
+            "max_wait_seconds": round(self.max_wait, 3),
+        }
+
+
+@dataclass
+class _SchedulerState:
+    active: int = 0
+    host_active: dict[str, int] = field(default_factory=dict)
+    run_active: dict[str, int] = field(default_factory=dict)
+
+
+class ScrapeScheduler:
+    """Process-wide admission control for Firecrawl requests.
+
+    Enforces a global concurrency cap, a per-target-host cap and a per-run cap, and
+    serves waiting runs round-robin so one large run cannot starve the others.
+    """
+
+    def __init__(self, max_concurrent: int = 20, max_per_host: int = 2, max_per_run: int = 5) -> None:
+        self.max_concurrent = max_concurrent
+        self.max_per_host = max_per_host
+        self.max_per_run = max_per_run
+        self._state = _SchedulerState()
+        # run_id -> FIFO of waiters; iteration order is the round-robin order
+        self._queues: OrderedDict[str, deque[_Waiter]] = OrderedDict()
+        self._run_stats: dict[str, RunQueueStats] = {}
+
+    @property
+    def queued(self) -> int:
+        return sum(len(q) for q in self._queues.values())
+
+    def _has_capacity(self, run_id: str, host: Optional[str]) -> bool:
+        state = self._state
+        if state.active >= self.max_concurrent:
+            return False
+        if state.run_active.get(run_id, 0) >= self.max_per_run:
+            return False
+        if host is not None and state.host_active.get(host, 0) >= self.max_per_host:
+            return False
+        return True
+
+    def _grant(self, run_id: str, host: Optional[str]) -> None:
+        state = self._state
+        state.active += 1
+        state.run_active[run_id] = state.run_active.get(run_id, 0) + 1
+        if host is not None:
+            state.host_active[host] = state.host_active.get(host, 0) + 1
+
+    def _release(self, run_id: str, host: Optional[str]) -> None:
+        state = self._state
+        state.active -= 1
+        state.run_active[run_id] -= 1
+        if not state.run_active[run_id]:
+            del state.run_active[run_id]
+        if host is not None:
+            state.host_active[host] -= 1
+            if not state.host_active[host]:
+                del state.host_active[host]
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Grant slots to queued waiters, one per run per pass, rotating across runs."""
+        progress = True
+        while progress and self._state.active < self.max_concurrent and self._queues:
+            progress = False
+            for run_id in list(self._queues):
+                queue = self._queues[run_id]
+                # A cancelled waiter stays queued until its task runs slot()'s
+                # cleanup; never hand it a slot nobody will release
+                if any(w.future.done() for w in queue):
+                    queue = self._queues[run_id] = deque(w for w in queue if not w.future.done())
+                for waiter in queue:
+                    if self._has_capacity(run_id, waiter.host):
+                        queue.remove(waiter)
+                        self._grant(run_id, waiter.host)
+                        waiter.future.set_result(None)
+                        # Served: move this run to the back of the rotation
+                        self._queues.move_to_end(run_id)
+                        progress = True
+                        break
+                if not queue:
+                    del self._queues[run_id]
+                if self._state.active >= self.max_concurrent:
+                    break
+
+    def _record_wait(self, run_id: str, wait: float) -> None:
+        stats = self._run_stats.setdefault(run_id, RunQueueStats())
+        stats.requests += 1
+        stats.total_wait += wait
+        stats.max_wait = max(stats.max_wait, wait)
+
+    @asynccontextmanager
+    async def slot(self, run_id: str, host: Optional[str] = None) -> AsyncIterator[float]:
+        """Hold a request slot for ``run_id`` against ``host``; yields the queue wait in seconds."""
+        start = time.monotonic()
+        if not self._queues and self._has_capacity(run_id, host):
+            self._grant(run_id, host)
+        else:
+            waiter = _Waiter(run_id, host, start, asyncio.get_running_loop().create_future())
+            self._queues.setdefault(run_id, deque()).append(waiter)
+            self._dispatch()
+            try:
+                await waiter.future
+            except asyncio.CancelledError:
+                if waiter.future.done() and not waiter.future.cancelled():
+                    # Granted just before cancellation: hand the slot back
+                    self._release(run_id, host)
+                else:
+                    queue = self._queues.get(run_id)
+                    if queue is not None and waiter in queue:
+                        queue.remove(waiter)
+                        if not queue:
+                            del self._queues[run_id]
+                raise
+
+        wait = time.monotonic() - start
+        self._record_wait(run_id, wait)
+        try:
+            yield wait
+        finally:
+            self._release(run_id, host)
+
+    def run_stats(self, run_id: str) -> dict:
+        stats = self._run_stats.get(run_id)
+        return stats.to_dict() if stats else RunQueueStats().to_dict()
+
+    def forget_run(self, run_id: str) -> Optional[dict]:
+        """Drop per-run wait statistics once a run finishes, returning them."""
+        stats = self._run_stats.pop(run_id, None)
+        return stats.to_dict() if stats else None
+
+    def stats(self) -> dict:
+        return {
+            "active": self._state.active,
+            "queued": self.queued,
+            "max_concurrent": self.max_concurrent,
+            "active_by_host": dict(self._state.host_active),
+            "queued_by_run": {run_id: len(q) for run_id, q in self._queues.items()},
+        }
+
+
+_scheduler: Optional[ScrapeScheduler] = None
+
+
+def get_scrape_scheduler() -> ScrapeScheduler:
+    global _scheduler
+    if _scheduler is None:
+        settings = get_settings()
+        _scheduler = ScrapeScheduler(
+            max_concurrent=settings.scrape_global_max_concurrent,
+            max_per_host=settings.scrape_max_per_host,
+            max_per_run=settings.max_concurrent_fetches,
+        )
+    return _scheduler
@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+import re
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Any, Callable, Literal, Optional
+
+from ..config import get_settings
+from ..logging_config import get_logger
+from .ranking import QueryModel, SentenceFeatures, query_model, rank_sentences
+
+logger = get_logger("tools.text_processing")
+
+ExecutorMode = Literal["process", "thread", "inline"]
+
+# Compiled once per process (including each pool worker)
+_HEADING = re.compile(r"#+\s")
+_LINK = re.compile(r"\[([^\]]+)\]\([^)]+\)")
+_EMPHASIS = re.compile(r"[*_`~]")
+_BLANK_LINES = re.compile(r"\n{2,}")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+# --- pure functions (top-level so they pickle into pool workers) ---
+
+def clean_markdown(text: str) -> str:
+    """Strip headings, link targets and emphasis markers, and collapse blank lines."""
+    clean = _HEADING.sub("", text)
+    clean = _LINK.sub(r"\1", clean)
+    clean = _EMPHASIS.sub("", clean)
+    return _BLANK_LINES.sub("\n", clean)
+
+
+def split_sentences(text: str) -> list[str]:
+    return _SENTENCE_END.split(text)
+
+
+def candidate_sentences(text: str) -> list[str]:
+    """Cleaned sentences of a page that are plausible standalone facts."""
+    sentences = []
+    for s in split_sentences(clean_markdown(text)):
+        s = s.strip()
+        if 30 <= len(s) <= 500:
+            sentences.append(s)
+    return sentences
+
+
+def sentence_features(text: str, model: QueryModel) -> SentenceFeatures:
+    return model.featurize(candidate_sentences(text))
+
+
+def sentence_features_batch(texts: list[str], model: QueryModel) -> list[SentenceFeatures]:
+    """``sentence_features`` over several pages in one task, to amortise the pickling round trip."""
+    return [sentence_features(text, model) for text in texts]
+
+
+def heuristic_facts(text: str, query: str, max_facts: int = 8) -> list[str]:
+    """BM25-ranked facts for a single page."""
+    return rank_sentences([sentence_features(text, query_model(query))], k=max_facts)[0]
+
+
+# --- executor ---
+
+@dataclass
+class TextProcessingStats:
+    inline: int = 0
+    offloaded: int = 0
+    batches: int = 0
+    pool_failures: int = 0
+
+    def to_dict(self) -> dict:
+        return {
+            "inline": self.inline,
+            "offloaded": self.offloaded,
+            "batches": self.batches,
+            "pool_failures": self.pool_failures,
+        }
+
+
+class TextProcessor:
+    """Runs CPU-bound text processing off the event loop.
+
+    ``mode`` selects a process pool (true parallelism, pays pickling), a thread pool
+    (bounds loop stalls to the GIL switch interval) or inline execution. Inputs shorter
+    than ``inline_max_chars`` always run inline, where a pool round trip would cost more
+    than the work itself.
+    """
+
+    def __init__(
+        self,
+        mode: ExecutorMode = "process",
+        max_workers: int = 2,
+        inline_max_chars: int = 20_000,
+    ) -> None:
+        self.mode = mode
+        self.max_workers = max_workers
+        self.inline_max_chars = inline_max_chars
+        self._executor: Optional[Executor] = None
+        self._stats = TextProcessingStats()
+
+    def _get_executor(self) -> Optional[Executor]:
+        if self.mode == "inline":
+            return None
+        if self._executor is None:
+            if self.mode == "process":
+                # spawn: forking a process that already runs an event loop and
+                # httpx/SDK threads is not safe
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="text-processing"
+                )
+            logger.info("Started %s pool for text processing (%d workers)", self.mode, self.max_workers)
+        return self._executor
+
+    async def run(self, size: int, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run ``fn(*args)`` inline if ``size`` is under the threshold, else on the pool."""
+        executor = self._get_executor() if size >= self.inline_max_chars else None
+        if executor is None:
+            self._stats.inline += 1
+            return fn(*args)
+
+        self._stats.offloaded += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM-killed); start a fresh pool next time and
+            # finish this call inline rather than failing the page
+            self._stats.pool_failures += 1
+            logger.warning("Text processing pool broke, recreating it")
+            self._discard_executor()
+            return fn(*args)
+
+    async def heuristic_facts(self, text: str, query: str) -> list[str]:
+        return (await self.heuristic_facts_many([text], query))[0]
+
+    async def heuristic_facts_many(self, texts: list[str], query: str, max_facts: int = 8) -> list[list[str]]:
+        """BM25-ranked facts for several pages.
+
+        Cleaning, splitting and tokenizing run per page (large pages as one batch per
+        worker); ranking then scores every sentence of every page in a single pass.
+        """
+        model = query_model(query)
+        features: list[Optional[SentenceFeatures]] = [None] * len(texts)
+        large = []
+        for i, text in enumerate(texts):
+            if len(text) < self.inline_max_chars or self.mode == "inline":
+                features[i] = await self.run(len(text), sentence_features, text, model)
+            else:
+                large.append(i)
+
+        if large:
+            # Round-robin so each batch gets a similar mix of page sizes
+            groups = [large[k::self.max_workers] for k in range(min(self.max_workers, len(large)))]
+            self._stats.batches += len(groups)
+            batched = await asyncio.gather(*[
+                self.run(
+                    sum(len(texts[i]) for i in group),
+                    sentence_features_batch,
+                    [texts[i] for i in group],
+                    model,
+                )
+                for group in groups
+            ])
+            for group, group_features in zip(groups, batched):
+                for i, page_features in zip(group, group_features):
+                    features[i] = page_features
+
+        return rank_sentences(features, k=max_facts)
+
+    def _discard_executor(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def shutdown(self) -> None:
+        self._discard_executor()
+
+    def stats(self) -> dict:
+        return {"mode": self.mode, "workers": self.max_workers, **self._stats.to_dict()}
+
+
+_processor: Optional[TextProcessor] = None
+
+
+def get_text_processor() -> TextProcessor:
+    global _processor
+    if _processor is None:
+        settings = get_settings()
+        _processor = TextProcessor(
+            mode=settings.text_executor,
+            max_workers=settings.text_executor_workers,
+            inline_max_chars=settings.text_inline_max_chars,
+        )
+    return _processor
+
+
+def shutdown_text_processor() -> None:
+    global _processor
+    if _processor is not None:
+        _processor.shutdown()
+        _processor = None